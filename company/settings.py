@@ -9,7 +9,11 @@ https://docs.djangoproject.com/en/5.2/topics/settings/
 For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
+import atexit
 import os
+import shutil
+import sys
+import tempfile
 from pathlib import Path
 from dotenv import load_dotenv
 from django.utils.translation import gettext_lazy as _
@@ -48,12 +52,27 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # İstek kimliği tüm loglarda ve diğer middleware'lerin kayıtlarında bulunsun diye ilk sırada (main/logs.py).
+    'main.logs.RequestIdMiddleware',
+    # Trace kimliği istek kimliğinden türetilir; ödeme akışı her zaman izlenir (main/tracing.py).
+    'main.tracing.TracingMiddleware',
+    # Süreye oturum, kimlik doğrulama ve diğer middleware'ler de girsin diye dışta; sadece istek kimliği ve
+    # trace middleware'leri daha dışta kalır, onların süresi ölçülmez (main/metrics.py).
+    'main.metrics.MetricsMiddleware',
+    # SLOW_QUERY_THRESHOLD_MS'i aşan sorguları yakalar (main/slow_queries.py).
+    'main.slow_queries.SlowQueryMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    # SessionMiddleware'in dışında olmalı: oturum yanıt dönerken kaydedilir ve bu yazma da görülmeli.
+    # Dıştaki middleware'lerin yazmaları (yavaş sorgu flush'ı) ziyaretçinin yazması sayılmaz (main/db_router.py).
+    'main.db_router.ReplicaRoutingMiddleware',
+    'main.db_metrics.ConnectionMetricsMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.locale.LocaleMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    # Personelin imzalı `?_profile=` bayrağı için request.user gerekir (main/profiling.py).
+    'main.profiling.RequestProfilingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -90,28 +109,95 @@ if 'pythonanywhere' in HOSTNAME:
     # DEBUG = True ise burası çalışır
     DATABASES = {
         'default': {
-            'ENGINE': 'django.db.backends.mysql',
+            # Django'nun MySQL motoru + bağlantı metrikleri (main/db_metrics.py)
+            'ENGINE': 'main.db_backends.mysql',
             'NAME': 'novusliva$default',
             'USER': 'novusliva',
             'PASSWORD': os.getenv('MYSQL_PASSWORD'),
             'HOST': 'novusliva.mysql.pythonanywhere-services.com',
             'PORT': '3306',
+            # Her istekte yeni SSL bağlantısı açılmaz; bağlantı worker thread'i başına tutulur.
+            # PythonAnywhere boşta kalan MySQL bağlantılarını 300 sn sonra kapatır, süre onun altında kalmalı.
+            'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', '280')),
+            # Kalıcı bağlantı isteğin ilk sorgusundan önce yoklanır; kopmuşsa yenisi açılır.
+            'CONN_HEALTH_CHECKS': True,
             'OPTIONS': {
                 'ssl': {'ssl-ca': '/etc/ssl/certs/ca-certificates.crt'},
                 'sql_mode': 'STRICT_TRANS_TABLES',
             },
         }
     }
+    # Okuma kopyası tanımlıysa içerik sayfalarının okumaları oraya gider (main/db_router.py).
+    if os.getenv('MYSQL_REPLICA_HOST'):
+        DATABASES['replica'] = {
+            **DATABASES['default'],
+            'HOST': os.getenv('MYSQL_REPLICA_HOST'),
+            'USER': os.getenv('MYSQL_REPLICA_USER', DATABASES['default']['USER']),
+            'PASSWORD': os.getenv('MYSQL_REPLICA_PASSWORD', DATABASES['default']['PASSWORD']),
+            'TEST': {'MIRROR': 'default'},
+        }
 
 else:
+    # SQLITE_PATH ile başka bir dosya kullanılabilir (örn. `generate_dataset` ile üretilmiş büyük veri seti).
+    SQLITE_PATH = os.getenv('SQLITE_PATH', BASE_DIR / 'db.sqlite3')
+    # SQLite tek yazıcıya izin verir. İşlemler yazma kilidini baştan alır (okumadan yazmaya geçerken
+    # kilitlenme olmaz) ve kilit meşgulse hata vermek yerine en fazla `timeout` saniye beklenir;
+    # eşzamanlı isteklerde (runserver, `benchmark`) "database is locked" görülmez, yazmalar sıraya girer.
+    SQLITE_OPTIONS = {'timeout': 20, 'transaction_mode': 'IMMEDIATE'}
 
     DATABASES = {
         'default': {
-            'ENGINE': 'django.db.backends.sqlite3',
-            'NAME': BASE_DIR / 'db.sqlite3',
+            'ENGINE': 'main.db_backends.sqlite3',
+            'NAME': SQLITE_PATH,
+            'OPTIONS': SQLITE_OPTIONS,
+        },
+        # Yerelde replika aynı dosyadır ve okumalar yönlendirilmez (DATABASE_REPLICA_READS).
+        # Testlerde ayrı bir bellek içi veritabanıdır; yönlendirme testleri replika yerine bunu kullanır.
+        'replica': {
+            'ENGINE': 'main.db_backends.sqlite3',
+            'NAME': SQLITE_PATH,
+            'OPTIONS': SQLITE_OPTIONS,
+        },
+    }
+
+DATABASE_ROUTERS = ['main.db_router.PrimaryReplicaRouter']
+
+# Okuma amaçlı isteklerin okumaları 'replica' veritabanına gönderilsin mi.
+DATABASE_REPLICA_READS = 'pythonanywhere' in HOSTNAME and 'replica' in DATABASES
+
+# Yazma yapan oturumun okumaları bu süre boyunca ana veritabanından yapılır (saniye).
+DATABASE_PRIMARY_PIN_SECONDS = 10
+
+# Önbellek
+# İçerik/katalog sürümleri (koşullu GET doğrulayıcıları), sidebar, akış ve facet önbellekleri
+# tüm worker süreçleri arasında paylaşılmalıdır: bir süreçteki yazma diğerlerinde de eskitmelidir.
+# Varsayılan LocMemCache süreç başınadır ve bu yüzden kullanılmaz. REDIS_URL tanımlıysa Redis,
+# değilse aynı makinedeki süreçlerin paylaştığı dosya önbelleği (CACHE_DIR) kullanılır.
+if os.getenv('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.getenv('REDIS_URL'),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.getenv('CACHE_DIR', BASE_DIR / 'cache'),
+            # Sürüm anahtarları da burada; kapasite dolup silinirlerse sayfalar sadece yeniden üretilir.
+            'OPTIONS': {'MAX_ENTRIES': 10000},
         }
     }
 
+# Testler (manage.py test) sitenin paylaşılan önbelleğini temizlemesin ve çalışma dizinine log, trace veya
+# metrik dosyası yazmasın diye süreç içi önbelleği ve süreç sonunda silinen geçici bir dizini kullanır.
+TESTING = len(sys.argv) > 1 and sys.argv[1] == 'test'
+TEST_OUTPUT_DIR = Path(tempfile.mkdtemp(prefix='novusliva-tests-')) if TESTING else None
+if TESTING:
+    atexit.register(shutil.rmtree, TEST_OUTPUT_DIR, ignore_errors=True)
+    CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -166,6 +252,15 @@ MEDIA_URL = '/media/'
 
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Site haritaları `build_sitemaps` komutu ile buraya yazılır; web sunucusunda
+# /sitemap.xml ve /sitemaps/ bu dizine statik olarak yönlendirilmelidir.
+SITEMAP_ROOT = BASE_DIR / 'sitemaps'
+# Bölüm dosyalarının listesi; SITEMAP_ROOT herkese açık sunulduğu için onun dışında tutulur.
+SITEMAP_MANIFEST = BASE_DIR / 'sitemap-manifest.json'
+
+# Komut satırından üretilen mutlak URL'ler (site haritası vb.) için
+SITE_URL = os.getenv('SITE_URL', 'https://novusliva.pythonanywhere.com')
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -193,40 +288,114 @@ PAYTR_MERCHANT_SALT = os.getenv('PAYTR_MERCHANT_SALT')
 PAYTR_MERCHANT_KEY = os.getenv('PAYTR_MERCHANT_KEY')
 PAYTR_API_URL = "https://www.paytr.com/odeme/api/get-token"
 
+# İstek profili (main/profiling.py): ölçülecek isteklerin oranı ve personel bayrağının geçerlilik süresi (saniye).
+PROFILING_SAMPLE_RATE = float(os.getenv('PROFILING_SAMPLE_RATE', '0.01'))
+PROFILING_TOKEN_MAX_AGE = 24 * 60 * 60
+PROFILING_LOG_FILE = (
+    TEST_OUTPUT_DIR / 'profiling.log' if TESTING else os.getenv('PROFILING_LOG_FILE', BASE_DIR / 'profiling.log')
+)
+
+# Prometheus metrikleri (main/metrics.py): süreçlerin değerlerini paylaştığı dizin ve
+# /metrics/ adresine personel dışında erişebilecek IP'ler (virgülle ayrılmış).
+METRICS_DIR = TEST_OUTPUT_DIR / 'metrics' if TESTING else os.getenv('METRICS_DIR', BASE_DIR / 'metrics')
+METRICS_ALLOWED_IPS = [ip.strip() for ip in os.getenv('METRICS_ALLOWED_IPS', '').split(',') if ip.strip()]
+# Uygulamanın önündeki, X-Forwarded-For'a adres ekleyen güvenilen vekil sayısı. 0 ise sadece REMOTE_ADDR
+# kullanılır; başlık istemci tarafından yazılabildiği için vekil yokken okunmamalıdır.
+METRICS_TRUSTED_PROXY_COUNT = int(os.getenv('METRICS_TRUSTED_PROXY_COUNT', '0'))
+
+# Bu süreyi (ms) aşan sorgular SlowQuery tablosuna kaydedilir (main/slow_queries.py).
+SLOW_QUERY_THRESHOLD_MS = float(os.getenv('SLOW_QUERY_THRESHOLD_MS', '200'))
+
+# Span izleme (main/tracing.py): ödeme akışı dışındaki isteklerin izlenme oranı ve OTLP/JSON trace dosyası.
+TRACING_SAMPLE_RATE = float(os.getenv('TRACING_SAMPLE_RATE', '0'))
+TRACING_FILE = TEST_OUTPUT_DIR / 'traces.jsonl' if TESTING else os.getenv('TRACING_FILE', BASE_DIR / 'traces.jsonl')
+
 # LOGLAMA AYARLARI
+# Kayıtlar kuyruğa yazılır, arka plan thread'i konsola/dosyaya aktarır (main/logs.py).
+# Seviyeler ortamdan: LOG_LEVEL kök seviye, LOG_LEVELS logger bazında ("main=DEBUG,django.db.backends=WARNING").
+# LOG_FORMAT=text yerelde okunabilir çıktı verir. DEBUG kayıtlarının LOG_DEBUG_SAMPLE_RATE oranı yazılır.
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO').upper()
+LOG_LEVELS = {
+    name.strip(): level.strip().upper()
+    for name, _, level in (item.partition('=') for item in os.getenv('LOG_LEVELS', '').split(','))
+    if name.strip() and level.strip()
+}
+LOG_FORMAT = os.getenv('LOG_FORMAT', 'json')
+LOG_DEBUG_SAMPLE_RATE = float(os.getenv('LOG_DEBUG_SAMPLE_RATE', '0.1'))
+
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
+    'filters': {
+        'request_id': {
+            '()': 'main.logs.RequestIdFilter',
+        },
+        'debug_sampling': {
+            '()': 'main.logs.DebugSamplingFilter',
+            'rate': LOG_DEBUG_SAMPLE_RATE,
+        },
+    },
     'formatters': {
-        'verbose': {
-            'format': '{levelname} {asctime} {module} {process:d} {thread:d} {message}',
-            'style': '{',
+        'json': {
+            '()': 'main.logs.JsonFormatter',
         },
         'simple': {
-            'format': '{levelname} {message}',
+            'format': '{levelname} [{request_id}] {name} {message}',
             'style': '{',
         },
     },
     'handlers': {
         'console': {
-            'class': 'logging.StreamHandler',
-            'formatter': 'simple',
+            'class': 'main.logs.QueueHandler',
+            'formatter': 'simple' if LOG_FORMAT == 'text' else 'json',
+            'filters': ['request_id', 'debug_sampling'],
+        },
+        'profiling': {
+            'class': 'main.logs.QueueHandler',
+            'handler_class': 'logging.handlers.RotatingFileHandler',
+            'filename': PROFILING_LOG_FILE,
+            'maxBytes': 5 * 1024 * 1024,
+            'backupCount': 3,
+            'delay': True,
+            'encoding': 'utf-8',
+        },
+        'tracing': {
+            'class': 'main.logs.QueueHandler',
+            'handler_class': 'logging.handlers.RotatingFileHandler',
+            'filename': TRACING_FILE,
+            'maxBytes': 20 * 1024 * 1024,
+            'backupCount': 5,
+            'delay': True,
+            'encoding': 'utf-8',
         },
     },
     'root': {
         'handlers': ['console'],
-        'level': 'DEBUG',
+        'level': LOG_LEVEL,
     },
     'loggers': {
-        'main': {  # main/views.py için özel bir logger
-            'handlers': ['console'],
-            'level': 'DEBUG',
-            'propagate': True,
+        # Alt logger'lar sadece seviye belirler; kayıtlar kökteki handler'a iletilir (iki kez yazılmaz).
+        'main': {
+            'level': LOG_LEVELS.get('main', LOG_LEVEL),
         },
         'django': {
-            'handlers': ['console'],
+            'level': LOG_LEVELS.get('django', 'INFO'),
+        },
+        # Profil kayıtları konsola değil, dönen dosyaya yazılır.
+        'main.profiling': {
+            'handlers': ['profiling'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+        # Her satır bir OTLP/JSON trace kaydıdır.
+        'main.tracing': {
+            'handlers': ['tracing'],
             'level': 'INFO',
-            'propagate': True,
+            'propagate': False,
+        },
+        **{
+            name: {'level': level}
+            for name, level in LOG_LEVELS.items() if name not in ('main', 'django')
         },
     },
 }
@@ -16,24 +16,19 @@ Including another URLconf
 """
 from django.conf.urls.i18n import i18n_patterns
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, re_path, include
 from django.conf import settings
 from django.conf.urls.static import static
-from django.contrib.sitemaps.views import sitemap
 from django.views.generic import TemplateView
-from main.sitemaps import StaticViewSitemap, BlogPostSitemap, PortfolioItemSitemap
+from main.views import sitemap_file_view
 from django_ckeditor_5.views import upload_file
 
-sitemaps = {
-    'static': StaticViewSitemap,
-    'blog': BlogPostSitemap,
-    'portfolio': PortfolioItemSitemap,
-}
-
 urlpatterns = [
     path('admin/', admin.site.urls),
 
-    path('sitemap.xml', sitemap, {'sitemaps': sitemaps}, name='django.contrib.sitemaps.views.sitemap'),
+    # Site haritaları `build_sitemaps` ile diske yazılır; üretimde web sunucusu SITEMAP_ROOT'u doğrudan sunar.
+    path('sitemap.xml', sitemap_file_view, {'path': 'sitemap.xml'}, name='sitemap'),
+    re_path(r'^sitemaps/(?P<path>sitemap-[\w-]+\.xml\.gz)$', sitemap_file_view, name='sitemap_file'),
 
     path("robots.txt", TemplateView.as_view(template_name="robots.txt", content_type="text/plain")),
 
@@ -1,7 +1,11 @@
+from collections import defaultdict
+
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from django.contrib.auth.models import User
+from django.db.models import Avg, Count, Max, Sum
 from django.http import HttpResponseRedirect
+from django.template.response import TemplateResponse
 from .views import send_campaign_email_view
 from django.urls import path
 from django.utils.html import format_html
@@ -32,6 +36,7 @@ from .models import (
     DiscountCode,
     BankAccount,
     CarouselItem,
+    SlowQuery,
 )
 
 
@@ -76,13 +81,13 @@ class ServiceAdmin(admin.ModelAdmin):
 # Blog Modelleri Admin Ayarları
 @admin.register(Category)
 class CategoryAdmin(admin.ModelAdmin):
-    list_display = ('name', 'slug')
+    list_display = ('name', 'slug', 'post_count')
     prepopulated_fields = {'slug': ('name',)}
 
 
 @admin.register(Tag)
 class TagAdmin(admin.ModelAdmin):
-    list_display = ('name', 'slug')
+    list_display = ('name', 'slug', 'post_count')
     prepopulated_fields = {'slug': ('name',)}
 
 
@@ -94,10 +99,15 @@ class CommentInline(admin.TabularInline):
     fields = ('name', 'email', 'body', 'created_at', 'active')
     readonly_fields = ('created_at',)
 
+    def get_queryset(self, request):
+        # Satır başlığı (Comment.__str__) yazının başlığını gösterir; satır başına sorgu yapılmaz.
+        return super().get_queryset(request).select_related('post')
+
 
 @admin.register(BlogPost)
 class BlogPostAdmin(admin.ModelAdmin):
     list_display = ('title', 'author', 'category', 'status', 'created_at')
+    list_select_related = ('author', 'category')
     list_filter = ('status', 'category', 'author')
     search_fields = ('title', 'content')
     prepopulated_fields = {'slug': ('title',)}
@@ -121,6 +131,7 @@ class PortfolioImageInline(admin.TabularInline):
 @admin.register(PortfolioItem)
 class PortfolioItemAdmin(admin.ModelAdmin):
     list_display = ('title', 'category', 'client', 'project_date', 'price')
+    list_select_related = ('category',)
     list_filter = ('category', 'project_date')
     search_fields = ('title', 'client', 'long_description')
     prepopulated_fields = {'slug': ('title',)}
@@ -167,6 +178,8 @@ class OrderAdmin(admin.ModelAdmin):
     ]
     # Hangi sütunların tıklanabilir olacağını belirler.
     list_display_links = ['id', 'user_link']
+    # user_link ve display_total_cost satır başına sorgu yapmasın.
+    list_select_related = ['user']
 
     # Sağ tarafta hangi alanlara göre filtreleme yapılacağını belirler.
     list_filter = ['status', 'payment_method', 'currency', ('created_at', admin.DateFieldListFilter)]
@@ -289,6 +302,10 @@ class OrderAdmin(admin.ModelAdmin):
     def get_total_display(self, obj):
         return format_html('<strong>{} {}</strong>', obj.get_total_cost(), obj.currency)
 
+    def get_queryset(self, request):
+        # Toplam tutar (get_total_cost) kalemler üzerinden hesaplanır; liste için tek sorguda alınır.
+        return super().get_queryset(request).prefetch_related('items')
+
     # Toplu işlem (action) yetkilerini kısıtlama
     def get_actions(self, request):
         actions = super().get_actions(request)
@@ -410,3 +427,61 @@ class CarouselItemAdmin(admin.ModelAdmin):
     list_display = ('title', 'order', 'is_active')
     list_editable = ('order', 'is_active')
     search_fields = ('title',)
+
+
+@admin.register(SlowQuery)
+class SlowQueryAdmin(admin.ModelAdmin):
+    """
+    Yavaş sorgular: liste sayfası kayıtları parmak izine göre toplar (en çok toplam süre önce).
+    Bir parmak izine tıklanınca o sorgunun tek tek yakalamaları normal listede açılır.
+    """
+    list_display = ('captured_at', 'duration_ms', 'view', 'database', 'short_sql')
+    list_filter = ('database', 'captured_at')
+    search_fields = ('fingerprint', 'view', 'sql')
+    readonly_fields = ('fingerprint', 'sql', 'duration_ms', 'database', 'view', 'stack', 'captured_at')
+    summary_template = 'admin/main/slowquery/summary.html'
+    summary_limit = 100
+
+    @admin.display(description=_('Normalized SQL'))
+    def short_sql(self, obj):
+        return obj.sql[:120]
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def changelist_view(self, request, extra_context=None):
+        # Parametre (parmak izi, arama, filtre, sıralama) varsa tek tek kayıtların normal listesi gösterilir.
+        if request.GET:
+            return super().changelist_view(request, extra_context)
+        groups = list(
+            SlowQuery.objects.values('fingerprint').annotate(
+                count=Count('id'), total_ms=Sum('duration_ms'), avg_ms=Avg('duration_ms'),
+                max_ms=Max('duration_ms'), last_seen=Max('captured_at'), sample_id=Max('id'),
+            ).order_by('-total_ms')[:self.summary_limit]
+        )
+        # Örnek SQL parmak izi başına tek kayıttan (en yenisi) okunur; SQL metni yakalama sayısı kadar taşınmaz.
+        samples = dict(SlowQuery.objects.filter(
+            pk__in=[group['sample_id'] for group in groups]
+        ).values_list('fingerprint', 'sql'))
+        views = defaultdict(set)
+        for fingerprint, view in SlowQuery.objects.filter(
+            fingerprint__in=[group['fingerprint'] for group in groups]
+        ).order_by().values_list('fingerprint', 'view').distinct():
+            views[fingerprint].add(view)
+        changelist_url = reverse('admin:main_slowquery_changelist')
+        for group in groups:
+            group['sql'] = samples.get(group['fingerprint'], '')
+            group['views'] = sorted(views[group['fingerprint']])
+            group['url'] = f"{changelist_url}?fingerprint={group['fingerprint']}"
+        context = {
+            **self.admin_site.each_context(request),
+            'opts': self.model._meta,
+            'title': _('Slow Queries'),
+            'groups': groups,
+            'all_url': f"{changelist_url}?o=-1",
+            **(extra_context or {}),
+        }
+        return TemplateResponse(request, self.summary_template, context)
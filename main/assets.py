@@ -0,0 +1,184 @@
+"""
+Sayfa başına yüklenen vendor paketleri ve satır içi (inline) kritik CSS.
+
+Her şablon ihtiyaç duyduğu paketleri `{% vendor_assets 'aos' 'glightbox' %}` ile
+bildirir; `base.html` yalnızca bunları ve varsayılan paketleri yükler. Kritik CSS
+dosyaları `build_critical_css` komutu ile üretilir.
+"""
+import json
+import os
+from functools import lru_cache
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+
+ICONS_STYLESHEET = 'assets/vendor/bootstrap-icons/bootstrap-icons.css'
+
+VENDOR_BUNDLES = {
+    'bootstrap': {
+        'css': ['assets/vendor/bootstrap/css/bootstrap.min.css'],
+        'js': ['assets/vendor/bootstrap/js/bootstrap.bundle.min.js'],
+    },
+    'icons': {
+        'css': [ICONS_STYLESHEET],
+        'js': [],
+    },
+    'aos': {
+        'css': ['assets/vendor/aos/aos.css'],
+        'js': ['assets/vendor/aos/aos.js'],
+    },
+    'glightbox': {
+        'css': ['assets/vendor/glightbox/css/glightbox.min.css'],
+        'js': ['assets/vendor/glightbox/js/glightbox.min.js'],
+    },
+    'isotope': {
+        'css': [],
+        'js': [
+            'assets/vendor/imagesloaded/imagesloaded.pkgd.min.js',
+            'assets/vendor/isotope-layout/isotope.pkgd.min.js',
+        ],
+    },
+    'waypoints': {
+        'css': [],
+        'js': ['assets/vendor/waypoints/noframework.waypoints.js'],
+    },
+    'swiper': {
+        'css': ['assets/vendor/swiper/swiper-bundle.min.css'],
+        'js': ['assets/vendor/swiper/swiper-bundle.min.js'],
+    },
+}
+
+# Her sayfada (header, ikonlar, grid) gereken paketler.
+DEFAULT_VENDOR_BUNDLES = ('bootstrap', 'icons')
+
+# Sitenin kendi stil dosyası; vendor CSS'lerinden sonra yüklenir.
+SITE_STYLESHEETS = ['assets/css/main.css']
+
+CRITICAL_CSS_DIR = 'assets/css/critical'
+
+# `subset_icons` komutunun ürettiği, sadece kullanılan ikonları içeren font ve CSS.
+# Dosya adları içerik hash'lidir; güncel CSS'in adı manifest'tedir.
+ICON_SUBSET_DIR = 'assets/css/icons'
+ICON_SUBSET_MANIFEST = f'{ICON_SUBSET_DIR}/icons.json'
+
+# `purge_css` komutunun kullanılmayan seçicilerden temizlediği stil dosyaları.
+PURGE_TARGETS = [
+    'assets/vendor/bootstrap/css/bootstrap.min.css',
+    ICONS_STYLESHEET,
+    *SITE_STYLESHEETS,
+]
+PURGED_CSS_DIR = 'assets/css/purged'
+# Son temizlemede kullanılan sınıflar ve safelist; veritabanında yeni bir sınıf görülünce temizleme tekrarlanır.
+PURGE_MANIFEST = f'{PURGED_CSS_DIR}/purged.json'
+
+# Şablonlarda görünmeyen, Bootstrap JS'in veya Django mesajlarının çalışma anında eklediği sınıf adları.
+DEFAULT_PURGE_SAFELIST = [
+    r'^(show|showing|hiding|collapsing|collapse|fade|active|disabled)$',
+    r'^carousel-item-(start|end|next|prev)$',
+    r'^(modal-backdrop|modal-open|modal-static|offcanvas-backdrop)$',
+    r'^alert-',
+    r'^(was-validated|is-valid|is-invalid)$',
+]
+
+
+def resolve_bundles(names):
+    """Varsayılan paketlerle birlikte, tekrar etmeyen ve sıralı paket adlarını döndürür."""
+    resolved = []
+    for name in (*DEFAULT_VENDOR_BUNDLES, *names):
+        if name not in VENDOR_BUNDLES:
+            raise ValueError(f"Unknown vendor bundle: {name!r}")
+        if name not in resolved:
+            resolved.append(name)
+    return resolved
+
+
+def bundle_files(names, kind):
+    """Verilen paketlerin `css` veya `js` statik dosya yollarını sırayla döndürür."""
+    return [path for name in resolve_bundles(names) for path in VENDOR_BUNDLES[name][kind]]
+
+
+def purged_css_path(path):
+    """`assets/vendor/bootstrap/css/bootstrap.min.css` -> `assets/css/purged/bootstrap.min.css`"""
+    return f'{PURGED_CSS_DIR}/{path.rsplit("/", 1)[-1]}'
+
+
+_icon_subset = {}
+
+
+def _icon_subset_stylesheet():
+    """
+    İkon alt kümesinin güncel CSS yolu; alt küme yoksa None. Manifest, değişme zamanı
+    değiştiğinde yeniden okunur: alt küme yeniden üretildiğinde süreç yeniden başlatılmadan
+    yeni dosya adı kullanılır.
+    """
+    manifest_path = _find_static(ICON_SUBSET_MANIFEST)
+    if not manifest_path:
+        return None
+    try:
+        mtime = os.stat(manifest_path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+    if _icon_subset.get('mtime') != mtime:
+        with open(manifest_path, encoding='utf-8') as manifest:
+            css_name = json.load(manifest).get('css')
+        _icon_subset.update(mtime=mtime, path=f'{ICON_SUBSET_DIR}/{css_name}' if css_name else None)
+    return _icon_subset['path']
+
+
+def _find_stylesheet(path):
+    candidates = []
+    if path == ICONS_STYLESHEET:
+        subset = _icon_subset_stylesheet()
+        if subset:
+            return subset
+    if path in PURGE_TARGETS:
+        candidates.append(purged_css_path(path))
+    for candidate in candidates:
+        if finders.find(candidate):
+            return candidate
+    return path
+
+
+_cached_stylesheet = lru_cache(maxsize=None)(_find_stylesheet)
+_cached_find = lru_cache(maxsize=None)(finders.find)
+
+
+def _find_static(path):
+    return finders.find(path) if settings.DEBUG else _cached_find(path)
+
+
+def stylesheet_path(path):
+    """
+    Varsa üretilmiş sürümün (ikonlar için `subset_icons`, diğerleri için `purge_css` çıktısı),
+    yoksa orijinal dosyanın statik yolunu döndürür.
+    """
+    if settings.DEBUG or path == ICONS_STYLESHEET:
+        return _find_stylesheet(path)
+    return _cached_stylesheet(path)
+
+
+def critical_css_path(template_name):
+    """`registration/login.html` -> `assets/css/critical/registration-login.css`"""
+    stem = template_name.rsplit('.', 1)[0].replace('/', '-')
+    return f'{CRITICAL_CSS_DIR}/{stem}.css'
+
+
+def _read_critical_css(template_name):
+    path = finders.find(critical_css_path(template_name))
+    if not path:
+        return ''
+    with open(path, encoding='utf-8') as css_file:
+        return css_file.read()
+
+
+_cached_critical_css = lru_cache(maxsize=None)(_read_critical_css)
+
+
+def load_critical_css(template_name):
+    """Şablon için üretilmiş kritik CSS'i döndürür; yoksa boş string."""
+    if not template_name:
+        return ''
+    # Geliştirmede komut yeniden çalıştırıldığında sunucuyu yeniden başlatmak gerekmesin.
+    if settings.DEBUG:
+        return _read_critical_css(template_name)
+    return _cached_critical_css(template_name)
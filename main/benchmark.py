@@ -0,0 +1,277 @@
+"""
+Süreç içi yük testi: ağırlıklı kullanıcı yolculukları.
+
+Her işçi (thread) kendi test istemcisiyle (çerezler, oturum) `JOURNEYS` içinden
+ağırlığa göre bir yolculuk seçer ve adımlarını sırayla çalıştırır. Her istek için
+süre, veritabanı sorgu sayısı ve yanıt boyutu URL adıyla kaydedilir; rapor URL
+adı başına p50/p95/p99 gecikme, ortalama sorgu ve bayt içerir.
+
+Alışveriş yolculuğu sepete ekler ve ödeme formunu gönderir; Iyzico isteği
+`fake_gateway` ile süreç içinde yanıtlanır, ağa çıkılmaz. Yolculuklar yazma
+yapar (oturum, sepet, sipariş); sadece tohumlanmış bir veritabanında çalıştırılmalıdır.
+
+SQLite'ta aynı anda tek bir yazma yapılabilir. Bağlantılar işlemleri IMMEDIATE
+başlatır ve kilidi settings'teki `timeout` süresince bekler (settings.py); bu
+yüzden "database is locked" yerine bekleme görülür ve yazan adımların gecikmesi
+kilit beklemesini de içerir. Okuma ağırlıklı yolculukların sonuçları SQLite'ta da
+anlamlıdır; yazma eşzamanlılığı için MySQL üzerinde ölçülmelidir.
+"""
+import json
+import logging
+import random
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import ExitStack, contextmanager
+from dataclasses import dataclass
+from typing import Callable, Optional
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import connections
+from django.test import Client
+from django.urls import reverse
+from django.utils import timezone
+
+from . import views
+from .models import BlogPost, Category, PortfolioItem
+
+logger = logging.getLogger(__name__)
+
+BENCHMARK_USER_PREFIX = 'benchmark-'
+PERCENTILES = (50, 95, 99)
+
+
+@dataclass(frozen=True)
+class Step:
+    url_name: str
+    # Örnek veriden URL argümanlarını seçer: (fixtures, rng) -> kwargs
+    kwargs: Optional[Callable[[dict, random.Random], dict]] = None
+    method: str = 'get'
+    data: Optional[dict] = None
+
+    @property
+    def label(self):
+        # Rapor anahtarı: GET için URL adı, diğer yöntemlerde yöntem de eklenir (örn. "checkout POST").
+        return self.url_name if self.method == 'get' else f'{self.url_name} {self.method.upper()}'
+
+
+def _random(key, field):
+    return lambda fixtures, rng: {field: rng.choice(fixtures[key])}
+
+
+CHECKOUT_DATA = {
+    'billing_name': 'Yük Testi',
+    'billing_email': 'benchmark@example.com',
+    'billing_phone_number': '+905555555555',
+    'billing_identity_number': '11111111111',
+    'billing_address': 'Test Mahallesi 1',
+    'billing_city': 'İstanbul',
+    'billing_postal_code': '34000',
+    'payment_method': 'iyzico',
+    'currency': 'TRY',
+}
+
+# ad -> (ağırlık, giriş gerekir mi, adımlar)
+JOURNEYS = {
+    'browse': (6, False, (
+        Step('index'),
+        Step('blog'),
+        Step('blog_details', _random('posts', 'slug')),
+        Step('portfolio'),
+        Step('portfolio_details', _random('items', 'slug')),
+    )),
+    'read': (3, False, (
+        Step('blog'),
+        Step('posts_by_category', _random('categories', 'category_slug')),
+        Step('blog_details', _random('posts', 'slug')),
+        Step('blog_comments', _random('posts', 'slug')),
+    )),
+    'purchase': (1, True, (
+        Step('index'),
+        Step('portfolio'),
+        Step('portfolio_details', _random('items', 'slug')),
+        Step('add_to_cart', _random('item_ids', 'item_id')),
+        Step('cart_detail'),
+        Step('checkout'),
+        Step('checkout', method='post', data=CHECKOUT_DATA),
+    )),
+}
+
+
+def load_fixtures():
+    """Yolculukların URL argümanları için veritabanındaki örnekler; boş bir veritabanında hata verir."""
+    posts = BlogPost.objects.filter(status='published')
+    fixtures = {
+        'posts': list(posts.values_list('slug', flat=True)[:200]),
+        'categories': list(Category.objects.filter(post_count__gt=0).values_list('slug', flat=True)[:50]),
+        'items': [],
+        'item_ids': [],
+    }
+    for pk, slug in PortfolioItem.objects.filter(price__gt=0).values_list('pk', 'slug')[:200]:
+        fixtures['item_ids'].append(pk)
+        fixtures['items'].append(slug)
+    empty = [key for key, values in fixtures.items() if not values]
+    if empty:
+        raise ValueError(f"Yük testi için veri yok: {', '.join(empty)}. Önce veritabanını tohumlayın.")
+    return fixtures
+
+
+@contextmanager
+def fake_gateway(latency=0.0):
+    """Iyzico ödeme başlatma isteğini süreç içinde başarılı yanıtlar; `latency` saniye bekler."""
+    def initialize(iyzico_request, options):
+        if latency:
+            time.sleep(latency)
+        return {
+            'status': 'success',
+            'token': iyzico_request['conversationId'],
+            'paymentPageUrl': f"https://gateway.invalid/pay/{iyzico_request['conversationId']}",
+        }
+
+    with mock.patch.object(views, 'initialize_iyzico_payment', initialize):
+        yield
+
+
+class _QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def percentile(values, p):
+    """Sıralı listede en yakın sıra (nearest-rank) yüzdeliği."""
+    if not values:
+        return None
+    rank = max(1, -(-len(values) * p // 100))
+    return values[int(rank) - 1]
+
+
+class Benchmark:
+    def __init__(self, workers=4, duration=30.0, journeys=None, host='localhost', gateway_latency=0.0, seed=None):
+        self.workers = workers
+        self.duration = duration
+        self.journeys = {name: JOURNEYS[name] for name in (journeys or JOURNEYS)}
+        self.host = host
+        self.gateway_latency = gateway_latency
+        self.random = random.Random(seed)
+        self.samples = []
+        self.journey_counts = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def _client(self, index, login):
+        client = Client(HTTP_HOST=self.host, raise_request_exception=False)
+        if login:
+            user, created = User.objects.get_or_create(username=f'{BENCHMARK_USER_PREFIX}{index}')
+            if created:
+                user.set_unusable_password()
+                user.save(update_fields=['password'])
+            client.force_login(user)
+        return client
+
+    def _request(self, client, step, fixtures, rng):
+        url = reverse(step.url_name, kwargs=step.kwargs(fixtures, rng) if step.kwargs else None)
+        counter = _QueryCounter()
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(counter))
+            started = time.perf_counter()
+            response = getattr(client, step.method)(url, step.data)
+            elapsed = time.perf_counter() - started
+        size = len(b''.join(response.streaming_content) if response.streaming else response.content)
+        return step.label, response.status_code, elapsed, counter.count, size
+
+    def _worker(self, index, fixtures, deadline, seed):
+        names = list(self.journeys)
+        weights = [self.journeys[name][0] for name in names]
+        rng = random.Random(seed)
+        clients = {}
+        try:
+            while time.monotonic() < deadline:
+                name = rng.choices(names, weights)[0]
+                _, login, steps = self.journeys[name]
+                if login not in clients:
+                    clients[login] = self._client(index, login)
+                for step in steps:
+                    try:
+                        sample = self._request(clients[login], step, fixtures, rng)
+                    except Exception:
+                        logger.exception("Yük testi isteği başarısız: %s", step.url_name)
+                        sample = (step.label, None, 0.0, 0, 0)
+                    with self._lock:
+                        self.samples.append(sample)
+                with self._lock:
+                    self.journey_counts[name] += 1
+        finally:
+            connections.close_all()
+
+    def run(self):
+        fixtures = load_fixtures()
+        started_at = timezone.now()
+        started = time.perf_counter()
+        deadline = time.monotonic() + self.duration
+        with fake_gateway(self.gateway_latency):
+            threads = [
+                threading.Thread(target=self._worker, args=(index, fixtures, deadline, self.random.random()), name=f'benchmark-{index}')
+                for index in range(self.workers)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        return self.report(started_at, time.perf_counter() - started)
+
+    def report(self, started_at, elapsed):
+        routes = defaultdict(list)
+        for sample in self.samples:
+            routes[sample[0]].append(sample)
+
+        route_stats = {}
+        for name, samples in sorted(routes.items()):
+            latencies = sorted(sample[2] * 1000 for sample in samples)
+            route_stats[name] = {
+                'requests': len(samples),
+                'errors': sum(1 for sample in samples if sample[1] is None or sample[1] >= 500),
+                'statuses': dict(sorted(Counter(str(sample[1]) for sample in samples).items())),
+                **{f'p{p}_ms': round(percentile(latencies, p), 2) for p in PERCENTILES},
+                'max_ms': round(latencies[-1], 2),
+                'queries_avg': round(sum(sample[3] for sample in samples) / len(samples), 2),
+                'queries_max': max(sample[3] for sample in samples),
+                'bytes_avg': round(sum(sample[4] for sample in samples) / len(samples)),
+            }
+
+        return {
+            'started_at': started_at.isoformat(),
+            'duration_s': round(elapsed, 2),
+            'workers': self.workers,
+            'requests': len(self.samples),
+            'throughput_rps': round(len(self.samples) / elapsed, 2) if elapsed else None,
+            'journeys': dict(self.journey_counts),
+            'environment': {
+                'database': connections['default'].vendor,
+                'debug': settings.DEBUG,
+                'gateway_latency_s': self.gateway_latency,
+            },
+            'routes': route_stats,
+        }
+
+
+def compare(current, previous):
+    """İki raporun ortak URL adları için p50/p95/p99 farkları (ms, pozitif = yavaşladı)."""
+    deltas = {}
+    for name, stats in current['routes'].items():
+        before = previous.get('routes', {}).get(name)
+        if before:
+            deltas[name] = {
+                f'p{p}_ms': round(stats[f'p{p}_ms'] - before[f'p{p}_ms'], 2) for p in PERCENTILES
+            }
+    return deltas
+
+
+def load_report(path):
+    with open(path, encoding='utf-8') as file:
+        return json.load(file)
@@ -0,0 +1,100 @@
+"""
+Blog sidebar'ı için etiket, kategori ve aylık arşiv sayaçları.
+
+Sayaçlar BlogPost kaydı/silinmesi ve `tags` m2m değişikliklerinde sadece
+etkilenen satırlar için yeniden hesaplanır (signals.py); sidebar bu alanları
+okur ve önbellekte tutulur, yazı tablosunda COUNT ... GROUP BY yapılmaz.
+"""
+from collections import Counter
+from datetime import datetime, time, timedelta
+
+from django.core.cache import cache
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .metrics import cache_lookup
+from .models import BlogArchiveMonth, BlogPost, Category, Tag
+
+SIDEBAR_CACHE_KEY = 'blog-sidebar'
+POPULAR_TAG_LIMIT = 15
+
+
+def month_of(value):
+    """Zaman damgasının (yerel saat) ait olduğu ayın ilk günü."""
+    return timezone.localtime(value).date().replace(day=1)
+
+
+def _month_range(month):
+    next_month = (month.replace(day=28) + timedelta(days=4)).replace(day=1)
+    start = timezone.make_aware(datetime.combine(month, time.min))
+    end = timezone.make_aware(datetime.combine(next_month, time.min))
+    return start, end
+
+
+def _published_count(**lookups):
+    return Coalesce(Subquery(
+        BlogPost.objects.filter(status='published', **lookups)
+        .order_by().values('status').annotate(total=Count('pk')).values('total')
+    ), 0)
+
+
+def refresh_tag_counts(tag_ids):
+    tag_ids = {pk for pk in tag_ids if pk}
+    if tag_ids:
+        Tag.objects.filter(pk__in=tag_ids).update(post_count=_published_count(tags=OuterRef('pk')))
+        invalidate_sidebar()
+
+
+def refresh_category_counts(category_ids):
+    category_ids = {pk for pk in category_ids if pk}
+    if category_ids:
+        Category.objects.filter(pk__in=category_ids).update(post_count=_published_count(category=OuterRef('pk')))
+        invalidate_sidebar()
+
+
+def refresh_archive_months(months):
+    months = {month for month in months if month}
+    for month in months:
+        start, end = _month_range(month)
+        count = BlogPost.objects.filter(status='published', created_at__gte=start, created_at__lt=end).count()
+        if count:
+            BlogArchiveMonth.objects.update_or_create(month=month, defaults={'post_count': count})
+        else:
+            BlogArchiveMonth.objects.filter(month=month).delete()
+    if months:
+        invalidate_sidebar()
+
+
+def rebuild_counters():
+    """Tüm kategori, etiket ve arşiv sayaçlarını baştan hesaplar (örn. toplu veri yüklemesinden sonra)."""
+    Category.objects.update(post_count=_published_count(category=OuterRef('pk')))
+    Tag.objects.update(post_count=_published_count(tags=OuterRef('pk')))
+    published = BlogPost.objects.filter(status='published').values_list('created_at', flat=True)
+    months = Counter(month_of(created_at) for created_at in published.iterator(chunk_size=2000))
+    BlogArchiveMonth.objects.all().delete()
+    BlogArchiveMonth.objects.bulk_create([BlogArchiveMonth(month=month, post_count=count) for month, count in months.items()])
+    invalidate_sidebar()
+
+
+def invalidate_sidebar():
+    cache.delete(SIDEBAR_CACHE_KEY)
+
+
+def blog_sidebar():
+    """Popüler etiketler, kategoriler ve aylık arşiv; sayaçlar değişene kadar önbellekten okunur."""
+    sidebar = cache.get(SIDEBAR_CACHE_KEY)
+    cache_lookup('blog_sidebar', sidebar is not None)
+    if sidebar is None:
+        sidebar = {
+            'popular_tags': list(
+                Tag.objects.filter(post_count__gt=0).order_by('-post_count', 'name')
+                .values('name', 'slug', 'post_count')[:POPULAR_TAG_LIMIT]
+            ),
+            'categories': list(
+                Category.objects.filter(post_count__gt=0).order_by('name').values('name', 'slug', 'post_count')
+            ),
+            'archive': list(BlogArchiveMonth.objects.filter(post_count__gt=0).values('month', 'post_count')),
+        }
+        cache.set(SIDEBAR_CACHE_KEY, sidebar, timeout=None)
+    return sidebar
@@ -0,0 +1,149 @@
+"""
+Süreç içi, değiştirilemez portfolyo kataloğu.
+
+Katalog küçük ve çok okunuyor: liste ve sepet sayfası ürün satırlarını
+veritabanından okumak yerine bu anlık görüntüyü kullanır. Görüntü tek bir
+JOIN'li `values_list` sorgusuyla yüklenir ve ürünler isim bazlı tuple'lar
+(CatalogItem) olarak saklanır. Her erişimde sadece paylaşılan önbellekteki
+katalog sürümü kontrol edilir; PortfolioItem, PortfolioCategory veya Service
+değiştiğinde (signals.py) sürüm commit sonrasında güncellenir ve görüntü bir
+sonraki erişimde yeniden yüklenir.
+
+Görüntü kısa bir süre eski kalabileceği için siparişe yazılan fiyat katalogdan
+alınmaz; sepete ekleme fiyatı işlem içinde PortfolioItem satırından okur.
+"""
+import logging
+import threading
+import time
+from datetime import date
+from decimal import Decimal
+from types import MappingProxyType
+from typing import NamedTuple, Optional
+
+from django.urls import reverse
+
+from .conditional import bump_content_version, content_version
+from .models import PortfolioCategory, PortfolioItem, Service
+
+logger = logging.getLogger(__name__)
+
+CATALOG_VERSION_KEY = 'catalog-version'
+# Değiştiğinde katalog sürümünü güncelleyen modeller (signals.py).
+CATALOG_MODELS = {PortfolioItem, PortfolioCategory, Service}
+# Bilinmeyen bir id istendiğinde (örn. başka süreçte yeni eklenmiş ürün) en fazla bu sıklıkta yeniden yüklenir.
+CATALOG_MISS_RELOAD_INTERVAL = 5
+
+SLUG_PLACEHOLDER = 'slug-placeholder'
+
+
+class CatalogItem(NamedTuple):
+    id: int
+    slug: str
+    title: str
+    short_description: str
+    price: Optional[Decimal]
+    project_date: Optional[date]
+    category_id: Optional[int]
+    category_name: Optional[str]
+    category_slug: Optional[str]
+    service_id: Optional[int]
+    service_title: Optional[str]
+    image_url: str
+    url: str
+
+    def get_absolute_url(self):
+        return self.url
+
+
+class Catalog:
+    """Bir sürümdeki tüm ürünler: liste sırasında `items` ve id ile erişim için `by_id`."""
+
+    __slots__ = ('version', 'items', 'by_id', 'loaded_at')
+
+    def __init__(self, version, items):
+        self.version = version
+        self.items = tuple(items)
+        self.by_id = MappingProxyType({item.id: item for item in self.items})
+        self.loaded_at = time.monotonic()
+
+    def get(self, pk):
+        return self.by_id.get(pk)
+
+
+CATALOG_FIELDS = (
+    'pk', 'slug', 'title', 'short_description', 'price', 'project_date',
+    'category_id', 'category__name', 'category__slug', 'service_id', 'service__title', 'main_image',
+)
+
+
+def _item_factory():
+    image_storage = PortfolioItem._meta.get_field('main_image').storage
+    # reverse() her ürün için çağrılmaz; URL şablonu bir kez çözülüp slug yerleştirilir.
+    prefix, suffix = reverse('portfolio_details', kwargs={'slug': SLUG_PLACEHOLDER}).split(SLUG_PLACEHOLDER)
+
+    def make(row):
+        *fields, image = row
+        return CatalogItem(*fields, image_url=image_storage.url(image) if image else '', url=f'{prefix}{row[1]}{suffix}')
+
+    return make
+
+
+def _load(version):
+    make = _item_factory()
+    rows = PortfolioItem.objects.order_by('-project_date', '-pk').values_list(*CATALOG_FIELDS)
+    items = [make(row) for row in rows.iterator(chunk_size=2000)]
+    logger.debug("Katalog yüklendi: %s ürün, sürüm %s", len(items), version)
+    return Catalog(version, items)
+
+
+_catalog = None
+_lock = threading.Lock()
+
+
+def get_catalog(force=False):
+    """Güncel katalog; sürüm değiştiyse (veya `force`) yeniden yükler."""
+    global _catalog
+    version = content_version(CATALOG_VERSION_KEY)
+    catalog = _catalog
+    if not force and catalog is not None and catalog.version == version:
+        return catalog
+    with _lock:
+        # Kilidi bekleyen diğer thread'ler aynı sürümü tekrar yüklemez.
+        if _catalog is not None and _catalog.version == version and (not force or _catalog is not catalog):
+            return _catalog
+        _catalog = _load(version)
+        return _catalog
+
+
+def catalog_item(pk):
+    """Tek bir ürün veya None. Bulunamazsa, katalog yakın zamanda yüklenmediyse bir kez yeniden yüklenir."""
+    catalog = get_catalog()
+    item = catalog.get(pk)
+    if item is None and time.monotonic() - catalog.loaded_at >= CATALOG_MISS_RELOAD_INTERVAL:
+        item = get_catalog(force=True).get(pk)
+    return item
+
+
+def bump_catalog_version():
+    bump_content_version(CATALOG_VERSION_KEY)
+
+
+def cart_lines(order):
+    """
+    Sepet kalemleri, her birinin `product` özelliğinde katalog ürünüyle. Kalemler
+    `order.items` üzerinden okunur (prefetch edildiyse sorgu yapılmaz); ürün bilgisi
+    için kalem başına PortfolioItem sorgusu yapılmaz.
+    """
+    lines = list(order.items.all())
+    for line in lines:
+        line.product = catalog_item(line.portfolio_item_id)
+    missing = [line.portfolio_item_id for line in lines if line.product is None]
+    if missing:
+        # Katalog başka bir süreçteki değişikliği henüz görmediyse eksik ürünler tek sorguyla okunur.
+        make = _item_factory()
+        rows = PortfolioItem.objects.filter(pk__in=missing).values_list(*CATALOG_FIELDS)
+        products = {row[0]: make(row) for row in rows}
+        for line in lines:
+            if line.product is None:
+                line.product = products.get(line.portfolio_item_id)
+    return lines
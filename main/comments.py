@@ -0,0 +1,50 @@
+"""
+Blog yorumlarının keyset (imleç) sayfalaması ve yorum sayacı.
+
+İlk sayfa blog detayında sunucu tarafında render edilir; sonraki sayfalar
+`blog_comments` fragment endpoint'inden `?after=<imleç>` ile yüklenir. OFFSET
+kullanılmadığı için binlerce yorumlu yazılarda da her sayfa aynı maliyettedir.
+"""
+from datetime import datetime, timezone as dt_timezone
+
+from django.db.models import Count, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+
+from .models import BlogPost, Comment
+
+COMMENTS_PAGE_SIZE = 10
+CURSOR_TIME_FORMAT = '%Y%m%d%H%M%S%f'
+
+
+def encode_cursor(comment):
+    # Float zaman damgası mikro saniyeleri kaybedebilir; UTC zamanı rakamlarla yazılır.
+    created_at = comment.created_at.astimezone(dt_timezone.utc).strftime(CURSOR_TIME_FORMAT)
+    return f'{created_at}_{comment.pk}'
+
+
+def decode_cursor(cursor):
+    """`encode_cursor` çıktısını (created_at, pk) çiftine çevirir; geçersizse ValueError."""
+    created_at, pk = cursor.split('_', 1)
+    return datetime.strptime(created_at, CURSOR_TIME_FORMAT).replace(tzinfo=dt_timezone.utc), int(pk)
+
+
+def comment_page(post_id, cursor=None, page_size=COMMENTS_PAGE_SIZE):
+    """Onaylı yorumlardan bir sayfa ve (varsa) sonraki sayfanın imlecini döndürür."""
+    comments = Comment.objects.filter(post_id=post_id, active=True).order_by('created_at', 'pk')
+    if cursor:
+        created_at, pk = decode_cursor(cursor)
+        comments = comments.filter(Q(created_at__gt=created_at) | Q(created_at=created_at, pk__gt=pk))
+    # Bir fazlası çekilir; böylece sonraki sayfanın varlığı için COUNT gerekmez.
+    page = list(comments[:page_size + 1])
+    next_cursor = encode_cursor(page[page_size - 1]) if len(page) > page_size else None
+    return page[:page_size], next_cursor
+
+
+def refresh_comment_count(post_id=None):
+    """Yazının (`post_id` verilmezse tüm yazıların) onaylı yorum sayısını tek bir UPDATE ile yeniden hesaplar."""
+    active_counts = (
+        Comment.objects.filter(post=OuterRef('pk'), active=True)
+        .order_by().values('post').annotate(total=Count('pk')).values('total')
+    )
+    posts = BlogPost.objects.all() if post_id is None else BlogPost.objects.filter(pk=post_id)
+    posts.update(comment_count=Coalesce(Subquery(active_counts), 0))
@@ -0,0 +1,114 @@
+"""
+Detay sayfaları için koşullu GET (ETag / Last-Modified).
+
+Doğrulayıcılar ağır iş yapılmadan önce tek sütunluk bir sorgu ve önbellekteki
+içerik sürümünden hesaplanır. İçerik sürümü, sayfalarda görünen modellerden biri
+kaydedildiğinde veya silindiğinde, işlem commit edildikten sonra (signals.py)
+güncellenen bir zaman damgasıdır; yorum, etiket, site ayarı gibi nesnenin kendisi
+dışındaki değişiklikleri de kapsar.
+Sürüm, tüm worker süreçlerinin paylaştığı önbellektedir (settings.CACHES); bir
+süreçteki değişiklik diğer süreçlerin doğrulayıcılarını da eskitir.
+"""
+import hashlib
+import time
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.contrib.messages import get_messages
+from django.core.cache import cache
+from django.views.decorators.http import condition
+
+from .metrics import cache_lookup
+from .models import BlogPost, Category, Comment, PortfolioCategory, PortfolioImage, PortfolioItem, Service, \
+    SiteSetting, Tag
+
+CONTENT_VERSION_KEY = 'content-version'
+FEED_VERSION_KEY = 'feed-version'
+
+# Detay sayfalarında (header, sidebar, yorumlar dahil) görünen modeller.
+CONTENT_MODELS = {
+    BlogPost, BlogPost.tags.through, Comment, Category, Tag,
+    PortfolioItem, PortfolioImage, PortfolioCategory,
+    Service, SiteSetting,
+}
+
+# RSS/Atom akışlarında görünen modeller.
+FEED_MODELS = {BlogPost, Category}
+
+
+def content_version(key=CONTENT_VERSION_KEY):
+    """Son içerik değişikliğinin zaman damgası (epoch saniye)."""
+    version = cache.get(key)
+    cache_lookup('content_version', version is not None)
+    if version is None:
+        # Önbellek boşsa (örn. yeniden başlatma) şu an kabul edilir; en kötü ihtimalle sayfa yeniden gönderilir.
+        version = time.time()
+        cache.add(key, version, timeout=None)
+        version = cache.get(key, version)
+    return version
+
+
+def bump_content_version(key=CONTENT_VERSION_KEY):
+    cache.set(key, time.time(), timeout=None)
+
+
+def _is_cacheable(request):
+    # Giriş yapmış kullanıcılar header'da sepet sayısını görür; bekleyen mesajlar da tek seferliktir.
+    if request.method not in ('GET', 'HEAD') or request.user.is_authenticated:
+        return False
+    return not len(get_messages(request))
+
+
+def _validators(request, timestamp_func, *args, **kwargs):
+    """(etag, last_modified) çiftini istek başına bir kez hesaplar; kaynak yoksa (None, None)."""
+    if not hasattr(request, '_page_validators'):
+        validators = (None, None)
+        if _is_cacheable(request):
+            timestamp = timestamp_func(*args, **kwargs)
+            if timestamp is not False:
+                version = content_version()
+                last_modified = datetime.fromtimestamp(version, dt_timezone.utc)
+                if timestamp is not None:
+                    last_modified = max(last_modified, timestamp)
+                # Aynı içerik farklı dilde ve CSRF token'ıyla render edilir; ikisi de ETag'e dahil.
+                raw = '|'.join([
+                    request.path,
+                    timestamp.isoformat() if timestamp else '',
+                    repr(version),
+                    getattr(request, 'LANGUAGE_CODE', ''),
+                    request.COOKIES.get(settings.CSRF_COOKIE_NAME, ''),
+                ])
+                validators = (f'W/"{hashlib.md5(raw.encode()).hexdigest()}"', last_modified)
+        request._page_validators = validators
+    return request._page_validators
+
+
+def conditional_page(timestamp_func):
+    """
+    Görünüm için koşullu GET desteği ekler. `timestamp_func` görünümün URL argümanlarını
+    alır ve nesnenin zaman damgasını, zaman damgası yoksa None, nesne yoksa False döndürür.
+    """
+    return condition(
+        etag_func=lambda request, *args, **kwargs: _validators(request, timestamp_func, *args, **kwargs)[0],
+        last_modified_func=lambda request, *args, **kwargs: _validators(request, timestamp_func, *args, **kwargs)[1],
+    )
+
+
+def _first_or_false(queryset):
+    values = list(queryset[:1])
+    return values[0] if values else False
+
+
+def blog_post_timestamp(slug):
+    return _first_or_false(
+        BlogPost.objects.filter(slug=slug, status='published').values_list('updated_at', flat=True)
+    )
+
+
+def portfolio_item_timestamp(slug):
+    return _first_or_false(PortfolioItem.objects.filter(slug=slug).values_list('created_at', flat=True))
+
+
+def service_timestamp(slug):
+    # Service modelinde zaman damgası yok; varlığı kontrol edilir, değişiklikler içerik sürümünden gelir.
+    return None if Service.objects.filter(slug=slug).exists() else False
@@ -1,4 +1,6 @@
-from .models import SiteSetting, Service, Order
+from django.db.models import Sum
+
+from .models import SiteSetting, Service, OrderItem
 
 
 def site_settings(request):
@@ -17,9 +19,8 @@ def cart_item_count(request):
     """
     cart_items_count = 0
     if request.user.is_authenticated:
-        try:
-            cart = Order.objects.get(user=request.user, status='cart')
-            cart_items_count = sum(item.quantity for item in cart.items.all())
-        except Order.DoesNotExist:
-            pass
+        # Her sayfada çalışır: sepet ve kalemleri ayrı ayrı okunmaz, toplam tek sorguda alınır.
+        cart_items_count = OrderItem.objects.filter(
+            order__user=request.user, order__status='cart'
+        ).aggregate(total=Sum('quantity'))['total'] or 0
     return {'cart_item_count': cart_items_count}
@@ -0,0 +1,302 @@
+"""
+Derleme zamanı CSS araçları.
+
+Kritik CSS çıkarımı ve kullanılmayan seçicilerin temizlenmesi için gereken
+küçük, bağımlılıksız bir CSS ayrıştırıcısı ve seçici eşleştirme yardımcıları.
+Tarayıcı motoru değildir; Bootstrap ve şablonun kendi CSS dosyaları gibi düzgün
+yazılmış stil dosyaları için yeterlidir.
+"""
+import posixpath
+import re
+
+from django.conf import settings
+
+COMMENT_RE = re.compile(r'/\*.*?\*/', re.S)
+TEMPLATE_VAR_RE = re.compile(r'{{.*?}}|{#.*?#}', re.S)
+TEMPLATE_TAG_RE = re.compile(r'{%.*?%}', re.S)
+CLASS_ATTR_RE = re.compile(r'\bclass\s*=\s*(["\'])(.*?)\1', re.S | re.I)
+ID_ATTR_RE = re.compile(r'\bid\s*=\s*(["\'])(.*?)\1', re.S | re.I)
+TAG_RE = re.compile(r'<([a-zA-Z][a-zA-Z0-9-]*)')
+WORD_RE = re.compile(r'-?[_a-zA-Z][\w-]*')
+URL_RE = re.compile(r'url\(\s*(["\']?)([^)"\']+)\1\s*\)')
+
+SELECTOR_CLASS_RE = re.compile(r'\.(-?[_a-zA-Z][\w-]*)')
+SELECTOR_ID_RE = re.compile(r'#(-?[_a-zA-Z][\w-]*)')
+SELECTOR_TAG_RE = re.compile(r'(?:^|[\s>+~(,])([a-zA-Z][a-zA-Z0-9]*)')
+SELECTOR_PSEUDO_RE = re.compile(r'::?[a-zA-Z-]+(\((?:[^()]|\([^()]*\))*\))?')
+SELECTOR_ATTR_RE = re.compile(r'\[[^\]]*\]')
+
+# İçinde başka kurallar barındıran at-rule'lar; diğerleri (font-face, keyframes...) ham gövde olarak tutulur.
+NESTED_AT_RULES = {'media', 'supports', 'layer', 'container', 'document'}
+
+# Her sayfada bulunan, seçiciler arasında kullanım kontrolü yapılmayan öğeler.
+ALWAYS_USED_TAGS = {'html', 'body', 'main', 'a', 'p', 'img', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6'}
+
+
+class Rule:
+    """Ayrıştırılmış tek bir CSS kuralı veya at-rule."""
+
+    def __init__(self, prelude, body=None, children=None):
+        self.prelude = prelude
+        self.body = body
+        self.children = children
+
+    @property
+    def at_name(self):
+        if not self.prelude.startswith('@'):
+            return None
+        return self.prelude[1:].split(None, 1)[0].split('(')[0].lower()
+
+    def __repr__(self):
+        return f'<Rule {self.prelude[:40]!r}>'
+
+
+def _skip_string(text, pos):
+    quote = text[pos]
+    pos += 1
+    while pos < len(text) and text[pos] != quote:
+        pos += 2 if text[pos] == '\\' else 1
+    return pos + 1
+
+
+def _block_end(text, pos):
+    """`pos` konumundaki açık süslü parantezin kapandığı konumu döndürür."""
+    depth = 1
+    while pos < len(text):
+        char = text[pos]
+        if char in '"\'':
+            pos = _skip_string(text, pos)
+            continue
+        if char == '{':
+            depth += 1
+        elif char == '}':
+            depth -= 1
+            if depth == 0:
+                return pos
+        pos += 1
+    return pos
+
+
+def _parse_block(text, pos):
+    nodes = []
+    length = len(text)
+    while pos < length:
+        while pos < length and text[pos].isspace():
+            pos += 1
+        if pos >= length:
+            break
+        if text[pos] == '}':
+            return nodes, pos + 1
+
+        start = pos
+        depth = 0
+        while pos < length:
+            char = text[pos]
+            if char in '"\'':
+                pos = _skip_string(text, pos)
+                continue
+            if char == '(':
+                depth += 1
+            elif char == ')':
+                depth -= 1
+            elif depth <= 0 and char in '{;}':
+                break
+            pos += 1
+        prelude = ' '.join(text[start:pos].split())
+        if pos >= length:
+            break
+
+        if text[pos] == ';':
+            if prelude:
+                nodes.append(Rule(prelude))
+            pos += 1
+        elif text[pos] == '}':
+            # Noktalı virgülsüz son ifade; bir üst bloğa bırakılır.
+            if prelude:
+                nodes.append(Rule(prelude))
+        else:
+            rule = Rule(prelude)
+            if rule.at_name in NESTED_AT_RULES:
+                rule.children, pos = _parse_block(text, pos + 1)
+            else:
+                end = _block_end(text, pos + 1)
+                rule.body = text[pos + 1:end].strip()
+                pos = end + 1
+            nodes.append(rule)
+    return nodes, pos
+
+
+def parse_stylesheet(text):
+    """CSS metnini `Rule` listesine ayrıştırır."""
+    nodes, _ = _parse_block(COMMENT_RE.sub('', text), 0)
+    return nodes
+
+
+def minify_declarations(body):
+    body = ' '.join(body.split())
+    body = re.sub(r'\s*([:;,{}])\s*', r'\1', body)
+    return body.rstrip(';')
+
+
+def serialize(nodes):
+    """`Rule` listesini küçültülmüş CSS metnine çevirir."""
+    out = []
+    for rule in nodes:
+        if rule.children is not None:
+            out.append(f'{rule.prelude}{{{serialize(rule.children)}}}')
+        elif rule.body is not None:
+            out.append(f'{rule.prelude}{{{minify_declarations(rule.body)}}}')
+        else:
+            out.append(f'{rule.prelude};')
+    return ''.join(out)
+
+
+def split_selectors(prelude):
+    """Virgülle ayrılmış seçici listesini, parantez içlerini bölmeden ayırır."""
+    parts, depth, start = [], 0, 0
+    for index, char in enumerate(prelude):
+        if char in '([':
+            depth += 1
+        elif char in ')]':
+            depth -= 1
+        elif char == ',' and depth == 0:
+            parts.append(prelude[start:index].strip())
+            start = index + 1
+    parts.append(prelude[start:].strip())
+    return [part for part in parts if part]
+
+
+def selector_requirements(selector):
+    """Bir seçicinin eşleşebilmesi için sayfada bulunması gereken sınıf, id ve etiketleri döndürür."""
+    stripped = SELECTOR_ATTR_RE.sub(' ', SELECTOR_PSEUDO_RE.sub(' ', selector))
+    classes = set(SELECTOR_CLASS_RE.findall(stripped))
+    ids = set(SELECTOR_ID_RE.findall(stripped))
+    without_names = SELECTOR_CLASS_RE.sub(' ', SELECTOR_ID_RE.sub(' ', stripped))
+    tags = {tag.lower() for tag in SELECTOR_TAG_RE.findall(without_names)}
+    return classes, ids, tags
+
+
+class UsedSelectors:
+    """Bir sayfada (veya sayfa kümesinde) kullanılan sınıf, id ve etiket adları."""
+
+    def __init__(self, classes=(), ids=(), tags=None, safelist=()):
+        # `safelist`: şablonlarda geçmese de kullanılmış sayılacak sınıf/id adları için regex listesi.
+        self.classes = set(classes)
+        self.ids = set(ids)
+        # `tags` None ise etiket kontrolü yapılmaz (JS/veritabanı kaynaklı taramalarda etiket bilinmez).
+        self.tags = set(tags) | ALWAYS_USED_TAGS if tags is not None else None
+        self.safelist = [re.compile(pattern) for pattern in safelist]
+
+    def update(self, other):
+        self.classes |= other.classes
+        self.ids |= other.ids
+        if self.tags is not None and other.tags is not None:
+            self.tags |= other.tags
+        else:
+            self.tags = None
+
+    def is_safelisted(self, name):
+        return any(pattern.search(name) for pattern in self.safelist)
+
+    def matches(self, selector):
+        classes, ids, tags = selector_requirements(selector)
+        if any(name not in self.classes and not self.is_safelisted(name) for name in classes):
+            return False
+        if any(name not in self.ids and not self.is_safelisted(name) for name in ids):
+            return False
+        return self.tags is None or tags <= self.tags
+
+
+def strip_template_syntax(text):
+    """Django şablon değişkenlerini siler, etiketleri boşluğa çevirir; `if` dallarındaki sınıflar korunur."""
+    return TEMPLATE_TAG_RE.sub(' ', TEMPLATE_VAR_RE.sub(' ', text))
+
+
+def extract_from_markup(markup, with_tags=True):
+    """HTML/Django şablon metnindeki sınıf, id ve etiket adlarını toplar."""
+    markup = strip_template_syntax(markup)
+    classes, ids = set(), set()
+    for _, value in CLASS_ATTR_RE.findall(markup):
+        classes.update(WORD_RE.findall(value))
+    for _, value in ID_ATTR_RE.findall(markup):
+        ids.update(WORD_RE.findall(value))
+    tags = {tag.lower() for tag in TAG_RE.findall(markup)} if with_tags else None
+    return UsedSelectors(classes, ids, tags)
+
+
+def extract_from_text(text):
+    """JS dosyası veya veritabanı değeri gibi serbest metindeki olası sınıf adlarını toplar."""
+    words = set(WORD_RE.findall(text))
+    return UsedSelectors(classes=words, ids=words, tags=None)
+
+
+def _referenced(name, text):
+    return re.search(r'(?<![\w-])' + re.escape(name) + r'(?![\w-])', text) is not None
+
+
+def filter_rules(nodes, used):
+    """
+    Sadece `used` ile eşleşen seçicileri içeren kuralları döndürür.
+    Kullanılmayan seçiciler seçici listesinden de çıkarılır; boş kalan at-rule'lar atılır.
+    """
+    kept = _filter(nodes, used)
+    kept_text = serialize(kept)
+    result = list(kept)
+    # @font-face ve @keyframes yalnızca tutulan kurallardan referans alıyorsa eklenir.
+    for rule in _collect_resources(nodes):
+        name = _resource_name(rule)
+        if name and _referenced(name, kept_text):
+            result.append(rule)
+    return result
+
+
+def _filter(nodes, used):
+    kept = []
+    for rule in nodes:
+        name = rule.at_name
+        if rule.children is not None:
+            children = _filter(rule.children, used)
+            if children:
+                kept.append(Rule(rule.prelude, children=children))
+        elif name is None and rule.body is not None:
+            selectors = [sel for sel in split_selectors(rule.prelude) if used.matches(sel)]
+            if selectors:
+                kept.append(Rule(','.join(selectors), body=rule.body))
+        elif name in ('import', 'namespace'):
+            # @charset satır içi veya birleştirilmiş çıktıda anlamsızdır ve atlanır.
+            kept.append(rule)
+    return kept
+
+
+def _collect_resources(nodes):
+    for rule in nodes:
+        if rule.children is not None:
+            yield from _collect_resources(rule.children)
+        elif rule.at_name in ('font-face', 'keyframes', '-webkit-keyframes'):
+            yield rule
+
+
+def _resource_name(rule):
+    if rule.at_name == 'font-face':
+        match = re.search(r'font-family\s*:\s*(["\']?)([^;"\']+)\1', rule.body or '')
+        return match.group(2).strip() if match else None
+    parts = rule.prelude.split(None, 1)
+    return parts[1].strip() if len(parts) > 1 else None
+
+
+def rewrite_urls(css_text, static_path):
+    """
+    `static_path` konumundaki bir stil dosyasındaki göreli `url(...)` değerlerini
+    STATIC_URL'e göre mutlak hale getirir; satır içi (inline) veya farklı dizine
+    yazılan CSS'in kaynakları bulabilmesi için gereklidir.
+    """
+    base_dir = posixpath.dirname(static_path)
+    static_url = settings.STATIC_URL if settings.STATIC_URL.startswith('/') else '/' + settings.STATIC_URL
+
+    def replace(match):
+        url = match.group(2).strip()
+        if url.startswith(('data:', 'http:', 'https:', '//', '/', '#')):
+            return match.group(0)
+        return f'url("{static_url}{posixpath.normpath(posixpath.join(base_dir, url))}")'
+
+    return URL_RE.sub(replace, css_text)
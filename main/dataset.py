@@ -0,0 +1,388 @@
+"""
+Performans çalışmaları için büyük, tekrarlanabilir sentetik veri seti.
+
+Aynı tohum, sayılar ve bitiş tarihi her seferinde aynı veriyi üretir. Satırlar
+açık birincil anahtarlarla ve `bulk_create` ile partiler halinde yazılır; bellekte
+sadece bir parti ve satır başına değil, nesne türü başına küçük diziler (yazı
+tarihleri, ürün fiyatları, sepeti olan kullanıcılar) tutulur. Toplu yüklemede
+sinyaller çalışmadığı için özetler, profiller ve sayaçlar burada doldurulur.
+"""
+import logging
+import random
+from array import array
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import connection, transaction
+from PIL import Image
+
+from .blog_stats import rebuild_counters
+from .comments import refresh_comment_count
+from .models import (
+    BlogPost, Category, Comment, DiscountCode, Order, OrderItem, PortfolioCategory, PortfolioImage,
+    PortfolioItem, Profile, Service, SiteSetting, Subscriber, Tag,
+)
+
+logger = logging.getLogger(__name__)
+
+# Tüm sentetik kullanıcıların şifresi; hash bir kez hesaplanır.
+DATASET_PASSWORD = 'dataset-password'
+PLACEHOLDER_IMAGE_COUNT = 12
+PLACEHOLDER_IMAGE_DIR = 'synthetic'
+
+ORDER_STATUS_WEIGHTS = {
+    'completed': 55,
+    'cart': 8,
+    'pending': 5,
+    'pending_iyzico_approval': 3,
+    'pending_paytr_approval': 3,
+    'payment_failed': 10,
+    'cancelled': 8,
+    'refunded': 5,
+    'partially_refunded': 3,
+}
+PAID_STATUSES = {'completed', 'refunded', 'partially_refunded'}
+
+WORDS = (
+    "proje tasarım yazılım kullanıcı deneyim performans veri sunucu mobil uygulama web site marka strateji "
+    "içerik analiz müşteri süreç geliştirme test güvenlik altyapı bulut ölçek hız arayüz ekip planlama "
+    "raporlama entegrasyon ödeme sepet kampanya sosyal medya arama optimizasyon görsel video animasyon"
+).split()
+CITIES = ('İstanbul', 'Ankara', 'İzmir', 'Bursa', 'Antalya', 'Konya', 'Adana', 'Eskişehir', 'Trabzon', 'Kayseri')
+FIRST_NAMES = ('Ayşe', 'Mehmet', 'Zeynep', 'Ahmet', 'Elif', 'Mustafa', 'Deniz', 'Can', 'Selin', 'Emre', 'Ece', 'Burak')
+LAST_NAMES = ('Yılmaz', 'Kaya', 'Demir', 'Şahin', 'Çelik', 'Yıldız', 'Aydın', 'Öztürk', 'Arslan', 'Doğan')
+
+
+@dataclass
+class DatasetSize:
+    users: int = 20_000
+    posts: int = 5_000
+    tags: int = 60
+    categories: int = 12
+    comments: int = 100_000
+    items: int = 1_000
+    images_per_item: int = 3
+    orders: int = 1_000_000
+    max_items_per_order: int = 4
+    subscribers: int = 50_000
+    discount_codes: int = 50
+
+    def scaled(self, factor):
+        """Sayıları `factor` ile çarpar; etiket/kategori gibi küçük sözlükler ve oranlar değişmez."""
+        fixed = {'tags', 'categories', 'images_per_item', 'max_items_per_order', 'discount_codes'}
+        return DatasetSize(**{
+            name: value if name in fixed else max(1, int(value * factor))
+            for name, value in vars(self).items()
+        })
+
+
+@contextmanager
+def explicit_timestamps(*models):
+    """auto_now/auto_now_add alanlarını geçici olarak kapatır; geçmiş tarihler olduğu gibi yazılır."""
+    fields = [
+        field for model in models for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False)
+    ]
+    saved = [(field, field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+def _batches(rows, size):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def placeholder_images(rng):
+    """MEDIA_ROOT altında tekrar kullanılan yer tutucu görseller; zaten varsa yeniden yazılmaz."""
+    directory = Path(settings.MEDIA_ROOT) / PLACEHOLDER_IMAGE_DIR
+    directory.mkdir(parents=True, exist_ok=True)
+    names = []
+    for index in range(PLACEHOLDER_IMAGE_COUNT):
+        name = f'{PLACEHOLDER_IMAGE_DIR}/placeholder-{index}.jpg'
+        path = Path(settings.MEDIA_ROOT) / name
+        color = (rng.randrange(256), rng.randrange(256), rng.randrange(256))
+        if not path.exists():
+            Image.new('RGB', (1200, 800), color).save(path, 'JPEG', quality=70)
+        names.append(name)
+    return names
+
+
+class DatasetGenerator:
+    def __init__(self, size, seed=1, until=None, days=730, batch_size=5000, progress=None):
+        self.size = size
+        self.seed = seed
+        self.rng = random.Random(seed)
+        until = until or datetime.now(dt_timezone.utc).date()
+        self.until = datetime.combine(until, time.min, tzinfo=dt_timezone.utc)
+        self.days = days
+        self.batch_size = batch_size
+        self.progress = progress or (lambda model, count: None)
+
+    # --- yardımcılar ---
+
+    def words(self, count):
+        return ' '.join(self.rng.choice(WORDS) for _ in range(count))
+
+    def moment(self, skew=1.0, after=None):
+        """[until - days, until) aralığında bir zaman; skew > 1 yakın tarihlere yığar."""
+        start = after or self.until - timedelta(days=self.days)
+        span = (self.until - start).total_seconds()
+        return self.until - timedelta(seconds=span * self.rng.random() ** skew)
+
+    def post_html(self, images):
+        """CKEditor 5 çıktısına benzeyen içerik: başlıklar, paragraflar, listeler, alıntı ve görsel."""
+        rng = self.rng
+        parts = []
+        for _ in range(rng.randint(3, 6)):
+            parts.append(f'<h2>{self.words(rng.randint(3, 7)).capitalize()}</h2>')
+            for _ in range(rng.randint(2, 4)):
+                sentence = self.words(rng.randint(25, 60)).capitalize()
+                parts.append(f'<p>{sentence}. <strong>{self.words(3)}</strong> <a href="https://example.com/{rng.randrange(1000)}">{self.words(2)}</a>.</p>')
+            if rng.random() < 0.4:
+                parts.append('<ul>' + ''.join(f'<li>{self.words(rng.randint(3, 8))}</li>' for _ in range(rng.randint(3, 5))) + '</ul>')
+            if rng.random() < 0.2:
+                parts.append(f'<blockquote><p>{self.words(rng.randint(12, 24)).capitalize()}.</p></blockquote>')
+            if rng.random() < 0.3:
+                image = rng.choice(images)
+                parts.append(f'<figure class="image"><img src="{settings.MEDIA_URL}{image}" alt="{self.words(2)}"><figcaption>{self.words(4)}</figcaption></figure>')
+        return ''.join(parts)
+
+    def _create(self, model, rows):
+        count = 0
+        for batch in _batches(rows, self.batch_size):
+            with transaction.atomic():
+                model.objects.bulk_create(batch, batch_size=self.batch_size)
+            count += len(batch)
+        self.progress(model, count)
+
+    # --- nesne türleri ---
+
+    def generate(self):
+        self.images = placeholder_images(self.rng)
+        with explicit_timestamps(BlogPost, Comment, PortfolioItem, Order, Subscriber):
+            self.site()
+            self.users()
+            self.blog()
+            self.portfolio()
+            self.discount_codes()
+            self.orders()
+            self.subscribers()
+        refresh_comment_count()
+        rebuild_counters()
+        if connection.vendor == 'sqlite':
+            # Sorgu planlayıcısı için tablo istatistikleri.
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE')
+
+    def site(self):
+        if not SiteSetting.objects.exists():
+            SiteSetting.objects.create(address='İstanbul', phone='+90 212 000 00 00', email='info@example.com')
+        self.services = [
+            Service.objects.create(
+                title=f'Hizmet {index}', slug=f'hizmet-{index}', description=self.words(40),
+                icon_class='bi-star', color_class='item-cyan',
+            ).pk
+            for index in range(1, 7)
+        ]
+
+    def users(self):
+        rng, size = self.rng, self.size
+        password = make_password(DATASET_PASSWORD)
+        self.user_joined = array('d')
+        self.staff_ids = list(range(1, min(10, size.users) + 1))
+
+        def users():
+            for pk in range(1, size.users + 1):
+                joined = self.moment(skew=0.8)
+                self.user_joined.append(joined.timestamp())
+                first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+                yield User(
+                    pk=pk, username=f'user{pk}', email=f'user{pk}@example.com', password=password,
+                    first_name=first, last_name=last, is_staff=pk in self.staff_ids, date_joined=joined,
+                    last_login=self.moment(skew=2.0, after=joined),
+                )
+
+        def profiles():
+            for pk in range(1, size.users + 1):
+                yield Profile(
+                    user_id=pk, city=rng.choice(CITIES), country='Türkiye',
+                    phone_number=f'+90 5{rng.randrange(10**9):09d}', address=self.words(5),
+                    postal_code=f'{rng.randrange(1, 82):02d}{rng.randrange(1000):03d}',
+                )
+
+        self._create(User, users())
+        self._create(Profile, profiles())
+
+    def blog(self):
+        rng, size = self.rng, self.size
+        self._create(Category, (
+            Category(pk=pk, name=f'Kategori {pk}', slug=f'kategori-{pk}') for pk in range(1, size.categories + 1)
+        ))
+        self._create(Tag, (Tag(pk=pk, name=f'etiket {pk}', slug=f'etiket-{pk}') for pk in range(1, size.tags + 1)))
+
+        self.post_created = array('d')
+
+        def posts():
+            for pk in range(1, size.posts + 1):
+                created = self.moment(skew=1.3)
+                self.post_created.append(created.timestamp())
+                title = self.words(rng.randint(4, 9)).capitalize()
+                post = BlogPost(
+                    pk=pk, title=title, slug=f'yazi-{pk}', content=self.post_html(self.images),
+                    author_id=rng.choice(self.staff_ids), category_id=rng.randint(1, size.categories),
+                    image=rng.choice(self.images), status='published' if rng.random() < 0.9 else 'draft',
+                    created_at=created, updated_at=created,
+                    meta_description=title if rng.random() < 0.3 else '',
+                )
+                post.excerpt = post.build_excerpt()
+                yield post
+
+        def post_tags():
+            for pk in range(1, size.posts + 1):
+                for tag_id in rng.sample(range(1, size.tags + 1), k=min(size.tags, rng.randint(1, 5))):
+                    yield BlogPost.tags.through(blogpost_id=pk, tag_id=tag_id)
+
+        def comments():
+            for pk in range(1, size.comments + 1):
+                # Eski (küçük id'li) yazılar daha çok yorum alır.
+                post_id = 1 + int(size.posts * rng.random() ** 2)
+                posted = datetime.fromtimestamp(self.post_created[post_id - 1], dt_timezone.utc)
+                name = f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}'
+                yield Comment(
+                    pk=pk, post_id=post_id, name=name, email=f'okur{pk}@example.com',
+                    body=self.words(rng.randint(8, 60)).capitalize() + '.', active=rng.random() < 0.9,
+                    created_at=self.moment(skew=1.5, after=posted),
+                )
+
+        self._create(BlogPost, posts())
+        self._create(BlogPost.tags.through, post_tags())
+        self._create(Comment, comments())
+
+    def portfolio(self):
+        rng, size = self.rng, self.size
+        categories = 8
+        self._create(PortfolioCategory, (
+            PortfolioCategory(pk=pk, name=f'Proje Türü {pk}', slug=f'proje-turu-{pk}') for pk in range(1, categories + 1)
+        ))
+        self.item_prices = array('d')
+
+        def items():
+            for pk in range(1, size.items + 1):
+                created = self.moment()
+                price = Decimal(rng.choice((250, 500, 750, 1000, 2500, 5000, 7500, 15000, 25000, 40000)))
+                self.item_prices.append(float(price))
+                yield PortfolioItem(
+                    pk=pk, title=self.words(rng.randint(2, 5)).title(), slug=f'proje-{pk}',
+                    short_description=self.words(12), long_description=self.words(rng.randint(80, 200)),
+                    client=f'{rng.choice(LAST_NAMES)} A.Ş.', category_id=rng.randint(1, categories),
+                    service_id=rng.choice(self.services), main_image=rng.choice(self.images), price=price,
+                    project_date=created.date(), created_at=created,
+                )
+
+        def images():
+            for item_id in range(1, size.items + 1):
+                for _ in range(size.images_per_item):
+                    yield PortfolioImage(portfolio_item_id=item_id, image=rng.choice(self.images))
+
+        self._create(PortfolioItem, items())
+        self._create(PortfolioImage, images())
+
+    def discount_codes(self):
+        rng = self.rng
+        self._create(DiscountCode, (
+            DiscountCode(
+                pk=pk, code=f'KOD{pk:03d}', discount_percentage=Decimal(rng.choice((5, 10, 15, 20, 25))),
+                valid_from=self.until - timedelta(days=self.days), valid_to=self.until + timedelta(days=365),
+                max_uses=rng.choice((0, 100, 1000)),
+            )
+            for pk in range(1, self.size.discount_codes + 1)
+        ))
+
+    def orders(self):
+        """Siparişler ve kalemleri aynı partide üretilir; sepet (status='cart') kullanıcı başına en fazla bir tane."""
+        rng, size = self.rng, self.size
+        statuses, weights = list(ORDER_STATUS_WEIGHTS), list(ORDER_STATUS_WEIGHTS.values())
+        has_cart = bytearray(size.users + 1)
+        item_pk = 0
+        order_count = item_count = 0
+
+        for start in range(1, size.orders + 1, self.batch_size):
+            orders, lines = [], []
+            for pk in range(start, min(start + self.batch_size, size.orders + 1)):
+                user_id = rng.randint(1, size.users)
+                status = rng.choices(statuses, weights)[0]
+                if status == 'cart':
+                    if has_cart[user_id]:
+                        status = 'completed'
+                    has_cart[user_id] = 1
+                joined = datetime.fromtimestamp(self.user_joined[user_id - 1], dt_timezone.utc)
+                created = self.moment(skew=0.7, after=joined)
+                method = rng.choice(('iyzico', 'iyzico', 'paytr', 'bank_transfer', 'cash'))
+
+                subtotal = Decimal(0)
+                for item_id in rng.sample(range(1, size.items + 1), k=min(size.items, rng.randint(1, size.max_items_per_order))):
+                    item_pk += 1
+                    quantity = 1 if rng.random() < 0.85 else 2
+                    price = Decimal(self.item_prices[item_id - 1])
+                    subtotal += price * quantity
+                    lines.append(OrderItem(pk=item_pk, order_id=pk, portfolio_item_id=item_id, price=price, quantity=quantity))
+
+                order = Order(
+                    pk=pk, user_id=user_id, status=status, created_at=created, updated_at=created,
+                    payment_method=None if status == 'cart' else method, currency='TRY',
+                )
+                if status != 'cart':
+                    order.billing_name = f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}'
+                    order.billing_email = f'user{user_id}@example.com'
+                    order.billing_city = rng.choice(CITIES)
+                    order.billing_address = self.words(5)
+                    if method == 'iyzico':
+                        order.iyzi_conversation_id = f'ORDER-{pk}'
+                    elif method == 'paytr':
+                        order.paytr_merchant_oid = f'NL{pk}'
+                if rng.random() < 0.1:
+                    order.discount_code_id = rng.randint(1, size.discount_codes)
+                    order.discount_amount = (subtotal * Decimal('0.10')).quantize(Decimal('0.01'))
+                if status in PAID_STATUSES:
+                    order.payment_date = created + timedelta(minutes=rng.randint(1, 30))
+                    order.total_paid = max(subtotal - order.discount_amount, Decimal(0))
+                    if status == 'refunded':
+                        order.refunded_amount = order.total_paid
+                    elif status == 'partially_refunded':
+                        order.refunded_amount = (order.total_paid / 2).quantize(Decimal('0.01'))
+                elif status == 'payment_failed':
+                    order.payment_error_message = 'Kart limiti yetersiz.'
+                orders.append(order)
+
+            with transaction.atomic():
+                Order.objects.bulk_create(orders, batch_size=self.batch_size)
+                OrderItem.objects.bulk_create(lines, batch_size=self.batch_size)
+            order_count += len(orders)
+            item_count += len(lines)
+            logger.debug("Siparişler: %s/%s", order_count, size.orders)
+        self.progress(Order, order_count)
+        self.progress(OrderItem, item_count)
+
+    def subscribers(self):
+        self._create(Subscriber, (
+            Subscriber(pk=pk, email=f'abone{pk}@example.com', created_at=self.moment(skew=0.8))
+            for pk in range(1, self.size.subscribers + 1)
+        ))
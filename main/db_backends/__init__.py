@@ -0,0 +1,6 @@
+"""
+Bağlantı metrikleri eklenmiş veritabanı motorları (bkz. main/db_metrics.py).
+
+settings.DATABASES içinde ENGINE olarak 'main.db_backends.mysql' veya
+'main.db_backends.sqlite3' kullanılır; davranış Django'nun motorlarıyla aynıdır.
+"""
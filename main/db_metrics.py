@@ -0,0 +1,102 @@
+"""
+Veritabanı bağlantı metrikleri.
+
+`main.db_backends.*` motorları Django'nun MySQL/SQLite motorlarını
+`ConnectionMetricsMixin` ile sarar: yeni bağlantı kurulum süresi (MySQL'de TLS
+el sıkışması dahil) ve bir isteğin kullandığı bağlantının yeni mi yoksa kalıcı
+bağlantıdan (CONN_MAX_AGE) mı geldiği kaydedilir.
+
+Yeniden kullanım oranı istek bazında hesaplanır: her istekte kullanılan her
+bağlantı ya istek içinde kurulmuştur (`request_connects`) ya da önceki bir
+istekten kalmıştır (`request_reuses`). `connects` ise istek dışındakiler dahil
+süreçte kurulan tüm bağlantılardır ve sadece kurulum süresi için kullanılır.
+Süreç toplamları `connection_stats()` ile okunur ve /metrics/ altında
+yayınlanır (metrics.py); profillenen isteklerin log satırı o isteğin
+bağlantılarını da içerir (profiling.py).
+"""
+import logging
+import threading
+import time
+from collections import Counter
+
+logger = logging.getLogger(__name__)
+
+_request = threading.local()
+_totals = Counter()
+_totals_lock = threading.Lock()
+
+
+def _add_totals(**values):
+    with _totals_lock:
+        _totals.update(values)
+
+
+class ConnectionMetricsMixin:
+    """DatabaseWrapper için: bağlantı kurulum süresini ve istek başına kullanılan bağlantıları sayar."""
+
+    def connect(self):
+        started = time.perf_counter()
+        super().connect()
+        elapsed = time.perf_counter() - started
+        _add_totals(connects=1, connect_seconds=elapsed)
+        if getattr(_request, 'active', False):
+            _request.connects[self.alias] = _request.connects.get(self.alias, 0.0) + elapsed
+
+    def close_if_health_check_failed(self):
+        had_connection = self.connection is not None
+        super().close_if_health_check_failed()
+        if had_connection and self.connection is None:
+            _add_totals(health_check_failures=1)
+
+    def ensure_connection(self):
+        if getattr(_request, 'active', False):
+            _request.aliases.add(self.alias)
+        super().ensure_connection()
+
+
+def connection_stats():
+    """
+    Süreç açıldığından beri: tüm yeni bağlantılar ve kurulum süreleri, isteklerde kullanılan yeni ve
+    yeniden kullanılan bağlantılar, başarısız sağlık kontrolleri.
+    """
+    with _totals_lock:
+        stats = dict(_totals)
+    used = stats.get('request_connects', 0) + stats.get('request_reuses', 0)
+    stats['reuse_rate'] = stats.get('request_reuses', 0) / used if used else None
+    return stats
+
+
+def request_connections():
+    """
+    Devam eden isteğin o ana kadar kullandığı bağlantılar: (yeni, yeniden kullanılan, kurulum süresi sn).
+    `ConnectionMetricsMiddleware` dışında None.
+    """
+    if not getattr(_request, 'active', False):
+        return None
+    new = _request.aliases & set(_request.connects)
+    return len(new), len(_request.aliases - new), sum(_request.connects.values())
+
+
+class ConnectionMetricsMiddleware:
+    """İstek başına hangi bağlantıların yeni kurulduğunu, ne kadar sürdüğünü ve hangilerinin yeniden kullanıldığını loglar."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        _request.active = True
+        _request.aliases = set()
+        _request.connects = {}
+        try:
+            return self.get_response(request)
+        finally:
+            new, reused, connect_seconds = request_connections()
+            _request.active = False
+            if new or reused:
+                _add_totals(request_connects=new, request_reuses=reused)
+                # Her istekte çalışır; DEBUG kapalıysa argümanlar da hesaplanmaz.
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug(
+                        "DB bağlantıları %s: %s yeni (%.1f ms), %s yeniden kullanıldı",
+                        request.path, new, connect_seconds * 1000, reused,
+                    )
@@ -0,0 +1,92 @@
+"""
+Okuma kopyası (replica) yönlendirmesi.
+
+DATABASE_REPLICA_READS açıkken sadece `ReplicaRoutingMiddleware`'in okuma amaçlı
+işaretlediği istekler (GET/HEAD) okumalarını REPLICA_DATABASE'e gönderir.
+Yazmalar, sipariş/ödeme ve kimlik doğrulama modellerinin okumaları, transaction
+içindeki okumalar ve istek dışındaki işler (yönetim komutları, cron) her zaman
+ana veritabanındadır.
+
+Bir istek yazma yaptığında tarayıcıya kısa ömürlü bir çerez bırakılır; çerez
+geçerli olduğu sürece o oturumun istekleri de ana veritabanından okur. Böylece
+kullanıcı replika gecikmesi yüzünden kendi yazdığını (yorum, sepet, profil)
+kaybolmuş görmez. Ziyaretçinin kendi yazması olmayan arka plan yazmaları
+(örn. görüntülenme sayaçlarının flush'ı) `untracked_writes` içinde yapılır ve
+çerez bırakmaz.
+"""
+import threading
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+REPLICA_DATABASE = 'replica'
+PRIMARY_PIN_COOKIE = 'db_primary'
+
+# Okumaları da her zaman ana veritabanından yapılan uygulamalar ve modeller.
+PRIMARY_APPS = {'auth', 'sessions', 'admin'}
+PRIMARY_MODELS = {'main.order', 'main.orderitem', 'main.discountcode', 'main.profile'}
+
+_state = threading.local()
+
+
+def replica_enabled():
+    return getattr(settings, 'DATABASE_REPLICA_READS', False) and REPLICA_DATABASE in settings.DATABASES
+
+
+def _reads_from_replica():
+    return getattr(_state, 'replica_reads', False) and not connections[DEFAULT_DB_ALIAS].in_atomic_block
+
+
+@contextmanager
+def untracked_writes():
+    """Bloktaki yazmalar isteği yapan oturumu ana veritabanına sabitlemez."""
+    wrote = getattr(_state, 'wrote', False)
+    try:
+        yield
+    finally:
+        _state.wrote = wrote
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if not replica_enabled() or not _reads_from_replica():
+            return DEFAULT_DB_ALIAS
+        if model._meta.app_label in PRIMARY_APPS or model._meta.label_lower in PRIMARY_MODELS:
+            return DEFAULT_DB_ALIAS
+        return REPLICA_DATABASE
+
+    def db_for_write(self, model, **hints):
+        _state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replika ana veritabanının kopyasıdır; iki taraftaki nesneler aynı veriyi gösterir.
+        databases = {DEFAULT_DB_ALIAS, REPLICA_DATABASE}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+
+class ReplicaRoutingMiddleware:
+    """GET/HEAD isteklerinin okumalarını replikaya açar; yazma yapan oturumu bir süre ana veritabanına sabitler."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        _state.wrote = False
+        _state.replica_reads = (
+            request.method in ('GET', 'HEAD') and PRIMARY_PIN_COOKIE not in request.COOKIES
+        )
+        try:
+            response = self.get_response(request)
+        finally:
+            wrote = _state.wrote
+            _state.wrote = _state.replica_reads = False
+        if wrote or request.method not in ('GET', 'HEAD', 'OPTIONS'):
+            response.set_cookie(
+                PRIMARY_PIN_COOKIE, '1', max_age=getattr(settings, 'DATABASE_PRIMARY_PIN_SECONDS', 10),
+                httponly=True, samesite='Lax', secure=request.is_secure(),
+            )
+        return response
@@ -0,0 +1,118 @@
+"""
+İstek dışında çalıştırılan yeniden üretim işleri.
+
+Sinyaller dosya yazan veya tüm tabloyu okuyan işleri (ikon alt kümesi, temizlenmiş
+CSS, site haritası bölümleri, benzer yazılar) admin isteğinde çalıştırmaz; `schedule()`
+commit sonrasında DeferredTask tablosuna bir kayıt ekler, işlem geri alınırsa kayıt eklenmez. Aynı
+ad ve argümanla bekleyen bir kayıt varsa yenisi eklenmez. Aynı işlemdeki tekrarlı
+çağrılar (örn. admin'de toplu silme) `on_commit_batched` ile tek bir commit
+sonrası çağrıda birleştirilir.
+
+Bekleyen işler `run_deferred_tasks` komutu ile çalıştırılır (PythonAnywhere'de
+zamanlanmış görev olarak, örn. birkaç dakikada bir); aynı addaki kayıtların
+argümanları tek bir çağrıda birleştirilir.
+"""
+import logging
+import threading
+import weakref
+from collections import defaultdict
+from functools import partial
+
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+from .models import DeferredTask
+
+logger = logging.getLogger(__name__)
+
+# İş adı -> argüman kümesini (str) alan fonksiyon.
+TASKS = {
+    'icons': 'main.icons.rebuild_icon_subset',
+    'css': 'main.purge.rebuild_purged_css',
+    'sitemap': 'main.sitemaps.rebuild_sections',
+    'related-posts': 'main.related_posts.refresh_related_posts',
+}
+
+_pending = threading.local()
+
+
+class _Batch:
+    """Bir işlemde aynı anahtar için biriken öğeler; commit sonrasında `func(items)` ile tek seferde işlenir."""
+
+    def __init__(self, key, func):
+        self.key = key
+        self.func = func
+        self.items = set()
+
+    def __call__(self):
+        _batches().pop(self.key, None)
+        self.func(self.items)
+
+
+def _batches():
+    # Bekleyen çağrıya güçlü referansı sadece Django'nun on_commit kuyruğu tutar. İşlem (veya çağrının
+    # kaydedildiği savepoint) geri alınırsa Django çağrıyı kuyruktan atar ve kayıt buradan da düşer.
+    batches = getattr(_pending, 'batches', None)
+    if batches is None:
+        batches = _pending.batches = weakref.WeakValueDictionary()
+    return batches
+
+
+def on_commit_batched(key, func, *items, using=None):
+    """
+    `func(items)` çağrısını commit sonrasına erteler. Aynı bağlantıda, aynı işlem içinde aynı
+    anahtarla yapılan çağrılar tek bir `on_commit` kaydında birleştirilir.
+    """
+    connection = transaction.get_connection(using)
+    batches = _batches()
+    batch_key = (connection.alias, key)
+    batch = batches.get(batch_key) if connection.in_atomic_block else None
+    if batch is not None:
+        batch.items.update(items)
+        return
+    batch = _Batch(batch_key, func)
+    batch.items.update(items)
+    batches[batch_key] = batch
+    # İşlem dışında on_commit çağrıyı hemen çalıştırır; öğeler bu yüzden önceden eklenir.
+    transaction.on_commit(batch, using=using)
+
+
+def _enqueue(name, arguments):
+    DeferredTask.objects.bulk_create(
+        [DeferredTask(name=name, argument=argument) for argument in sorted(arguments)], ignore_conflicts=True,
+    )
+
+
+def schedule(name, *arguments):
+    """`name` işini verilen argümanlarla (argümansız işlerde boş) commit sonrasında kuyruğa ekler."""
+    if name not in TASKS:
+        raise ValueError(f"Unknown deferred task: {name!r}")
+    on_commit_batched(f'deferred:{name}', partial(_enqueue, name), *(str(argument) for argument in arguments or ('',)))
+
+
+def run_pending(names=None):
+    """Bekleyen işleri çalıştırır. {iş adı: (argüman sayısı, başarılı mı)} döndürür."""
+    tasks = DeferredTask.objects.all()
+    if names:
+        tasks = tasks.filter(name__in=names)
+    pending = defaultdict(dict)
+    for pk, name, argument in tasks.values_list('pk', 'name', 'argument'):
+        pending[name][argument] = pk
+
+    results = {}
+    for name, entries in pending.items():
+        # Kayıtlar iş çalışmadan önce silinir; çalışırken gelen yeni istekler kaybolmaz, bir sonraki turda işlenir.
+        DeferredTask.objects.filter(pk__in=entries.values()).delete()
+        if name not in TASKS:
+            logger.warning("Bilinmeyen ertelenmiş iş atlandı: %s", name)
+            continue
+        arguments = {argument for argument in entries if argument}
+        try:
+            import_string(TASKS[name])(arguments)
+        except Exception:
+            logger.exception("Ertelenmiş iş başarısız, tekrar denenecek: %s %s", name, sorted(arguments))
+            _enqueue(name, list(entries))
+            results[name] = (len(entries), False)
+        else:
+            results[name] = (len(entries), True)
+    return results
@@ -0,0 +1,147 @@
+"""
+Blog için RSS ve Atom akışları (tüm site ve kategori bazında).
+
+Akış içeriği kayıtta üretilen `BlogPost.excerpt` alanından okunur; yazı
+içeriği (CKEditor HTML'i) sorgulanmaz. Üretilen XML akış sürümü değişene kadar
+önbellekte tutulur ve ETag / Last-Modified ile sunulur; bir BlogPost veya
+Category değiştiğinde, işlem commit edildikten sonra sürüm güncellenir
+(signals.py), akış bir sonraki istekte yeniden üretilir. Sürüm istek başına bir
+kez okunur: önbellek anahtarı ve doğrulayıcılar aynı sürümden üretilir ve sürüm
+içerikten önce okunduğu için bir sürümün anahtarına eski satırlardan üretilmiş
+bir akış yazılmaz.
+"""
+import hashlib
+from datetime import datetime, timezone as dt_timezone
+
+from django.contrib.syndication.views import Feed
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils.feedgenerator import Atom1Feed
+from django.utils.translation import get_language, gettext_lazy as _
+from django.views.decorators.http import condition
+
+from .conditional import FEED_VERSION_KEY, content_version
+from .metrics import cache_lookup
+from .models import BlogPost, Category
+
+FEED_ITEM_LIMIT = 20
+FEED_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+def _published_posts():
+    return (
+        BlogPost.objects.filter(status='published')
+        .select_related('author', 'category')
+        .only(
+            'title', 'slug', 'excerpt', 'created_at', 'updated_at',
+            'author__username', 'author__first_name', 'author__last_name', 'category__name',
+        )
+        .order_by('-created_at')
+    )
+
+
+class LatestPostsFeed(Feed):
+    title = _("Novusliva Blog")
+    description = _("The latest posts from the Novusliva blog.")
+
+    def link(self):
+        return reverse('blog')
+
+    def items(self):
+        return _published_posts()[:FEED_ITEM_LIMIT]
+
+    def item_title(self, item):
+        return item.title
+
+    def item_description(self, item):
+        return item.excerpt
+
+    def item_link(self, item):
+        return item.get_absolute_url()
+
+    def item_pubdate(self, item):
+        return item.created_at
+
+    def item_updateddate(self, item):
+        return item.updated_at
+
+    def item_author_name(self, item):
+        return item.author.get_full_name() or item.author.username
+
+    def item_categories(self, item):
+        return [item.category.name] if item.category else []
+
+
+class LatestPostsAtomFeed(LatestPostsFeed):
+    feed_type = Atom1Feed
+    subtitle = LatestPostsFeed.description
+
+
+class CategoryPostsFeed(LatestPostsFeed):
+    def get_object(self, request, category_slug):
+        return get_object_or_404(Category, slug=category_slug)
+
+    def title(self, obj):
+        return f"{LatestPostsFeed.title} - {obj.name}"
+
+    def description(self, obj):
+        return LatestPostsFeed.description
+
+    def link(self, obj):
+        return reverse('posts_by_category', kwargs={'category_slug': obj.slug})
+
+    def items(self, obj):
+        return _published_posts().filter(category=obj)[:FEED_ITEM_LIMIT]
+
+
+class CategoryPostsAtomFeed(CategoryPostsFeed):
+    feed_type = Atom1Feed
+
+    def subtitle(self, obj):
+        return LatestPostsFeed.description
+
+
+def _feed_key(request):
+    # Mutlak URL'ler istek host'una, başlıklar dile göre üretilir.
+    return f'{request.get_host()}|{request.path}|{get_language()}'
+
+
+def _feed_version(request):
+    if not hasattr(request, '_feed_version'):
+        request._feed_version = content_version(FEED_VERSION_KEY)
+    return request._feed_version
+
+
+def _feed_etag(request, *args, **kwargs):
+    raw = f'{_feed_key(request)}|{_feed_version(request)!r}'
+    return hashlib.md5(raw.encode()).hexdigest()
+
+
+def _feed_last_modified(request, *args, **kwargs):
+    return datetime.fromtimestamp(_feed_version(request), dt_timezone.utc)
+
+
+def cached_feed(feed):
+    """Akışı, sürüm değişene kadar önbellekten ve koşullu GET ile sunan görünüm."""
+
+    @condition(etag_func=_feed_etag, last_modified_func=_feed_last_modified)
+    def view(request, *args, **kwargs):
+        key = f'feed:{_feed_etag(request)}'
+        cached = cache.get(key)
+        cache_lookup('feed', cached is not None)
+        if cached is None:
+            response = feed(request, *args, **kwargs)
+            cached = (response.content, response['Content-Type'])
+            cache.set(key, cached, FEED_CACHE_TIMEOUT)
+        content, content_type = cached
+        return HttpResponse(content, content_type=content_type)
+
+    return view
+
+
+latest_posts_rss = cached_feed(LatestPostsFeed())
+latest_posts_atom = cached_feed(LatestPostsAtomFeed())
+category_posts_rss = cached_feed(CategoryPostsFeed())
+category_posts_atom = cached_feed(CategoryPostsAtomFeed())
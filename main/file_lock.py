@@ -0,0 +1,30 @@
+"""
+Süreçler arası dosya kilidi.
+
+Aynı dizindeki dosyaları oku-değiştir-yaz ile güncelleyen işler (site haritası
+manifest'i, kapanan süreçlerin metrik dosyalarının birleştirilmesi) farklı worker
+süreçlerinde veya cron'da aynı anda çalışabilir. `file_lock` bir kilit dosyası
+üzerinde özel (exclusive) `flock` alır; kilit süreç kapanınca da bırakılır.
+fcntl olmayan platformlarda (Windows'ta yerel geliştirme) kilit alınmaz.
+"""
+import os
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+@contextmanager
+def file_lock(path):
+    """Blok boyunca `path` kilit dosyasını özel olarak tutar; aynı kilidi bekleyen süreçler sıraya girer."""
+    os.makedirs(os.path.dirname(os.fspath(path)) or '.', exist_ok=True)
+    with open(path, 'a') as file:
+        if fcntl is not None:
+            fcntl.flock(file.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(file.fileno(), fcntl.LOCK_UN)
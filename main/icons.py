@@ -0,0 +1,161 @@
+"""
+bootstrap-icons font alt kümesi (subset).
+
+Şablonlarda, main.js'te ve veritabanında (Service.icon_class, Feature.icon_class)
+kullanılan `bi-*` ikonlarını toplar ve sadece bu glifleri içeren küçük bir WOFF2
+fontu ile eşleşen CSS'i üretir. fontTools ve brotli sadece üretim sırasında
+gereklidir; sayfa render'ı bu paketlere bağımlı değildir.
+"""
+import hashlib
+import io
+import json
+import logging
+import os
+import re
+from contextlib import contextmanager
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+
+from .assets import ICON_SUBSET_DIR, ICON_SUBSET_MANIFEST, ICONS_STYLESHEET
+
+ICON_NAME_RE = re.compile(r'(?<![\w-])bi-([a-z0-9]+(?:-[a-z0-9]+)*)')
+ICON_SOURCE_FONT = 'assets/vendor/bootstrap-icons/fonts/bootstrap-icons.woff2'
+ICON_CODEPOINTS = 'assets/vendor/bootstrap-icons/bootstrap-icons.json'
+ICON_SCRIPT_SOURCES = ['assets/js/main.js']
+
+BASE_RULE = (
+    '.bi::before,[class^="bi-"]::before,[class*=" bi-"]::before{display:inline-block;'
+    'font-family:bootstrap-icons !important;font-style:normal;font-weight:normal !important;'
+    'font-variant:normal;text-transform:none;line-height:1;vertical-align:-.125em;'
+    '-webkit-font-smoothing:antialiased;-moz-osx-font-smoothing:grayscale}'
+)
+
+
+def icon_names_in(text):
+    return set(ICON_NAME_RE.findall(text or ''))
+
+
+def _read_static(path):
+    absolute = finders.find(path)
+    if not absolute:
+        raise FileNotFoundError(path)
+    return Path(absolute)
+
+
+def database_icon_names():
+    from .models import Feature, Service
+
+    values = list(Service.objects.values_list('icon_class', flat=True))
+    values += list(Feature.objects.values_list('icon_class', flat=True))
+    return icon_names_in(' '.join(value for value in values if value))
+
+
+def collect_used_icons(include_database=True):
+    """Şablonlar, site JS'i ve (isteğe bağlı) veritabanında geçen ikon adlarını döndürür."""
+    names = set()
+    for template_dir in settings.TEMPLATES[0]['DIRS']:
+        for path in Path(template_dir).rglob('*.html'):
+            names |= icon_names_in(path.read_text(encoding='utf-8'))
+    for path in ICON_SCRIPT_SOURCES:
+        names |= icon_names_in(_read_static(path).read_text(encoding='utf-8'))
+    if include_database:
+        names |= database_icon_names()
+    return names
+
+
+def output_dirs():
+    """Alt küme hem kaynak statik dizine hem de (varsa) collectstatic hedefine yazılır."""
+    dirs = [Path(settings.STATICFILES_DIRS[0])]
+    if settings.STATIC_ROOT and Path(settings.STATIC_ROOT).is_dir():
+        dirs.append(Path(settings.STATIC_ROOT))
+    return dirs
+
+
+def subset_manifest():
+    """Mevcut alt kümedeki ikon adları; alt küme hiç üretilmemişse None."""
+    path = finders.find(ICON_SUBSET_MANIFEST)
+    if not path:
+        return None
+    with open(path, encoding='utf-8') as manifest:
+        return set(json.load(manifest)['icons'])
+
+
+@contextmanager
+def _quiet_fonttools():
+    # fontTools her tablo için INFO kaydı basar; sadece üretim sırasında susturulur.
+    fonttools_logger = logging.getLogger('fontTools')
+    level = fonttools_logger.level
+    fonttools_logger.setLevel(logging.WARNING)
+    try:
+        yield
+    finally:
+        fonttools_logger.setLevel(level)
+
+
+def build_icon_subset(names, targets=None):
+    """
+    Verilen ikonlar için WOFF2 font ve CSS üretir.
+    (bilinen ikonlar, bilinmeyen adlar, font boyutu) döndürür.
+    """
+    with _quiet_fonttools():
+        return _build_icon_subset(names, targets)
+
+
+def _build_icon_subset(names, targets):
+    from fontTools import subset
+    from fontTools.ttLib import TTFont
+
+    codepoints = json.loads(_read_static(ICON_CODEPOINTS).read_text(encoding='utf-8'))
+    known = sorted(name for name in names if name in codepoints)
+    unknown = sorted(name for name in names if name not in codepoints)
+
+    options = subset.Options()
+    options.flavor = 'woff2'
+    options.layout_features = []
+    font = TTFont(str(_read_static(ICON_SOURCE_FONT)))
+    subsetter = subset.Subsetter(options)
+    subsetter.populate(unicodes=[codepoints[name] for name in known])
+    subsetter.subset(font)
+    buffer = io.BytesIO()
+    font.flavor = 'woff2'
+    font.save(buffer)
+    font_bytes = buffer.getvalue()
+
+    # İçerik hash'i dosya adında; font değiştiğinde tarayıcı önbelleği eski glifleri göstermez.
+    font_name = f'bootstrap-icons.{hashlib.sha256(font_bytes).hexdigest()[:12]}.woff2'
+    css = (
+        f'@font-face{{font-display:block;font-family:"bootstrap-icons";'
+        f'src:url("./{font_name}") format("woff2")}}'
+        + BASE_RULE
+        + ''.join(f'.bi-{name}::before{{content:"\\{codepoints[name]:x}"}}' for name in known)
+    )
+    # CSS de içerik hash'li; yeni bir ikon eklendiğinde tarayıcılar ve CDN'ler eski CSS'i sunmaya devam etmez.
+    css_name = f'bootstrap-icons.{hashlib.sha256(css.encode("utf-8")).hexdigest()[:12]}.css'
+    manifest = json.dumps({'icons': known, 'font': font_name, 'css': css_name, 'source': ICONS_STYLESHEET}, indent=2)
+
+    for root in targets or output_dirs():
+        directory = root / ICON_SUBSET_DIR
+        directory.mkdir(parents=True, exist_ok=True)
+        # Eski font ve CSS dosyaları silinmez: önbellekteki eski sayfalar hâlâ onlara başvurabilir.
+        (directory / font_name).write_bytes(font_bytes)
+        (directory / css_name).write_text(css, encoding='utf-8')
+        # Manifest en son yazılır; sayfalar yeni CSS adını ancak dosyalar hazır olduğunda görür.
+        manifest_path = directory / ICON_SUBSET_MANIFEST.rsplit('/', 1)[-1]
+        tmp_path = manifest_path.with_name(f'.{manifest_path.name}.tmp')
+        tmp_path.write_text(manifest, encoding='utf-8')
+        os.replace(tmp_path, manifest_path)
+
+    return known, unknown, len(font_bytes)
+
+
+def rebuild_icon_subset(arguments=()):
+    """
+    Ertelenmiş iş ('icons'): alt kümeyi veritabanındaki güncel ikonlarla yeniden üretir.
+    Mevcut alt kümedeki ikonlar korunur (komutla `--extra` verilmiş olanlar dahil).
+    """
+    current = subset_manifest()
+    if current is None:
+        return
+    build_icon_subset(collect_used_icons() | current)
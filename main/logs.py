@@ -0,0 +1,196 @@
+"""
+Bloklamayan, yapılandırılmış loglama.
+
+`QueueHandler` kayıtları sınırlı bir kuyruğa koyar; asıl handler (konsol, dosya)
+arka plandaki bir `QueueListener` thread'inde çalışır. İstek thread'inde sadece
+mesaj argümanları birleştirilir (kuyrukta beklerken değişebilecek nesneler o
+anki halleriyle yazılsın diye) ve kaydın kopyası kuyruğa girer; JSON
+biçimlendirme ve yazma listener thread'inde yapılır. Argümanları `LazyArgument`
+olan kayıtların mesajı da listener thread'inde birleştirilir. Kuyruk doluysa kayıt
+beklemeden atılır ve `dropped_records()` sayacı artar. Süreç fork edildiğinde
+(örn. ön yüklemeli worker'lar) çocuk süreç kendi kuyruğu ve listener thread'i
+ile devam eder.
+
+`JsonFormatter` her kaydı tek satır JSON olarak yazar; `RequestIdMiddleware`
+isteğe bir kimlik atar (gelen `X-Request-ID` geçerliyse o kullanılır) ve
+`RequestIdFilter` bunu kayıtlara ekler. `DebugSamplingFilter` DEBUG kayıtlarının
+sadece bir kısmını geçirir.
+
+Bu modül LOGGING yapılandırılırken, uygulamalar yüklenmeden içe aktarılır;
+model veya başka `main` modülü içe aktarmamalıdır.
+"""
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import re
+import threading
+import uuid
+from datetime import datetime, timezone
+
+from django.utils.module_loading import import_string
+
+REQUEST_ID_HEADER = 'X-Request-ID'
+# Dışarıdan gelen kimlikler loglara yazılır; sadece kısa, güvenli karakterler kabul edilir.
+REQUEST_ID_PATTERN = re.compile(r'^[A-Za-z0-9._-]{1,64}$')
+
+_request = threading.local()
+_dropped = 0
+_dropped_lock = threading.Lock()
+
+# LogRecord'un kendi alanları; geri kalanlar `extra=` ile verilmiştir ve JSON'a eklenir.
+# django.request'in eklediği istek nesnesi yazılmaz (yol zaten mesajdadır).
+_RECORD_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime', 'request_id', 'request'}
+
+
+def get_request_id():
+    """Bu thread'de işlenen isteğin kimliği; istek dışında None."""
+    return getattr(_request, 'id', None)
+
+
+def dropped_records():
+    """Kuyruk dolu olduğu için atılan kayıt sayısı (süreç açıldığından beri)."""
+    return _dropped
+
+
+class LazyArgument:
+    """
+    Metni pahalı üretilen log argümanlarının temel sınıfı. Kaydın tüm argümanları bu sınıftansa
+    `QueueHandler` mesajı istek thread'inde birleştirmez; `__str__` listener thread'inde, sadece
+    kayıt yazılırken çağrılır. Alt sınıflar kayıt kuyruğa girdikten sonra değişmeyecek veriden üretmelidir.
+    """
+
+    def __str__(self):
+        raise NotImplementedError
+
+
+class RequestIdMiddleware:
+    """İsteğe kimlik atar, `request.request_id` ve yanıtın `X-Request-ID` başlığı olarak verir."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        incoming = request.headers.get(REQUEST_ID_HEADER, '')
+        request.request_id = incoming if REQUEST_ID_PATTERN.match(incoming) else uuid.uuid4().hex
+        _request.id = request.request_id
+        try:
+            response = self.get_response(request)
+        finally:
+            _request.id = None
+        response[REQUEST_ID_HEADER] = request.request_id
+        return response
+
+
+class RequestIdFilter(logging.Filter):
+    """Kayda `request_id` ekler; istek thread'inde (kuyruğa girmeden önce) çalışmalıdır."""
+
+    def filter(self, record):
+        # django.request 4xx/5xx kayıtlarını middleware zincirinden sonra yazar; istek kayıtta bulunur.
+        request_id = getattr(getattr(record, 'request', None), 'request_id', None)
+        record.request_id = request_id or get_request_id()
+        return True
+
+
+class DebugSamplingFilter(logging.Filter):
+    """DEBUG kayıtlarının `rate` oranında bir kısmını geçirir; diğer seviyelere dokunmaz."""
+
+    def __init__(self, rate=1.0):
+        super().__init__()
+        self.rate = float(rate)
+
+    def filter(self, record):
+        return record.levelno > logging.DEBUG or self.rate >= 1 or random.random() < self.rate
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        data = {
+            'time': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'request_id': getattr(record, 'request_id', None),
+            'process': record.process,
+            'thread': record.threadName,
+        }
+        data.update((key, value) for key, value in vars(record).items() if key not in _RECORD_ATTRS)
+        if record.exc_info:
+            data['exc_info'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            data['exc_info'] = record.exc_text
+        if record.stack_info:
+            data['stack_info'] = self.formatStack(record.stack_info)
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+class QueueHandler(logging.handlers.QueueHandler):
+    """
+    Kayıtları kuyruğa koyar; `handler_class` (varsayılan StreamHandler) arka plan thread'inde yazar.
+
+    LOGGING içinde `formatter` ve diğer anahtarlar asıl handler'a aktarılır:
+    {'class': 'main.logs.QueueHandler', 'handler_class': 'logging.FileHandler', 'filename': ...}
+    """
+
+    def __init__(self, handler_class='logging.StreamHandler', queue_size=10000, **handler_kwargs):
+        super().__init__(queue.Queue(queue_size))
+        self.queue_size = queue_size
+        self.target = import_string(handler_class)(**handler_kwargs)
+        self._stopped = False
+        self._start_listener()
+        atexit.register(self._stop)
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._after_fork)
+
+    def _start_listener(self):
+        self.listener = logging.handlers.QueueListener(self.queue, self.target, respect_handler_level=True)
+        self.listener.start()
+
+    def _after_fork(self):
+        # Listener thread'i çocuk sürece geçmez ve kuyruğun kilitleri fork anında tutuluyor olabilir;
+        # çocuk yeni bir kuyruk ve thread ile başlar. Ebeveynin kuyruğundakileri ebeveyn yazar.
+        if not self._stopped:
+            self.queue = queue.Queue(self.queue_size)
+            self._start_listener()
+
+    def setFormatter(self, fmt):
+        # Biçimlendirme listener thread'inde, asıl handler'da yapılır.
+        self.target.setFormatter(fmt)
+
+    def prepare(self, record):
+        # Üst sınıf kaydı burada tamamen biçimlendirir; burada sadece mesaj birleştirilir, JSON listener'da
+        # üretilir. Kayıt kopyalanır: aynı kaydı işleyen diğer handler'lar argümanları değişmemiş görür.
+        record = copy.copy(record)
+        if not (record.args and isinstance(record.args, tuple)
+                and all(isinstance(arg, LazyArgument) for arg in record.args)):
+            record.message = record.getMessage()
+            record.msg = record.message
+            record.args = None
+        if record.exc_info:
+            # Traceback'teki çerçeveler kuyrukta tutulmaz; metni şimdi alınır.
+            record.exc_text = record.exc_text or logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        global _dropped
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with _dropped_lock:
+                _dropped += 1
+
+    def _stop(self):
+        # Hem atexit hem logging.shutdown (close) çağırır; kuyruk bir kez boşaltılır.
+        if not self._stopped:
+            self._stopped = True
+            self.listener.stop()
+
+    def close(self):
+        self._stop()
+        self.target.close()
+        super().close()
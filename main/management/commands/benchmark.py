@@ -0,0 +1,75 @@
+import json
+import os
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from main.benchmark import JOURNEYS, PERCENTILES, Benchmark, compare, load_report
+
+
+class Command(BaseCommand):
+    help = (
+        "Ağırlıklı kullanıcı yolculuklarını (gezinme, blog okuma, sepete ekleyip ödeme) eşzamanlı "
+        "işçilerle süreç içinde çalıştırır ve URL adı başına p50/p95/p99 gecikme, sorgu ve bayt "
+        "sayılarını JSON olarak kaydeder. Yazma yapar (kullanıcı, oturum, sepet, sipariş); veritabanı "
+        "SQLITE_PATH ile açıkça seçilmedikçe --allow-writes verilmeden çalışmaz. SQLite yazmaları "
+        "sıraya koyar: eşzamanlı işçiler yazma kilidini bekler (settings'teki zaman aşımı kadar), bu "
+        "bekleme yazan adımların gecikmesine dahildir. Gerçekçi eşzamanlılık için MySQL kullanın."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4, help="Eşzamanlı işçi sayısı (varsayılan: 4).")
+        parser.add_argument('--duration', type=float, default=30, help="Saniye cinsinden süre (varsayılan: 30).")
+        parser.add_argument(
+            '--journey', action='append', choices=sorted(JOURNEYS), dest='journeys',
+            help="Sadece bu yolculuğu çalıştır; birden fazla verilebilir (varsayılan: hepsi, ağırlıklarıyla).",
+        )
+        parser.add_argument('--gateway-latency', type=float, default=0.2,
+                            help="Sahte ödeme sağlayıcısının yanıt süresi, saniye (varsayılan: 0.2).")
+        parser.add_argument('--host', default='localhost', help="İsteklerin Host başlığı (ALLOWED_HOSTS içinde olmalı).")
+        parser.add_argument('--seed', type=int, help="Tekrarlanabilir yolculuk seçimi için rastgelelik tohumu.")
+        parser.add_argument('--output', default='benchmark.json', help="Sonuç dosyası (varsayılan: benchmark.json).")
+        parser.add_argument('--compare', help="Önceki bir sonuç dosyası; yüzdelik farkları yazdırılır.")
+        parser.add_argument(
+            '--allow-writes', action='store_true',
+            help="Veritabanı SQLITE_PATH ile seçilmemiş olsa da (örn. varsayılan db.sqlite3 veya MySQL) çalıştır.",
+        )
+
+    def handle(self, *args, **options):
+        if not os.getenv('SQLITE_PATH') and not options['allow_writes']:
+            raise CommandError(
+                f"Yük testi '{connection.settings_dict['NAME']}' veritabanına yazar. Tohumlanmış bir veri "
+                f"setini SQLITE_PATH ile seçin veya bu veritabanına yazılacağını --allow-writes ile onaylayın."
+            )
+        benchmark = Benchmark(
+            workers=options['workers'], duration=options['duration'], journeys=options['journeys'],
+            host=options['host'], gateway_latency=options['gateway_latency'], seed=options['seed'],
+        )
+        try:
+            report = benchmark.run()
+        except ValueError as e:
+            raise CommandError(e)
+
+        if options['compare']:
+            report['compared_to'] = options['compare']
+            report['delta_ms'] = compare(report, load_report(options['compare']))
+
+        Path(options['output']).write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding='utf-8')
+        self.print_report(report)
+        self.stdout.write(self.style.SUCCESS(
+            f"{report['requests']} istek, {report['duration_s']} sn, {report['throughput_rps']} istek/sn. "
+            f"Sonuçlar: {options['output']}"
+        ))
+
+    def print_report(self, report):
+        columns = ' '.join(f"{f'p{p}':>8}" for p in PERCENTILES)
+        self.stdout.write(f"{'URL adı':<22} {'istek':>6} {'hata':>5} {columns} {'sorgu':>6} {'bayt':>8}")
+        for name, stats in report['routes'].items():
+            percentiles = ' '.join(f"{stats[f'p{p}_ms']:>8.1f}" for p in PERCENTILES)
+            line = (f"{name:<22} {stats['requests']:>6} {stats['errors']:>5} {percentiles} "
+                    f"{stats['queries_avg']:>6.1f} {stats['bytes_avg']:>8}")
+            delta = report.get('delta_ms', {}).get(name)
+            if delta:
+                line += f"  (p95 {delta['p95_ms']:+.1f} ms)"
+            self.stdout.write(line)
@@ -0,0 +1,31 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from main.recommendations import ALSO_BOUGHT_LIMIT, build_also_bought
+
+
+class Command(BaseCommand):
+    help = (
+        "Tamamlanmış siparişlerde birlikte alınan ürünleri sayar ve ürün başına en sık birlikte "
+        "alınanları AlsoBought tablosuna yazar. Sadece henüz sayılmamış siparişler ve sayıldıktan sonra "
+        "iade/iptal edilenler okunur; periyodik (örn. cron ile saatlik) çalıştırılmak içindir."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rebuild', action='store_true',
+            help="Sayaçları silip tüm tamamlanmış siparişlerden baştan hesapla.",
+        )
+        parser.add_argument(
+            '--limit', type=int, default=ALSO_BOUGHT_LIMIT,
+            help=f"Ürün başına saklanacak öneri sayısı (varsayılan: {ALSO_BOUGHT_LIMIT}).",
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        order_count, item_count = build_also_bought(rebuild=options['rebuild'], limit=options['limit'])
+        self.stdout.write(self.style.SUCCESS(
+            f"{order_count} sipariş sayıldı veya düşüldü, {item_count} ürünün önerileri güncellendi "
+            f"({time.perf_counter() - started:.2f} sn)."
+        ))
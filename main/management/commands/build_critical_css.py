@@ -0,0 +1,166 @@
+import gzip
+import math
+import re
+from html.parser import HTMLParser
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.core.management.base import BaseCommand, CommandError
+
+from main.assets import CRITICAL_CSS_DIR, SITE_STYLESHEETS, VENDOR_BUNDLES, bundle_files, critical_css_path
+from main.css import extract_from_markup, filter_rules, parse_stylesheet, rewrite_urls, serialize, strip_template_syntax
+
+CONTENT_BLOCK_RE = re.compile(r'{%\s*block\s+content\s*%}(.*?){%\s*endblock', re.S)
+FOOTER_RE = re.compile(r'<footer\b.*?</footer>', re.S | re.I)
+VOID_TAGS = {'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta', 'source', 'track', 'wbr'}
+SKIPPED_TAGS = {'script', 'style', 'template', 'noscript'}
+# Eski base.html'in her sayfada render'ı bloklayarak yüklediği script (vendor paketlerine ek olarak).
+LEGACY_BLOCKING_SCRIPTS = ['assets/js/main.js']
+
+
+class FoldParser(HTMLParser):
+    """`content` bloğundaki ilk `limit` görünür üst düzey öğenin bittiği konumu bulur."""
+
+    def __init__(self, limit):
+        super().__init__(convert_charrefs=True)
+        self.limit = limit
+        self.depth = 0
+        self.completed = 0
+        self.skipping = False
+        self.end_position = None
+
+    def handle_starttag(self, tag, attrs):
+        if self.end_position is not None or tag in VOID_TAGS:
+            if self.depth == 0 and self.end_position is None:
+                self._complete()
+            return
+        if self.depth == 0:
+            attrs = dict(attrs)
+            style = (attrs.get('style') or '').replace(' ', '')
+            self.skipping = tag in SKIPPED_TAGS or 'hidden' in attrs or 'display:none' in style
+        self.depth += 1
+
+    def handle_endtag(self, tag):
+        if self.end_position is not None or tag in VOID_TAGS or self.depth == 0:
+            return
+        self.depth -= 1
+        if self.depth == 0:
+            if self.skipping:
+                self.skipping = False
+            else:
+                self._complete()
+
+    def _complete(self):
+        self.completed += 1
+        if self.completed >= self.limit:
+            self.end_position = self.getpos()
+
+
+def above_the_fold(source, limit):
+    """Alt şablonun ilk görünen kısmına ait işaretlemeyi (markup) döndürür."""
+    match = CONTENT_BLOCK_RE.search(source)
+    if not match:
+        return ''
+    markup = strip_template_syntax(match.group(1))
+    parser = FoldParser(limit)
+    parser.feed(markup)
+    parser.close()
+    if parser.end_position is None:
+        return markup
+    line, column = parser.end_position
+    lines = markup.splitlines(keepends=True)
+    return ''.join(lines[:line - 1]) + lines[line - 1][:column]
+
+
+def transfer_size(text):
+    return len(gzip.compress(text.encode('utf-8')))
+
+
+class Command(BaseCommand):
+    help = (
+        "Her sayfa şablonu için ilk ekranda görünen (above-the-fold) öğelerin kullandığı CSS kurallarını "
+        "çıkarır ve static/assets/css/critical/ altına yazar. base.html bu dosyaları satır içi gömer, "
+        "tam stil dosyalarını ise asenkron yükler."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('templates', nargs='*', help="Sadece bu şablonlar (örn: index.html blog.html).")
+        parser.add_argument(
+            '--fold-elements', type=int, default=2,
+            help="content bloğunda ilk ekranda görüldüğü varsayılan üst düzey öğe sayısı (varsayılan: 2).",
+        )
+        parser.add_argument('--output-dir', help="Varsayılan: STATICFILES_DIRS içindeki ilk dizin.")
+        parser.add_argument(
+            '--report', action='store_true',
+            help="Önce/sonra render'ı bloklayan bayt miktarını ve tahmini ilk boyama süresini yazdırır.",
+        )
+        parser.add_argument('--rtt-ms', type=int, default=150, help="Rapor için gidiş-dönüş süresi (ms).")
+        parser.add_argument('--bandwidth-kbps', type=int, default=1600, help="Rapor için bant genişliği (kbps).")
+
+    def handle(self, *args, **options):
+        template_dir = Path(settings.TEMPLATES[0]['DIRS'][0])
+        output_root = Path(options['output_dir'] or settings.STATICFILES_DIRS[0])
+
+        base_source = (template_dir / 'base.html').read_text(encoding='utf-8')
+        # Header, preloader ve scroll-top her sayfada ilk boyamada yer alır; footer almaz.
+        base_used = extract_from_markup(FOOTER_RE.sub('', base_source))
+
+        blocking_css = bundle_files((), 'css') + SITE_STYLESHEETS
+        stylesheets = [parse_stylesheet(rewrite_urls(self._read_static(path), path)) for path in blocking_css]
+
+        pages = self._page_templates(template_dir, options['templates'])
+        if not pages:
+            raise CommandError("İşlenecek sayfa şablonu bulunamadı.")
+
+        legacy_blocking = self._legacy_blocking_size() if options['report'] else None
+        for name, source in pages:
+            used = extract_from_markup(above_the_fold(source, options['fold_elements']))
+            used.update(base_used)
+            css = ''.join(serialize(filter_rules(nodes, used)) for nodes in stylesheets)
+
+            target = output_root / critical_css_path(name)
+            target.parent.mkdir(parents=True, exist_ok=True)
+            target.write_text(css, encoding='utf-8')
+            self.stdout.write(f"{name}: {len(css) / 1024:.1f} KB -> {target.relative_to(output_root)}")
+
+            if options['report']:
+                self._report(legacy_blocking, transfer_size(css), options)
+
+        self.stdout.write(self.style.SUCCESS(f"{len(pages)} şablon için kritik CSS üretildi ({CRITICAL_CSS_DIR})."))
+
+    def _page_templates(self, template_dir, only):
+        pages = []
+        for path in sorted(template_dir.rglob('*.html')):
+            name = path.relative_to(template_dir).as_posix()
+            if only and name not in only:
+                continue
+            source = path.read_text(encoding='utf-8')
+            if re.search(r'{%\s*extends\s+["\']base\.html["\']', source):
+                pages.append((name, source))
+        return pages
+
+    def _read_static(self, path):
+        absolute = finders.find(path)
+        if not absolute:
+            raise CommandError(f"Statik dosya bulunamadı: {path}")
+        return Path(absolute).read_text(encoding='utf-8')
+
+    def _legacy_blocking_size(self):
+        """Değişiklik öncesi base.html'in tüm sayfalarda bloklayarak yüklediği dosyalar."""
+        paths = [path for bundle in VENDOR_BUNDLES.values() for kind in ('css', 'js') for path in bundle[kind]]
+        paths += SITE_STYLESHEETS + LEGACY_BLOCKING_SCRIPTS
+        return len(paths), sum(transfer_size(self._read_static(path)) for path in paths)
+
+    def _report(self, legacy_blocking, inline_size, options):
+        rtt = options['rtt_ms'] / 1000
+        bytes_per_second = options['bandwidth_kbps'] * 1000 / 8
+        request_count, blocking_size = legacy_blocking
+        # Tarayıcı aynı origin'e en fazla 6 paralel bağlantı açar; HTML'in kendisi iki durumda da ortaktır.
+        before = math.ceil(request_count / 6) * rtt + blocking_size / bytes_per_second
+        after = inline_size / bytes_per_second
+        self.stdout.write(
+            f"    blocking: {request_count} istek / {blocking_size / 1024:.1f} KB gzip -> "
+            f"0 istek / {inline_size / 1024:.1f} KB satır içi; "
+            f"tahmini ilk boyama: {before * 1000:.0f} ms -> {after * 1000:.0f} ms"
+        )
@@ -0,0 +1,27 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from main.related_posts import RELATED_POSTS_LIMIT, build_related_posts
+
+
+class Command(BaseCommand):
+    help = (
+        "Yayınlanmış blog yazıları için ortak etiket, kategori ve terim benzerliğine göre en yakın "
+        "komşuları hesaplayıp RelatedPost ve yazıların terim sayılarını tutan PostTerm tablolarını "
+        "baştan yazar. Yazı kaydedildiğinde tablolar `run_deferred_tasks` ile artımlı olarak güncellenir; "
+        "bu komut ilk kurulum ve ağırlıklar veya terim ayrıştırma değiştiğinde kullanılır."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--limit', type=int, default=RELATED_POSTS_LIMIT,
+            help=f"Yazı başına saklanacak komşu sayısı (varsayılan: {RELATED_POSTS_LIMIT}).",
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        count = build_related_posts(limit=options['limit'])
+        self.stdout.write(self.style.SUCCESS(
+            f"{count} yazı için benzer yazılar hesaplandı ({time.perf_counter() - started:.2f} sn)."
+        ))
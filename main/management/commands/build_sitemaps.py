@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from main.sitemaps import SECTIONS, SITEMAP_PAGE_SIZE, build_sitemaps, sitemap_root
+
+
+class Command(BaseCommand):
+    help = (
+        "Sitemap index'i (sitemap.xml) ve bölüm başına sayfalara ayrılmış, gzip'li site haritası "
+        "dosyalarını SITEMAP_ROOT altına yazar. BlogPost ve PortfolioItem değişikliklerinde ilgili "
+        "bölüm `run_deferred_tasks` ile yeniden yazılır; bu komut ilk kurulum ve tam yenileme içindir."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--section', action='append', choices=list(SECTIONS),
+            help="Sadece verilen bölümleri yeniden yaz (birden fazla verilebilir).",
+        )
+        parser.add_argument(
+            '--page-size', type=int, default=SITEMAP_PAGE_SIZE,
+            help=f"Dosya başına en fazla URL sayısı (varsayılan ve üst sınır: {SITEMAP_PAGE_SIZE}).",
+        )
+
+    def handle(self, *args, **options):
+        page_size = min(max(options['page_size'], 1), SITEMAP_PAGE_SIZE)
+        written = build_sitemaps(options['section'], page_size)
+        for section, files in written.items():
+            self.stdout.write(f"{section}: {len(files)} dosya")
+        self.stdout.write(self.style.SUCCESS(f"Site haritaları yazıldı: {sitemap_root()}"))
@@ -0,0 +1,74 @@
+import time
+from datetime import date
+from pathlib import Path
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from main.dataset import DATASET_PASSWORD, DatasetGenerator, DatasetSize
+from main.models import BlogPost, Order, PortfolioItem
+
+
+class Command(BaseCommand):
+    help = (
+        "Performans çalışmaları için büyük ve tekrarlanabilir bir veri seti üretir: kullanıcılar, profiller, "
+        "blog yazıları (CKEditor HTML), etiketler, yorumlar, portfolyo ürünleri, her durumda siparişler ve "
+        "aboneler. Sadece boş bir SQLite veritabanına yazar; dosya SQLITE_PATH ile seçilir ve sonra "
+        "aynı değişkenle tekrar kullanılır, örn:\n"
+        "  SQLITE_PATH=perf.sqlite3 python manage.py generate_dataset --scale 0.1\n"
+        "  SQLITE_PATH=perf.sqlite3 python manage.py benchmark"
+    )
+
+    def add_arguments(self, parser):
+        defaults = DatasetSize()
+        parser.add_argument('--scale', type=float, default=1.0,
+                            help="Tüm satır sayılarının çarpanı (varsayılan: 1; 0.01 hızlı bir deneme için).")
+        for name in ('users', 'posts', 'comments', 'items', 'orders', 'subscribers'):
+            parser.add_argument(f'--{name}', type=int, help=f"Ölçekten bağımsız sayı (varsayılan: {getattr(defaults, name)} x ölçek).")
+        parser.add_argument('--seed', type=int, default=1, help="Rastgelelik tohumu (varsayılan: 1).")
+        parser.add_argument('--until', type=date.fromisoformat,
+                            help="Tarihlerin bittiği gün, YYYY-AA-GG (varsayılan: bugün). Aynı tohum ve günle aynı veri üretilir.")
+        parser.add_argument('--days', type=int, default=730, help="Verinin yayıldığı gün sayısı (varsayılan: 730).")
+        parser.add_argument('--batch-size', type=int, default=5000, help="bulk_create parti boyutu (varsayılan: 5000).")
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError("Veri seti sadece SQLite'a yazılır; SQLITE_PATH ile bir dosya seçin.")
+        path = Path(connection.settings_dict['NAME'])
+
+        call_command('migrate', interactive=False, verbosity=0)
+        if any(model.objects.exists() for model in (User, BlogPost, PortfolioItem, Order)):
+            raise CommandError(f"{path} boş değil. Yeni bir dosya için SQLITE_PATH'i değiştirin veya dosyayı silin.")
+
+        size = DatasetSize().scaled(options['scale'])
+        for name in ('users', 'posts', 'comments', 'items', 'orders', 'subscribers'):
+            if options[name] is not None:
+                setattr(size, name, options[name])
+
+        with connection.cursor() as cursor:
+            # Tek seferlik yükleme: diske her commit'te senkronize yazılmaz.
+            cursor.execute('PRAGMA synchronous = OFF')
+            cursor.execute('PRAGMA journal_mode = MEMORY')
+
+        started = time.perf_counter()
+
+        def progress(model, count):
+            elapsed = time.perf_counter() - started
+            self.stdout.write(f"{model._meta.label:<24} {count:>10} satır  ({elapsed:.1f} sn)")
+
+        DatasetGenerator(
+            size, seed=options['seed'], until=options['until'], days=options['days'],
+            batch_size=options['batch_size'], progress=progress,
+        ).generate()
+
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA journal_mode = DELETE')
+        # Testlerde veritabanı bellekte olduğundan dosya boyutu yoktur.
+        file_size = f"{path.stat().st_size / 2**20:.1f} MB, " if path.is_file() else ''
+        self.stdout.write(self.style.SUCCESS(
+            f"Veri seti {path} dosyasına yazıldı ({file_size}"
+            f"{time.perf_counter() - started:.1f} sn). Kullanıcı şifresi: {DATASET_PASSWORD}. "
+            f"Öneriler için build_related_posts ve build_also_bought çalıştırılabilir."
+        ))
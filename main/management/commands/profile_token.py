@@ -0,0 +1,23 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from main.profiling import PROFILE_PARAM, profile_token
+
+
+class Command(BaseCommand):
+    help = (
+        "Personel kullanıcı için tek bir isteği profillemeye zorlayan `?_profile=` değerini üretir. "
+        "Değer sadece o kullanıcının oturumunda ve PROFILING_TOKEN_MAX_AGE süresince geçerlidir."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('username')
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['username'])
+        except User.DoesNotExist:
+            raise CommandError(f"Kullanıcı bulunamadı: {options['username']}")
+        if not user.is_staff:
+            raise CommandError(f"{user.username} personel değil; profil bayrağı sadece personel için geçerlidir.")
+        self.stdout.write(f"?{PROFILE_PARAM}={profile_token(user)}")
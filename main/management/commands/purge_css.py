@@ -0,0 +1,65 @@
+import gzip
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError
+
+from main.assets import DEFAULT_PURGE_SAFELIST, PURGED_CSS_DIR
+from main.purge import collect_used_selectors, purge_stylesheets
+
+
+def gzip_size(text):
+    return len(gzip.compress(text.encode('utf-8')))
+
+
+class Command(BaseCommand):
+    help = (
+        "templates/**/*.html, assets/js/main.js ve veritabanındaki sınıf adlarını (Service.color_class, "
+        "Service.icon_class, Feature.icon_class) tarayarak Bootstrap, bootstrap-icons ve main.css'ten "
+        "kullanılmayan seçicileri temizler; sonuçlar static/assets/css/purged/ altına yazılır. "
+        "Service veya Feature yeni bir sınıfla kaydedilirse temizleme `run_deferred_tasks` ile tekrarlanır."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--safelist', action='append', default=[],
+            help="Her zaman korunacak seçiciler için regex (birden fazla verilebilir).",
+        )
+        parser.add_argument('--no-db', action='store_true', help="Veritabanındaki sınıf adlarını tarama.")
+        parser.add_argument('--output-dir', help="Varsayılan: STATICFILES_DIRS[0] ve (varsa) STATIC_ROOT.")
+        parser.add_argument('--dry-run', action='store_true', help="Dosya yazmadan sadece boyutları raporla.")
+
+    def handle(self, *args, **options):
+        safelist = DEFAULT_PURGE_SAFELIST + getattr(settings, 'CSS_PURGE_SAFELIST', []) + options['safelist']
+        try:
+            used, template_count = collect_used_selectors(safelist, include_database=not options['no_db'])
+        except DatabaseError as exc:
+            raise CommandError(f"Veritabanındaki sınıf adları okunamadı ({exc}). --no-db ile tekrar deneyin.")
+        except FileNotFoundError as exc:
+            raise CommandError(f"Statik dosya bulunamadı: {exc}")
+
+        self.stdout.write(
+            f"{template_count} şablon tarandı; {len(used.classes)} sınıf adı, {len(safelist)} safelist kuralı."
+        )
+
+        targets = [Path(options['output_dir'])] if options['output_dir'] else None
+        try:
+            results = purge_stylesheets(used, safelist, targets, dry_run=options['dry_run'])
+        except FileNotFoundError as exc:
+            raise CommandError(f"Statik dosya bulunamadı: {exc}")
+
+        total_before = total_after = 0
+        for path, original, purged in results:
+            before, after = gzip_size(original), gzip_size(purged)
+            total_before += before
+            total_after += after
+            self.stdout.write(
+                f"{path}: {len(original) / 1024:.1f} KB -> {len(purged) / 1024:.1f} KB "
+                f"(gzip {before / 1024:.1f} KB -> {after / 1024:.1f} KB)"
+            )
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Sayfa başına CSS (gzip): {total_before / 1024:.1f} KB -> {total_after / 1024:.1f} KB "
+            f"({PURGED_CSS_DIR})"
+        ))
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from main.deferred import TASKS, run_pending
+
+
+class Command(BaseCommand):
+    help = (
+        "Sinyallerin admin isteği dışında çalışsın diye ertelediği işleri (DeferredTask) çalıştırır. "
+        "Zamanlanmış görev olarak (örn. birkaç dakikada bir) çalıştırılmalıdır."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--task', action='append', choices=list(TASKS),
+            help="Sadece verilen işleri çalıştır (birden fazla verilebilir).",
+        )
+
+    def handle(self, *args, **options):
+        results = run_pending(options['task'])
+        for name, (count, succeeded) in results.items():
+            if succeeded:
+                self.stdout.write(f"{name}: {count} kayıt")
+            else:
+                self.stderr.write(self.style.ERROR(f"{name}: başarısız, kuyruğa geri eklendi ({count} kayıt)"))
+        self.stdout.write(self.style.SUCCESS(f"{len(results)} iş çalıştırıldı."))
@@ -0,0 +1,43 @@
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError
+
+from main.assets import ICON_SUBSET_DIR
+from main.icons import build_icon_subset, collect_used_icons
+
+
+class Command(BaseCommand):
+    help = (
+        "Şablonlarda, main.js'te ve veritabanında (Service.icon_class, Feature.icon_class) kullanılan "
+        "bootstrap-icons ikonlarından küçük bir WOFF2 font ve eşleşen CSS üretir. "
+        "Service veya Feature kaydedildiğinde yeni bir ikon gerekirse alt küme `run_deferred_tasks` "
+        "ile yeniden üretilir."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--no-db', action='store_true', help="Veritabanındaki ikon sınıflarını tarama.")
+        parser.add_argument('--extra', nargs='*', default=[], help="Ek ikon adları (örn: bi-star bi-heart).")
+        parser.add_argument('--output-dir', help="Varsayılan: STATICFILES_DIRS[0] ve (varsa) STATIC_ROOT.")
+
+    def handle(self, *args, **options):
+        try:
+            import fontTools  # noqa: F401
+            import brotli  # noqa: F401
+        except ImportError:
+            raise CommandError("Bu komut için 'fonttools' ve 'brotli' paketleri gerekli: pip install fonttools brotli")
+
+        try:
+            names = collect_used_icons(include_database=not options['no_db'])
+        except DatabaseError as exc:
+            raise CommandError(f"Veritabanındaki ikon sınıfları okunamadı ({exc}). --no-db ile tekrar deneyin.")
+        names |= {name.removeprefix('bi-') for name in options['extra']}
+
+        targets = [Path(options['output_dir'])] if options['output_dir'] else None
+        known, unknown, font_size = build_icon_subset(names, targets)
+
+        for name in unknown:
+            self.stderr.write(self.style.WARNING(f"Bilinmeyen ikon adı atlandı: bi-{name}"))
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(known)} ikon -> {font_size / 1024:.1f} KB WOFF2 ({ICON_SUBSET_DIR})"
+        ))
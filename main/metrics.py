@@ -0,0 +1,472 @@
+"""
+Prometheus metin formatında operasyon metrikleri.
+
+Sayaçlar ve histogramlar süreç içinde tutulur; harici ajan veya paket gerekmez.
+Birden fazla worker sürecinde istek işleyen her süreç kendi değerlerini
+METRICS_FLUSH_INTERVAL saniyede bir (bir sonraki istekte) ve kapanırken METRICS_DIR
+altına `metrics-<pid>-<rastgele>.json` olarak yazar; istek işlemeyen süreçler
+(yönetim komutları, cron) dosya yazmaz. Dosya adındaki rastgele kısım süreç başına
+üretilir: pid yeniden kullanıldığında yeni süreç ölü sürecin dosyasının üzerine
+yazmaz. `/metrics/` kendi sürecini hemen yazar ve dizindeki tüm dosyaları toplayarak
+döndürür; diğer süreçlerin değerleri en fazla METRICS_FLUSH_INTERVAL kadar geride kalır.
+
+Kapanan süreçlerin (aynı makinede pid'i artık yaşamayan) dosyaları, bir sürecin ilk
+yazmasında `metrics-retired.json` toplamına eklenip silinir; dizindeki dosya sayısı
+büyümez ve toplam sayaçlar geri gitmez. Sayaçlar sadece şu durumlarda sıfırlanır
+veya geri gider: dizin silinirse (Prometheus bunu sayaç sıfırlaması olarak görür,
+rate/increase etkilenmez) ve bir süreç kapanış yazması yapamadan öldürülürse (son
+yazmasından sonraki en fazla METRICS_FLUSH_INTERVAL'lik değerler kaybolur).
+
+METRICS_DIR boşsa sadece bu sürecin değerleri döner (testler, tek süreç).
+Uç nokta personele veya METRICS_ALLOWED_IPS içindeki adreslere açıktır; adres
+istemcinin değiştirebileceği başlıklardan değil, REMOTE_ADDR'den veya güvenilen
+vekillerin eklediği X-Forwarded-For değerinden okunur (METRICS_TRUSTED_PROXY_COUNT).
+"""
+import atexit
+import json
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from collections import defaultdict
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.db import connections
+from django.http import HttpResponse, HttpResponseForbidden
+
+from .db_metrics import connection_stats
+from .file_lock import file_lock
+from .logs import dropped_records
+from .profiling import timed
+from .tracing import SPAN_KIND_CLIENT, span
+
+logger = logging.getLogger(__name__)
+
+METRICS_FLUSH_INTERVAL = 15
+METRICS_FILE_PREFIX = 'metrics-'
+RETIRED_FILE = 'metrics-retired.json'
+LOCK_FILE = '.metrics.lock'
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+CALLBACK_LAG_BUCKETS = (1.0, 5.0, 15.0, 30.0, 60.0, 120.0, 300.0, 600.0, 1800.0, 3600.0)
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+# Etiket sayısını sınırlı tutmak için diğer yöntemler 'other' olarak sayılır.
+HTTP_METHODS = {'GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS'}
+
+REGISTRY = {}
+_lock = threading.Lock()
+_last_flush = time.monotonic()
+# Bu süreç istek işledi mi; sadece istek işleyen süreçler dosya yazar.
+_served = False
+_process_token = uuid.uuid4().hex[:12]
+_retired_checked = False
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.values = {}
+        REGISTRY[name] = self
+
+    def _key(self, labels):
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def inc(self, amount=1.0, **labels):
+        key = self._key(labels)
+        with _lock:
+            self.values[key] = self.values.get(key, 0.0) + amount
+
+    def _set(self, value, **labels):
+        # Başka bir modülde tutulan süreç toplamlarını aktarmak için.
+        with _lock:
+            self.values[self._key(labels)] = float(value)
+
+
+class Histogram(_Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with _lock:
+            # [kova sayıları..., +Inf, toplam]
+            state = self.values.setdefault(key, [0] * (len(self.buckets) + 1) + [0.0])
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[index] += 1
+                    break
+            else:
+                state[len(self.buckets)] += 1
+            state[-1] += value
+
+
+REQUEST_DURATION = Histogram(
+    'django_http_request_duration_seconds', "İstek süresi (URL adı, yöntem ve duruma göre).",
+    ('view', 'method', 'status'),
+)
+REQUEST_DB_DURATION = Histogram(
+    'django_http_request_db_duration_seconds', "İstek başına veritabanı sorgularında geçen süre.", ('view',),
+)
+DB_QUERIES = Counter('django_db_queries_total', "İsteklerde çalışan sorgu sayısı.", ('view',))
+DB_CONNECTIONS = Counter('django_db_connections_total', "Kurulan yeni veritabanı bağlantıları (istek dışındakiler dahil).")
+DB_REQUEST_CONNECTIONS = Counter(
+    'django_db_request_connections_total',
+    "İsteklerde kullanılan bağlantılar: istek içinde kurulan (new) veya kalıcı bağlantıdan gelen (reused).",
+    ('connection',),
+)
+DB_CONNECT_SECONDS = Counter('django_db_connect_seconds_total', "Bağlantı kurulumunda geçen toplam süre.")
+DB_HEALTH_CHECK_FAILURES = Counter(
+    'django_db_health_check_failures_total', "Sağlık kontrolünde kopuk bulunan kalıcı bağlantılar.",
+)
+CACHE_REQUESTS = Counter('cache_requests_total', "Önbellek okumaları (isabet/ıska).", ('cache', 'result'))
+GATEWAY_DURATION = Histogram(
+    'payment_gateway_request_duration_seconds', "Ödeme sağlayıcısı API çağrılarının süresi.",
+    ('gateway', 'operation'),
+)
+GATEWAY_ERRORS = Counter(
+    'payment_gateway_errors_total', "Ödeme sağlayıcısı hataları (istisna veya başarısız yanıt).",
+    ('gateway', 'operation', 'reason'),
+)
+CALLBACK_LAG = Histogram(
+    'payment_callback_lag_seconds', "Ödeme başlatıldıktan (veya olaydan) callback işlenene kadar geçen süre.",
+    ('gateway', 'kind'), buckets=CALLBACK_LAG_BUCKETS,
+)
+EMAIL_DURATION = Histogram('email_send_duration_seconds', "E-posta gönderim süresi.")
+EMAIL_ERRORS = Counter('email_send_errors_total', "Başarısız e-posta gönderimleri.")
+LOG_RECORDS_DROPPED = Counter('log_records_dropped_total', "Log kuyruğu dolu olduğu için atılan kayıtlar.")
+
+
+def cache_lookup(cache_name, hit):
+    CACHE_REQUESTS.inc(cache=cache_name, result='hit' if hit else 'miss')
+
+
+@contextmanager
+def gateway_call(gateway, operation):
+    """Ödeme sağlayıcısı çağrısının süresini ölçer; istisnayı hata olarak sayar. Profile `http`, trace'e span olarak da eklenir."""
+    started = time.perf_counter()
+    try:
+        with timed('http'), span(f'{gateway} {operation}', SPAN_KIND_CLIENT, **{
+            'payment.gateway': gateway, 'payment.operation': operation,
+        }):
+            yield
+    except Exception:
+        GATEWAY_ERRORS.inc(gateway=gateway, operation=operation, reason='exception')
+        raise
+    finally:
+        GATEWAY_DURATION.observe(time.perf_counter() - started, gateway=gateway, operation=operation)
+
+
+def gateway_failure(gateway, operation):
+    """Sağlayıcının başarısız (status != success) döndüğü çağrılar için."""
+    GATEWAY_ERRORS.inc(gateway=gateway, operation=operation, reason='failure')
+
+
+@contextmanager
+def email_send():
+    """E-posta gönderim süresini ve hatalarını ölçer. Profile `smtp`, trace'e span olarak da eklenir."""
+    started = time.perf_counter()
+    try:
+        with timed('smtp'), span('email send', SPAN_KIND_CLIENT):
+            yield
+    except Exception:
+        EMAIL_ERRORS.inc()
+        raise
+    finally:
+        EMAIL_DURATION.observe(time.perf_counter() - started)
+
+
+def callback_lag(gateway, kind, since):
+    """`since` (datetime veya epoch saniye) ile şimdi arasındaki gecikmeyi kaydeder."""
+    started = since if isinstance(since, (int, float)) else since.timestamp()
+    CALLBACK_LAG.observe(max(time.time() - started, 0.0), gateway=gateway, kind=kind)
+
+
+def _collect_process_totals():
+    stats = connection_stats()
+    DB_CONNECTIONS._set(stats.get('connects', 0))
+    DB_REQUEST_CONNECTIONS._set(stats.get('request_connects', 0), connection='new')
+    DB_REQUEST_CONNECTIONS._set(stats.get('request_reuses', 0), connection='reused')
+    DB_CONNECT_SECONDS._set(stats.get('connect_seconds', 0.0))
+    DB_HEALTH_CHECK_FAILURES._set(stats.get('health_check_failures', 0))
+    LOG_RECORDS_DROPPED._set(dropped_records())
+
+
+def snapshot():
+    """Bu sürecin değerleri: {metrik adı: [[etiket değerleri, değer], ...]}."""
+    _collect_process_totals()
+    with _lock:
+        return {
+            name: [[list(key), value if metric.kind == 'counter' else list(value)] for key, value in metric.values.items()]
+            for name, metric in REGISTRY.items()
+        }
+
+
+def _metrics_dir():
+    return getattr(settings, 'METRICS_DIR', None)
+
+
+def _process_file():
+    return f'{METRICS_FILE_PREFIX}{os.getpid()}-{_process_token}.json'
+
+
+def _read(path):
+    with open(path, encoding='utf-8') as file:
+        return json.load(file)
+
+
+def _write(path, data):
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as file:
+        json.dump(data, file)
+    os.replace(tmp_path, path)
+
+
+def _pid_alive(pid):
+    if os.name == 'nt':
+        # Windows'ta os.kill sinyal göndermez, süreci sonlandırır; ölü dosyalar orada birleştirilmez.
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _retire_dead_files(directory):
+    """Bu makinede kapanmış süreçlerin dosyalarını RETIRED_FILE toplamına ekler ve siler."""
+    host, own = socket.gethostname(), _process_file()
+    with file_lock(os.path.join(directory, LOCK_FILE)):
+        dead = []
+        for filename in os.listdir(directory):
+            if not filename.startswith(METRICS_FILE_PREFIX) or not filename.endswith('.json') \
+                    or filename in (own, RETIRED_FILE):
+                continue
+            path = os.path.join(directory, filename)
+            try:
+                data = _read(path)
+            except (OSError, ValueError):
+                continue
+            # Eski biçimdeki (host/pid içermeyen) dosyalar kimin olduğu bilinmediği için birleştirilmez.
+            if data.get('host') != host or not isinstance(data.get('pid'), int):
+                continue
+            # pid bu süreçse dosya aynı pid'i kullanmış önceki bir sürecindir.
+            if data['pid'] == os.getpid() or not _pid_alive(data['pid']):
+                dead.append((path, data['metrics']))
+        if not dead:
+            return
+        retired_path = os.path.join(directory, RETIRED_FILE)
+        try:
+            retired = [_read(retired_path)['metrics']]
+        except FileNotFoundError:
+            retired = []
+        merged = _merge(retired + [metrics for _, metrics in dead])
+        _write(retired_path, {'host': None, 'pid': None, 'metrics': {
+            name: [[list(key), value] for key, value in samples.items()] for name, samples in merged.items()
+        }})
+        for path, _ in dead:
+            os.remove(path)
+
+
+def flush_metrics():
+    """İstek işlemiş bu sürecin değerlerini METRICS_DIR altına atomik olarak yazar."""
+    global _retired_checked
+    directory = _metrics_dir()
+    if not directory or not _served:
+        return
+    path = os.path.join(directory, _process_file())
+    try:
+        os.makedirs(directory, exist_ok=True)
+        if not _retired_checked:
+            _retired_checked = True
+            _retire_dead_files(directory)
+        _write(path, {'host': socket.gethostname(), 'pid': os.getpid(), 'metrics': snapshot()})
+    except OSError:
+        logger.exception("Metrikler yazılamadı: %s", path)
+
+
+def _maybe_flush():
+    global _last_flush
+    with _lock:
+        due = time.monotonic() - _last_flush >= METRICS_FLUSH_INTERVAL
+        if due:
+            _last_flush = time.monotonic()
+    if due:
+        flush_metrics()
+
+
+def _after_fork():
+    # Çocuk süreç ebeveynin değerlerini (ebeveynin dosyasında zaten sayılanları) ve kimliğini devralmaz.
+    global _lock, _served, _process_token, _retired_checked
+    _lock = threading.Lock()
+    _served = _retired_checked = False
+    _process_token = uuid.uuid4().hex[:12]
+    for metric in REGISTRY.values():
+        metric.values.clear()
+
+
+def _merge(snapshots):
+    merged = defaultdict(dict)
+    for data in snapshots:
+        for name, samples in data.items():
+            metric = REGISTRY.get(name)
+            if metric is None:
+                continue
+            for labels, value in samples:
+                key = tuple(labels)
+                current = merged[name].get(key)
+                if metric.kind == 'counter':
+                    merged[name][key] = (current or 0.0) + value
+                elif current is None or len(current) != len(value):
+                    merged[name][key] = list(value)
+                else:
+                    merged[name][key] = [a + b for a, b in zip(current, value)]
+    return merged
+
+
+def collect():
+    """Tüm süreçlerin toplanmış değerleri: {metrik adı: {etiket değerleri: değer}}."""
+    directory = _metrics_dir()
+    if not directory:
+        return _merge([snapshot()])
+    flush_metrics()
+    if not os.path.isdir(directory):
+        return _merge([])
+    snapshots = []
+    # Ölü dosyalar birleştirilirken okunursa aynı değerler iki kez sayılır.
+    with file_lock(os.path.join(directory, LOCK_FILE)):
+        for filename in sorted(os.listdir(directory)):
+            if not (filename.startswith(METRICS_FILE_PREFIX) and filename.endswith('.json')):
+                continue
+            try:
+                data = _read(os.path.join(directory, filename))
+            except (OSError, ValueError):
+                logger.warning("Metrik dosyası okunamadı: %s", filename)
+                continue
+            snapshots.append(data['metrics'] if 'metrics' in data else data)
+    return _merge(snapshots)
+
+
+def _escape(value):
+    return value.replace('\\', r'\\').replace('\n', r'\n').replace('"', r'\"')
+
+
+def _labels(names, values, extra=()):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    pairs.extend(f'{name}="{value}"' for name, value in extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render_metrics(merged=None):
+    """Prometheus metin formatı (0.0.4)."""
+    merged = collect() if merged is None else merged
+    lines = []
+    for name, metric in REGISTRY.items():
+        lines.append(f'# HELP {name} {metric.documentation}')
+        lines.append(f'# TYPE {name} {metric.kind}')
+        for key, value in sorted(merged.get(name, {}).items()):
+            if metric.kind == 'counter':
+                lines.append(f'{name}{_labels(metric.labelnames, key)} {_number(value)}')
+                continue
+            cumulative = 0
+            for bound, count in zip(metric.buckets + ('+Inf',), value[:-1]):
+                cumulative += count
+                le = bound if bound == '+Inf' else _number(bound)
+                lines.append(f'{name}_bucket{_labels(metric.labelnames, key, [("le", le)])} {cumulative}')
+            lines.append(f'{name}_sum{_labels(metric.labelnames, key)} {_number(value[-1])}')
+            lines.append(f'{name}_count{_labels(metric.labelnames, key)} {cumulative}')
+    return '\n'.join(lines) + '\n'
+
+
+def _client_ip(request):
+    """
+    İstemci adresi. Önde güvenilen vekil yoksa sadece REMOTE_ADDR kullanılır. Varsa her vekil
+    X-Forwarded-For'un sonuna kendinden önceki adresi ekler; gerçek istemci sağdan
+    METRICS_TRUSTED_PROXY_COUNT'uncu adrestir, istemcinin kendi yazdığı soldaki değerler okunmaz.
+    """
+    proxies = getattr(settings, 'METRICS_TRUSTED_PROXY_COUNT', 0)
+    if proxies <= 0:
+        return request.META.get('REMOTE_ADDR')
+    forwarded = [part.strip() for part in request.META.get('HTTP_X_FORWARDED_FOR', '').split(',') if part.strip()]
+    return forwarded[-proxies] if len(forwarded) >= proxies else None
+
+
+def _allowed(request):
+    if request.user.is_authenticated and request.user.is_staff:
+        return True
+    client_ip = _client_ip(request)
+    return client_ip is not None and client_ip in getattr(settings, 'METRICS_ALLOWED_IPS', ())
+
+
+def metrics_view(request):
+    if not _allowed(request):
+        return HttpResponseForbidden()
+    return HttpResponse(render_metrics(), content_type=CONTENT_TYPE)
+
+
+class _QueryTimer:
+    def __init__(self):
+        self.seconds = 0.0
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.seconds += time.perf_counter() - started
+            self.count += 1
+
+
+class MetricsMiddleware:
+    """İstek süresini ve veritabanı süresini URL adına göre kaydeder."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        global _served
+        _served = True
+        timer = _QueryTimer()
+        started = time.perf_counter()
+        status = 500
+        try:
+            with ExitStack() as stack:
+                for alias in connections:
+                    stack.enter_context(connections[alias].execute_wrapper(timer))
+                response = self.get_response(request)
+            status = response.status_code
+            return response
+        finally:
+            match = request.resolver_match
+            view = (match.url_name or match.view_name) if match else 'unmatched'
+            REQUEST_DURATION.observe(
+                time.perf_counter() - started, view=view,
+                method=request.method if request.method in HTTP_METHODS else 'other', status=status,
+            )
+            REQUEST_DB_DURATION.observe(timer.seconds, view=view)
+            DB_QUERIES.inc(timer.count, view=view)
+            _maybe_flush()
+
+
+atexit.register(flush_metrics)
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_after_fork)
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.5 on 2026-10-19 03:19
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def fill_comment_counts(apps, schema_editor):
+    BlogPost = apps.get_model('main', 'BlogPost')
+    Comment = apps.get_model('main', 'Comment')
+    active_counts = (
+        Comment.objects.filter(post=OuterRef('pk'), active=True)
+        .order_by().values('post').annotate(total=Count('pk')).values('total')
+    )
+    BlogPost.objects.update(comment_count=Coalesce(Subquery(active_counts), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0002_alter_blogpost_content'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blogpost',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Comment Count'),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['post', 'active', 'created_at', 'id'], name='comment_keyset_idx'),
+        ),
+        migrations.RunPython(fill_comment_counts, migrations.RunPython.noop),
+    ]
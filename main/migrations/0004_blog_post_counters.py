@@ -0,0 +1,64 @@
+# Generated by Django 5.2.5 on 2026-10-19 03:21
+
+from collections import Counter
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+
+def fill_blog_counters(apps, schema_editor):
+    BlogPost = apps.get_model('main', 'BlogPost')
+    Category = apps.get_model('main', 'Category')
+    Tag = apps.get_model('main', 'Tag')
+    BlogArchiveMonth = apps.get_model('main', 'BlogArchiveMonth')
+
+    def published_count(**lookups):
+        return Coalesce(Subquery(
+            BlogPost.objects.filter(status='published', **lookups)
+            .order_by().values('status').annotate(total=Count('pk')).values('total')
+        ), 0)
+
+    Category.objects.update(post_count=published_count(category=OuterRef('pk')))
+    Tag.objects.update(post_count=published_count(tags=OuterRef('pk')))
+
+    published = BlogPost.objects.filter(status='published').values_list('created_at', flat=True)
+    months = Counter(timezone.localtime(created_at).date().replace(day=1) for created_at in published.iterator())
+    BlogArchiveMonth.objects.bulk_create(
+        [BlogArchiveMonth(month=month, post_count=count) for month, count in months.items()]
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0003_blogpost_comment_count'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BlogArchiveMonth',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField(unique=True, verbose_name='Month')),
+                ('post_count', models.PositiveIntegerField(default=0, verbose_name='Published Post Count')),
+            ],
+            options={
+                'verbose_name': 'Blog Archive Month',
+                'verbose_name_plural': 'Blog Archive Months',
+                'ordering': ['-month'],
+            },
+        ),
+        migrations.AddField(
+            model_name='category',
+            name='post_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Published Post Count'),
+        ),
+        migrations.AddField(
+            model_name='tag',
+            name='post_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Published Post Count'),
+        ),
+        migrations.RunPython(fill_blog_counters, migrations.RunPython.noop),
+    ]
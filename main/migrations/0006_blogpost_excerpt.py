@@ -0,0 +1,38 @@
+# Generated by Django 5.2.5 on 2026-10-19 03:24
+
+import html
+
+from django.db import migrations, models
+from django.utils.html import strip_tags
+from django.utils.text import Truncator
+
+EXCERPT_WORDS = 40
+
+
+def fill_excerpts(apps, schema_editor):
+    BlogPost = apps.get_model('main', 'BlogPost')
+    posts = []
+    for post in BlogPost.objects.only('pk', 'content', 'meta_description').iterator(chunk_size=500):
+        if post.meta_description:
+            post.excerpt = post.meta_description
+        else:
+            text = html.unescape(strip_tags(post.content or ''))
+            post.excerpt = Truncator(' '.join(text.split())).words(EXCERPT_WORDS)
+        posts.append(post)
+    BlogPost.objects.bulk_update(posts, ['excerpt'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0005_relatedpost'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blogpost',
+            name='excerpt',
+            field=models.TextField(blank=True, editable=False, verbose_name='Excerpt'),
+        ),
+        migrations.RunPython(fill_excerpts, migrations.RunPython.noop),
+    ]
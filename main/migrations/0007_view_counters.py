@@ -0,0 +1,33 @@
+# Generated by Django 5.2.5 on 2026-10-19 03:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0006_blogpost_excerpt'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blogpost',
+            name='popularity',
+            field=models.FloatField(blank=True, db_index=True, editable=False, null=True, verbose_name='Popularity'),
+        ),
+        migrations.AddField(
+            model_name='blogpost',
+            name='view_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='View Count'),
+        ),
+        migrations.AddField(
+            model_name='portfolioitem',
+            name='popularity',
+            field=models.FloatField(blank=True, db_index=True, editable=False, null=True, verbose_name='Popularity'),
+        ),
+        migrations.AddField(
+            model_name='portfolioitem',
+            name='view_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='View Count'),
+        ),
+    ]
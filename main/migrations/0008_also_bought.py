@@ -0,0 +1,49 @@
+# Generated by Django 5.2.5 on 2026-10-19 03:33
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0007_view_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='co_purchase_counted',
+            field=models.BooleanField(db_index=True, default=False, editable=False, verbose_name='Counted for Recommendations'),
+        ),
+        migrations.CreateModel(
+            name='AlsoBought',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('count', models.PositiveIntegerField(verbose_name='Order Count')),
+                ('rank', models.PositiveSmallIntegerField(verbose_name='Rank')),
+                ('item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='also_bought_entries', to='main.portfolioitem', verbose_name='Project')),
+                ('related', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='main.portfolioitem', verbose_name='Also Bought')),
+            ],
+            options={
+                'verbose_name': 'Also Bought',
+                'verbose_name_plural': 'Also Bought',
+                'ordering': ['item', 'rank'],
+                'constraints': [models.UniqueConstraint(fields=('item', 'rank'), name='also_bought_rank_unique')],
+            },
+        ),
+        migrations.CreateModel(
+            name='CoPurchase',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('count', models.PositiveIntegerField(default=0, verbose_name='Order Count')),
+                ('item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='co_purchases', to='main.portfolioitem', verbose_name='Project')),
+                ('other', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='main.portfolioitem', verbose_name='Bought Together With')),
+            ],
+            options={
+                'verbose_name': 'Co-purchase',
+                'verbose_name_plural': 'Co-purchases',
+                'constraints': [models.UniqueConstraint(fields=('item', 'other'), name='co_purchase_pair_unique')],
+            },
+        ),
+    ]
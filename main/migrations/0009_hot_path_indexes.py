@@ -0,0 +1,96 @@
+# Generated by Django 5.2.5 on 2026-10-19 03:38
+
+import django.db.models.functions.text
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import Upper
+
+
+def merge_duplicate_carts(apps, schema_editor):
+    # Tek sepet kısıtı eklenmeden önce, birden fazla sepeti olan kullanıcıların kalemleri en yeni sepette toplanır.
+    # Aynı ürün birden fazla sepette varsa tek kalemde birleştirilir, adetler toplanır; fiyat en yeni sepetten gelir.
+    Order = apps.get_model('main', 'Order')
+    OrderItem = apps.get_model('main', 'OrderItem')
+    duplicated = (
+        Order.objects.filter(status='cart').order_by().values('user')
+        .annotate(total=Count('pk')).filter(total__gt=1).values_list('user', flat=True)
+    )
+    for user_id in duplicated:
+        carts = list(Order.objects.filter(user_id=user_id, status='cart').order_by('-created_at', '-pk'))
+        keep, other_ids = carts[0], [order.pk for order in carts[1:]]
+        rank = {order.pk: index for index, order in enumerate(carts)}
+        items = sorted(
+            OrderItem.objects.filter(order__in=carts), key=lambda item: (rank[item.order_id], item.pk),
+        )
+        merged, extra = {}, []
+        for item in items:
+            first = merged.get(item.portfolio_item_id)
+            if first is None:
+                merged[item.portfolio_item_id] = item
+            else:
+                first.quantity += item.quantity
+                extra.append(item.pk)
+        for item in merged.values():
+            item.order_id = keep.pk
+        OrderItem.objects.bulk_update(merged.values(), ['order', 'quantity'])
+        OrderItem.objects.filter(pk__in=extra).delete()
+        Order.objects.filter(pk__in=other_ids).delete()
+
+
+def rename_duplicate_discount_codes(apps, schema_editor):
+    # Büyük/küçük harf duyarsız tekil kısıttan önce çakışan kodlardan biri korunur (aktif ve en geç biten);
+    # diğerleri pasifleştirilip `<kod>-<id>` olarak yeniden adlandırılır, siparişlerdeki bağlantıları korunur.
+    DiscountCode = apps.get_model('main', 'DiscountCode')
+    duplicated = (
+        DiscountCode.objects.order_by().values(upper=Upper('code'))
+        .annotate(total=Count('pk')).filter(total__gt=1).values_list('upper', flat=True)
+    )
+    max_length = DiscountCode._meta.get_field('code').max_length
+    for upper in duplicated:
+        _keep, *others = (
+            DiscountCode.objects.annotate(upper=Upper('code')).filter(upper=upper)
+            .order_by('-is_active', '-valid_to', 'pk')
+        )
+        for code in others:
+            suffix = f'-{code.pk}'
+            code.code = code.code[:max_length - len(suffix)] + suffix
+            code.is_active = False
+        DiscountCode.objects.bulk_update(others, ['code', 'is_active'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0008_also_bought'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='blogpost',
+            index=models.Index(fields=['status', '-created_at'], name='blogpost_status_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='blogpost',
+            index=models.Index(fields=['category', 'status', '-created_at'], name='blogpost_cat_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(condition=models.Q(('active', True)), fields=['post', 'created_at', 'id'], name='comment_active_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['user', 'status'], name='order_user_status_idx'),
+        ),
+        migrations.RunPython(rename_duplicate_discount_codes, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='discountcode',
+            constraint=models.UniqueConstraint(django.db.models.functions.text.Upper('code'), name='discount_code_upper_unique'),
+        ),
+        migrations.RunPython(merge_duplicate_carts, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='order',
+            constraint=models.UniqueConstraint(condition=models.Q(('status', 'cart')), fields=('user',), name='order_one_cart_per_user'),
+        ),
+    ]
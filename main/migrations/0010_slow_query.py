@@ -0,0 +1,32 @@
+# Generated by Django 5.2.5 on 2026-10-19 03:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0009_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SlowQuery',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fingerprint', models.CharField(max_length=40, verbose_name='Fingerprint')),
+                ('sql', models.TextField(verbose_name='Normalized SQL')),
+                ('duration_ms', models.FloatField(verbose_name='Duration (ms)')),
+                ('database', models.CharField(max_length=30, verbose_name='Database')),
+                ('view', models.CharField(blank=True, max_length=200, verbose_name='View')),
+                ('stack', models.TextField(blank=True, verbose_name='Stack')),
+                ('captured_at', models.DateTimeField(verbose_name='Captured At')),
+            ],
+            options={
+                'verbose_name': 'Slow Query',
+                'verbose_name_plural': 'Slow Queries',
+                'ordering': ['-captured_at'],
+                'indexes': [models.Index(fields=['fingerprint', 'captured_at'], name='slow_query_fp_captured_idx'), models.Index(fields=['captured_at'], name='slow_query_captured_idx')],
+            },
+        ),
+    ]
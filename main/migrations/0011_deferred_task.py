@@ -0,0 +1,28 @@
+# Generated by Django 5.2.5 on 2026-10-19 04:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0010_slow_query'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DeferredTask',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, verbose_name='Task')),
+                ('argument', models.CharField(blank=True, max_length=100, verbose_name='Argument')),
+                ('requested_at', models.DateTimeField(auto_now_add=True, verbose_name='Requested At')),
+            ],
+            options={
+                'verbose_name': 'Deferred Task',
+                'verbose_name_plural': 'Deferred Tasks',
+                'ordering': ['requested_at'],
+                'constraints': [models.UniqueConstraint(fields=('name', 'argument'), name='deferred_task_unique')],
+            },
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.5 on 2026-10-19 04:42
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0011_deferred_task'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostTerm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(max_length=50, verbose_name='Term')),
+                ('count', models.PositiveIntegerField(verbose_name='Count')),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='terms', to='main.blogpost', verbose_name='Post')),
+            ],
+            options={
+                'verbose_name': 'Post Term',
+                'verbose_name_plural': 'Post Terms',
+                'indexes': [models.Index(fields=['term', 'post'], name='post_term_term_idx')],
+                'constraints': [models.UniqueConstraint(fields=('post', 'term'), name='post_term_unique')],
+            },
+        ),
+    ]
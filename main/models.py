@@ -1,3 +1,4 @@
+import html
 from decimal import Decimal
 from django.core.exceptions import ValidationError
 from django.db import models
@@ -6,8 +7,11 @@ from django.urls import reverse
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from django.core.validators import MinValueValidator, MaxValueValidator
-from django.db.models import JSONField
+from django.db.models import JSONField, Q
+from django.db.models.functions import Upper
 from django.utils.text import slugify  # Bu importu eklemeyi unutmayın
+from django.utils.html import strip_tags
+from django.utils.text import Truncator
 from django_ckeditor_5.fields import CKEditor5Field # YENİ İMPORT
 
 # --- E-Ticaret ve Satış Modelleri ---
@@ -64,6 +68,10 @@ class DiscountCode(models.Model):
         verbose_name = _("Discount Code")
         verbose_name_plural = _("Discount Codes")
         ordering = ['-valid_from']
+        constraints = [
+            # Kod büyük/küçük harf duyarsız aranır (UPPER(code) = ?); "yaz25" ile "YAZ25" aynı koddur.
+            models.UniqueConstraint(Upper('code'), name='discount_code_upper_unique'),
+        ]
 
 
 class BankAccount(models.Model):
@@ -133,6 +141,8 @@ class Service(models.Model):
 class Category(models.Model):
     name = models.CharField(max_length=100, verbose_name=_("Category Name"))
     slug = models.SlugField(max_length=120, unique=True)
+    # Yayınlanmış yazı sayısı; BlogPost sinyalleri ile güncellenir (blog_stats.py).
+    post_count = models.PositiveIntegerField(default=0, editable=False, verbose_name=_("Published Post Count"))
 
     def __str__(self):
         return self.name
@@ -145,6 +155,8 @@ class Category(models.Model):
 class Tag(models.Model):
     name = models.CharField(max_length=100, verbose_name=_("Tag Name"))
     slug = models.SlugField(max_length=120, unique=True)
+    # Yayınlanmış yazı sayısı; BlogPost ve tags m2m sinyalleri ile güncellenir (blog_stats.py).
+    post_count = models.PositiveIntegerField(default=0, editable=False, verbose_name=_("Published Post Count"))
 
     def __str__(self):
         return self.name
@@ -170,10 +182,33 @@ class BlogPost(models.Model):
     created_at = models.DateTimeField(auto_now_add=True, verbose_name=_("Created At"))
     updated_at = models.DateTimeField(auto_now=True, verbose_name=_("Updated At"))
     status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='draft', verbose_name=_("Status"))
+    # Onaylı yorum sayısı; Comment kaydedildiğinde/silindiğinde sinyal ile güncellenir (signals.py).
+    comment_count = models.PositiveIntegerField(default=0, editable=False, verbose_name=_("Comment Count"))
+    # Liste sayfaları ve RSS/Atom için kayıt sırasında bir kez üretilen düz metin özet.
+    excerpt = models.TextField(blank=True, editable=False, verbose_name=_("Excerpt"))
+    # Görüntülenme sayacı ve zamanla sönümlenen popülerlik; view_counter.py toplu olarak yazar.
+    view_count = models.PositiveIntegerField(default=0, editable=False, verbose_name=_("View Count"))
+    popularity = models.FloatField(null=True, blank=True, editable=False, db_index=True, verbose_name=_("Popularity"))
+
+    EXCERPT_WORDS = 40
 
     def get_absolute_url(self):
         return reverse('blog_details', kwargs={'slug': self.slug}) # slug kullanmak daha SEO dostudur
 
+    def build_excerpt(self):
+        """Meta açıklama varsa onu, yoksa içeriğin HTML'den arındırılmış ilk kelimelerini döndürür."""
+        if self.meta_description:
+            return self.meta_description
+        text = html.unescape(strip_tags(self.content or ''))
+        return Truncator(' '.join(text.split())).words(self.EXCERPT_WORDS)
+
+    def save(self, *args, **kwargs):
+        self.excerpt = self.build_excerpt()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'content', 'meta_description'} & set(update_fields):
+            kwargs['update_fields'] = {*update_fields, 'excerpt'}
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return self.title
 
@@ -181,6 +216,26 @@ class BlogPost(models.Model):
         ordering = ['-created_at']
         verbose_name = _("Blog Post")
         verbose_name_plural = _("Blog Posts")
+        indexes = [
+            # Blog listesi ve akışlar: WHERE status = 'published' ORDER BY created_at DESC
+            models.Index(fields=['status', '-created_at'], name='blogpost_status_created_idx'),
+            # Kategori sayfası: WHERE category_id = ? AND status = 'published' ORDER BY created_at DESC
+            models.Index(fields=['category', 'status', '-created_at'], name='blogpost_cat_status_idx'),
+        ]
+
+
+class BlogArchiveMonth(models.Model):
+    """Ay bazında yayınlanmış yazı sayısı; arşiv widget'ı yazıları taramadan buradan okur."""
+    month = models.DateField(unique=True, verbose_name=_("Month"))  # Ayın ilk günü (yerel saat)
+    post_count = models.PositiveIntegerField(default=0, verbose_name=_("Published Post Count"))
+
+    def __str__(self):
+        return f"{self.month:%Y-%m} ({self.post_count})"
+
+    class Meta:
+        ordering = ['-month']
+        verbose_name = _("Blog Archive Month")
+        verbose_name_plural = _("Blog Archive Months")
 
 
 class PortfolioCategory(models.Model):
@@ -219,6 +274,9 @@ class PortfolioItem(models.Model):
     main_image = models.ImageField(upload_to='portfolio_images/', verbose_name=_("Main Image"))
     price = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True, verbose_name=_("Price (TL)"))
     created_at = models.DateTimeField(auto_now_add=True, verbose_name=_("Created At"))
+    # Görüntülenme sayacı ve zamanla sönümlenen popülerlik; view_counter.py toplu olarak yazar.
+    view_count = models.PositiveIntegerField(default=0, editable=False, verbose_name=_("View Count"))
+    popularity = models.FloatField(null=True, blank=True, editable=False, db_index=True, verbose_name=_("Popularity"))
 
     def get_absolute_url(self):
         return reverse('portfolio_details', kwargs={'slug': self.slug})
@@ -366,12 +424,61 @@ class Comment(models.Model):
     active = models.BooleanField(default=False, verbose_name=_("Active (Approved)"))
 
     def __str__(self):
+        # Listelerde post select_related ile birlikte okunmalı (admin'de CommentInline).
         return f"Comment by '{self.name}' on '{self.post.title}'"
 
     class Meta:
         verbose_name = _("Comment")
         verbose_name_plural = _("Comments")
         ordering = ['created_at']
+        indexes = [
+            # Yorum sayfalaması: WHERE post_id = ? AND active ORDER BY created_at, id
+            models.Index(fields=['post', 'active', 'created_at', 'id'], name='comment_keyset_idx'),
+            # Aynı sorgu için sadece onaylı yorumları içeren kısmi index (MySQL'de oluşturulmaz, yukarıdaki kullanılır).
+            models.Index(fields=['post', 'created_at', 'id'], condition=Q(active=True), name='comment_active_keyset_idx'),
+        ]
+
+
+class RelatedPost(models.Model):
+    """`build_related_posts` komutunun hesapladığı, yazı başına en benzer yazılar."""
+    post = models.ForeignKey(BlogPost, on_delete=models.CASCADE, related_name='related_entries', verbose_name=_("Post"))
+    related = models.ForeignKey(BlogPost, on_delete=models.CASCADE, related_name='+', verbose_name=_("Related Post"))
+    score = models.FloatField(verbose_name=_("Score"))
+    rank = models.PositiveSmallIntegerField(verbose_name=_("Rank"))
+
+    def __str__(self):
+        return f"#{self.post_id} -> #{self.related_id} ({self.rank})"
+
+    class Meta:
+        verbose_name = _("Related Post")
+        verbose_name_plural = _("Related Posts")
+        ordering = ['post', 'rank']
+        constraints = [
+            models.UniqueConstraint(fields=['post', 'rank'], name='related_post_rank_unique'),
+        ]
+
+
+class PostTerm(models.Model):
+    """
+    Benzer yazılar indeksi için yayınlanmış yazının başlık + içerik terim sayıları (main/related_posts.py).
+    Artımlı güncelleme belge frekanslarını ve komşu yazıları bu tablodan okur; içerikler yeniden işlenmez.
+    """
+    post = models.ForeignKey(BlogPost, on_delete=models.CASCADE, related_name='terms', verbose_name=_("Post"))
+    term = models.CharField(max_length=50, verbose_name=_("Term"))
+    count = models.PositiveIntegerField(verbose_name=_("Count"))
+
+    def __str__(self):
+        return f"#{self.post_id} {self.term} ({self.count})"
+
+    class Meta:
+        verbose_name = _("Post Term")
+        verbose_name_plural = _("Post Terms")
+        constraints = [
+            models.UniqueConstraint(fields=['post', 'term'], name='post_term_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['term', 'post'], name='post_term_term_idx'),
+        ]
 
 
 class Profile(models.Model):
@@ -477,6 +584,8 @@ class Order(models.Model):
 
     discount_code = models.ForeignKey('DiscountCode', on_delete=models.SET_NULL, null=True, blank=True, related_name='orders', verbose_name=_("Discount Code"))
     discount_amount = models.DecimalField(max_digits=10, decimal_places=2, default=0, validators=[MinValueValidator(0)])
+    # `build_also_bought` komutu tamamlanmış siparişi birlikte alınanlar sayacına ekledi mi.
+    co_purchase_counted = models.BooleanField(default=False, editable=False, db_index=True, verbose_name=_("Counted for Recommendations"))
 
     def get_subtotal_cost(self) -> Decimal:
         """İndirimler hariç alt toplamı döndürür."""
@@ -517,6 +626,14 @@ class Order(models.Model):
         verbose_name = _("Order/Cart")
         verbose_name_plural = _("Orders/Carts")
         ordering = ['-created_at']
+        indexes = [
+            # Her sayfadaki sepet sayacı ve sipariş geçmişi: WHERE user_id = ? AND status = ?
+            models.Index(fields=['user', 'status'], name='order_user_status_idx'),
+        ]
+        constraints = [
+            # Kullanıcı başına tek sepet (kısmi index desteklemeyen MySQL'de oluşturulmaz).
+            models.UniqueConstraint(fields=['user'], condition=Q(status='cart'), name='order_one_cart_per_user'),
+        ]
 
 class OrderItem(models.Model):
     order = models.ForeignKey(Order, related_name='items', on_delete=models.CASCADE, verbose_name=_("Order"))
@@ -537,6 +654,42 @@ class OrderItem(models.Model):
         verbose_name_plural = _("Order Items")
 
 
+class CoPurchase(models.Model):
+    """İki ürünün kaç tamamlanmış siparişte birlikte alındığı; her çift iki yönde de saklanır."""
+    item = models.ForeignKey('PortfolioItem', on_delete=models.CASCADE, related_name='co_purchases', verbose_name=_("Project"))
+    other = models.ForeignKey('PortfolioItem', on_delete=models.CASCADE, related_name='+', verbose_name=_("Bought Together With"))
+    count = models.PositiveIntegerField(default=0, verbose_name=_("Order Count"))
+
+    def __str__(self):
+        return f"#{self.item_id} + #{self.other_id}: {self.count}"
+
+    class Meta:
+        verbose_name = _("Co-purchase")
+        verbose_name_plural = _("Co-purchases")
+        constraints = [
+            models.UniqueConstraint(fields=['item', 'other'], name='co_purchase_pair_unique'),
+        ]
+
+
+class AlsoBought(models.Model):
+    """`build_also_bought` komutunun hesapladığı, ürün başına en sık birlikte alınan ürünler."""
+    item = models.ForeignKey('PortfolioItem', on_delete=models.CASCADE, related_name='also_bought_entries', verbose_name=_("Project"))
+    related = models.ForeignKey('PortfolioItem', on_delete=models.CASCADE, related_name='+', verbose_name=_("Also Bought"))
+    count = models.PositiveIntegerField(verbose_name=_("Order Count"))
+    rank = models.PositiveSmallIntegerField(verbose_name=_("Rank"))
+
+    def __str__(self):
+        return f"#{self.item_id} -> #{self.related_id} ({self.rank})"
+
+    class Meta:
+        verbose_name = _("Also Bought")
+        verbose_name_plural = _("Also Bought")
+        ordering = ['item', 'rank']
+        constraints = [
+            models.UniqueConstraint(fields=['item', 'rank'], name='also_bought_rank_unique'),
+        ]
+
+
 # --- Genel Site ve Arayüz Modelleri ---
 
 class Feature(models.Model):
@@ -581,4 +734,44 @@ class SiteSetting(models.Model):
 
     class Meta:
         verbose_name = _("Site Setting")
-        verbose_name_plural = _("Site Settings")
\ No newline at end of file
+        verbose_name_plural = _("Site Settings")
+
+class SlowQuery(models.Model):
+    """Eşik süresini aşan bir SQL sorgusu; `main.slow_queries` tamponundan toplu yazılır."""
+    fingerprint = models.CharField(max_length=40, verbose_name=_("Fingerprint"))  # normalize edilmiş SQL'in SHA-1'i
+    sql = models.TextField(verbose_name=_("Normalized SQL"))
+    duration_ms = models.FloatField(verbose_name=_("Duration (ms)"))
+    database = models.CharField(max_length=30, verbose_name=_("Database"))
+    view = models.CharField(max_length=200, blank=True, verbose_name=_("View"))
+    stack = models.TextField(blank=True, verbose_name=_("Stack"))
+    captured_at = models.DateTimeField(verbose_name=_("Captured At"))
+
+    def __str__(self):
+        return f"{self.fingerprint[:8]} {self.duration_ms:.0f} ms"
+
+    class Meta:
+        ordering = ['-captured_at']
+        verbose_name = _("Slow Query")
+        verbose_name_plural = _("Slow Queries")
+        indexes = [
+            models.Index(fields=['fingerprint', 'captured_at'], name='slow_query_fp_captured_idx'),
+            models.Index(fields=['captured_at'], name='slow_query_captured_idx'),
+        ]
+
+
+class DeferredTask(models.Model):
+    """İstek dışında çalıştırılacak bir yeniden üretim işi; `run_deferred_tasks` komutu işler (main/deferred.py)."""
+    name = models.CharField(max_length=50, verbose_name=_("Task"))
+    argument = models.CharField(max_length=100, blank=True, verbose_name=_("Argument"))
+    requested_at = models.DateTimeField(auto_now_add=True, verbose_name=_("Requested At"))
+
+    def __str__(self):
+        return f"{self.name}:{self.argument}" if self.argument else self.name
+
+    class Meta:
+        ordering = ['requested_at']
+        verbose_name = _("Deferred Task")
+        verbose_name_plural = _("Deferred Tasks")
+        constraints = [
+            models.UniqueConstraint(fields=['name', 'argument'], name='deferred_task_unique'),
+        ]
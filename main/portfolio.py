@@ -0,0 +1,232 @@
+"""
+Portfolyo listesi: kategori, hizmet ve fiyat aralığına göre SQL'de filtrelenen,
+sayfalanmış ürünler ve filtre çubuğu için facet sayıları.
+
+İlk sayfa `portfolio_view` ile render edilir; sonraki sayfalar `portfolio_items_view`
+üzerinden HTML parçası veya JSON olarak yüklenir (sonsuz kaydırma). Ürünler süreç
+içi katalogdan (catalog.py) filtrelenir; liste için veritabanına gidilmez.
+
+Facet sayıları (kategori x hizmet x fiyat aralığı) tek bir GROUP BY sorgusundan
+hesaplanır ve filtre kombinasyonu başına, katalog sürümü değişene kadar önbellekte
+tutulur. Katalog sürümü ürün, kategori veya hizmet değiştiğinde commit sonrasında
+güncellenir; commit'ten önce eski satırlarla hesaplanan sayılar yeni sürümün
+anahtarına yazılamaz. Her boyutun sayısında o boyutun kendi filtresi uygulanmaz; böylece seçili
+bir kategorideyken diğer kategorilerin kaç ürünü olduğu da görünür.
+"""
+from collections import Counter
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db.models import Case, Count, IntegerField, Q, Value, When
+from django.http import Http404
+from django.urls import reverse
+from django.utils.http import urlencode
+from django.utils.translation import gettext_lazy as _
+
+from .catalog import CATALOG_VERSION_KEY, get_catalog
+from .conditional import content_version
+from .metrics import cache_lookup
+from .models import PortfolioCategory, PortfolioItem, Service
+
+PORTFOLIO_PAGE_SIZE = 12
+FACET_CACHE_TIMEOUT = 60 * 60
+
+# URL anahtarı -> (etiket, alt sınır dahil, üst sınır hariç); fiyatı olmayan ürünler hiçbir aralığa girmez.
+PRICE_BUCKETS = {
+    'under-1000': (_("Under 1,000 TL"), None, Decimal('1000')),
+    '1000-5000': (_("1,000 - 5,000 TL"), Decimal('1000'), Decimal('5000')),
+    '5000-20000': (_("5,000 - 20,000 TL"), Decimal('5000'), Decimal('20000')),
+    'over-20000': (_("20,000 TL and above"), Decimal('20000'), None),
+}
+
+
+def _in_bucket(price, bucket):
+    _label, low, high = PRICE_BUCKETS[bucket]
+    return price is not None and (low is None or price >= low) and (high is None or price < high)
+
+
+def _price_q(bucket):
+    _label, low, high = PRICE_BUCKETS[bucket]
+    q = Q(price__isnull=False)
+    if low is not None:
+        q &= Q(price__gte=low)
+    if high is not None:
+        q &= Q(price__lt=high)
+    return q
+
+
+class PortfolioFilters:
+    """URL'deki `category` (slug), `service` (id) ve `price` (aralık) filtreleri; geçersiz değerler 404 döner."""
+
+    def __init__(self, params):
+        self.category = None
+        self.service = None
+        self.price = None
+        category_slug = params.get('category')
+        service_id = params.get('service')
+        price = params.get('price')
+        if category_slug:
+            self.category = PortfolioCategory.objects.filter(slug=category_slug).first()
+            if self.category is None:
+                raise Http404
+        if service_id:
+            if not service_id.isdigit():
+                raise Http404
+            self.service = Service.objects.filter(pk=service_id).only('title', 'slug').first()
+            if self.service is None:
+                raise Http404
+        if price:
+            if price not in PRICE_BUCKETS:
+                raise Http404
+            self.price = price
+
+    def matches(self, item):
+        """Katalog ürünü (CatalogItem) filtrelere uyuyor mu."""
+        return (
+            (self.category is None or item.category_id == self.category.pk)
+            and (self.service is None or item.service_id == self.service.pk)
+            and (self.price is None or _in_bucket(item.price, self.price))
+        )
+
+    def query(self, **overrides):
+        """Filtreleri (ve verilen ek parametreleri) sorgu dizesi olarak döndürür; None değerler atlanır."""
+        params = {
+            'category': self.category.slug if self.category else None,
+            'service': self.service.pk if self.service else None,
+            'price': self.price,
+            **overrides,
+        }
+        return urlencode({key: value for key, value in params.items() if value is not None})
+
+    def url(self, **overrides):
+        query = self.query(**overrides)
+        return f"{reverse('portfolio')}?{query}" if query else reverse('portfolio')
+
+    def cache_key(self):
+        return 'portfolio-facets:{}:{}:{}:{}'.format(
+            content_version(CATALOG_VERSION_KEY),
+            self.category.pk if self.category else '',
+            self.service.pk if self.service else '',
+            self.price or '',
+        )
+
+
+def _facet_rows():
+    """Kategori x hizmet x fiyat aralığı başına ürün sayısı; tek GROUP BY sorgusu."""
+    bucket = Case(
+        *[When(_price_q(key), then=Value(index)) for index, key in enumerate(PRICE_BUCKETS)],
+        default=Value(None), output_field=IntegerField(),
+    )
+    return (
+        PortfolioItem.objects.order_by()
+        .annotate(price_bucket=bucket)
+        .values('category_id', 'category__name', 'category__slug', 'service_id', 'service__title', 'price_bucket')
+        .annotate(total=Count('pk'))
+    )
+
+
+def _count_facets(filters):
+    price_keys = list(PRICE_BUCKETS)
+    category_id = filters.category.pk if filters.category else None
+    service_id = filters.service.pk if filters.service else None
+    price_index = price_keys.index(filters.price) if filters.price else None
+
+    categories, services, prices = Counter(), Counter(), Counter()
+    names = {}
+    totals = Counter()
+    for row in _facet_rows():
+        matches_category = category_id is None or row['category_id'] == category_id
+        matches_service = service_id is None or row['service_id'] == service_id
+        matches_price = price_index is None or row['price_bucket'] == price_index
+        total = row['total']
+        if matches_category and matches_service and matches_price:
+            totals['all'] += total
+        if matches_service and matches_price:
+            totals['category'] += total
+            if row['category_id']:
+                categories[row['category_id']] += total
+                names['category', row['category_id']] = (row['category__name'], row['category__slug'])
+        if matches_category and matches_price:
+            totals['service'] += total
+            if row['service_id']:
+                services[row['service_id']] += total
+                names['service', row['service_id']] = (row['service__title'], row['service_id'])
+        if matches_category and matches_service:
+            totals['price'] += total
+            if row['price_bucket'] is not None:
+                prices[price_keys[row['price_bucket']]] += total
+
+    return {
+        'category': [(names['category', pk], count) for pk, count in categories.items()],
+        'service': [(names['service', pk], count) for pk, count in services.items()],
+        'price': [(key, prices[key]) for key in price_keys if prices[key]],
+        'totals': dict(totals),
+    }
+
+
+def portfolio_facets(filters):
+    """
+    Filtre çubuğu: 'groups' kategori, hizmet ve fiyat için [(etiket, URL, sayı, seçili mi), ...]
+    listeleri, 'total' tüm filtrelere uyan ürün sayısıdır. İlk eleman boyutun filtresini kaldıran
+    "tümü" bağlantısıdır (etiketi None). Ürünü olmayan seçenekler, seçili değilse listelenmez.
+    """
+    key = filters.cache_key()
+    counts = cache.get(key)
+    cache_lookup('portfolio_facets', counts is not None)
+    if counts is None:
+        counts = _count_facets(filters)
+        cache.set(key, counts, FACET_CACHE_TIMEOUT)
+    totals = counts['totals']
+
+    category_counts = dict(counts['category'])
+    if filters.category:
+        category_counts.setdefault((filters.category.name, filters.category.slug), 0)
+    categories = [(None, filters.url(category=None), totals.get('category', 0), filters.category is None)]
+    for (name, slug), count in sorted(category_counts.items(), key=lambda entry: entry[0][0].lower()):
+        active = filters.category is not None and filters.category.slug == slug
+        categories.append((name, filters.url(category=slug), count, active))
+
+    service_counts = dict(counts['service'])
+    if filters.service:
+        service_counts.setdefault((filters.service.title, filters.service.pk), 0)
+    services = [(None, filters.url(service=None), totals.get('service', 0), filters.service is None)]
+    for (title, pk), count in sorted(service_counts.items(), key=lambda entry: entry[0][0].lower()):
+        active = filters.service is not None and filters.service.pk == pk
+        services.append((title, filters.url(service=pk), count, active))
+
+    price_counts = dict(counts['price'])
+    prices = [(None, filters.url(price=None), totals.get('price', 0), filters.price is None)]
+    for bucket, (label, _low, _high) in PRICE_BUCKETS.items():
+        if price_counts.get(bucket) or filters.price == bucket:
+            prices.append((label, filters.url(price=bucket), price_counts.get(bucket, 0), filters.price == bucket))
+
+    return {'groups': [categories, services, prices], 'total': totals.get('all', 0)}
+
+
+def portfolio_items(filters):
+    # Katalog zaten (-project_date, -pk) sırasında; sayfalar arası kayma olmaz.
+    return [item for item in get_catalog().items if filters.matches(item)]
+
+
+def portfolio_page(filters, page_number):
+    return Paginator(portfolio_items(filters), PORTFOLIO_PAGE_SIZE).get_page(page_number)
+
+
+def next_page_url(filters, page_obj):
+    if not page_obj.has_next():
+        return None
+    return f"{reverse('portfolio_items')}?{filters.query(page=page_obj.next_page_number())}"
+
+
+def item_data(item):
+    """JSON yanıtı için tek bir ürün kartı."""
+    return {
+        'title': item.title,
+        'url': item.get_absolute_url(),
+        'image': item.image_url or None,
+        'short_description': item.short_description,
+        'price': str(item.price) if item.price is not None else None,
+        'category': item.category_name,
+        'service': item.service_title,
+    }
@@ -0,0 +1,197 @@
+"""
+Örneklemeli istek profili.
+
+`RequestProfilingMiddleware` isteklerin PROFILING_SAMPLE_RATE oranındaki bir
+kısmını ölçer: veritabanı sorgu sayısı ve süresi, şablon render süresi,
+context processor süresi ve dış çağrılar (ödeme sağlayıcıları için `http`,
+e-posta için `smtp`) ile isteğin yeni kurduğu ve yeniden kullandığı veritabanı
+bağlantıları (db_metrics.py). Sonuç her zaman `main.profiling` logger'ına (dönen
+log dosyası) tek satır JSON olarak yazılır; `Server-Timing` başlığı sadece personel
+isteklerine eklenir, ziyaretçilere iç zamanlama bilgisi gönderilmez.
+
+Personel tek bir isteği `?_profile=<imza>` ile profillemeye zorlayabilir; imza
+`profile_token()` (veya `profile_token` komutu) ile kullanıcıya özel üretilir ve
+PROFILING_TOKEN_MAX_AGE saniye geçerlidir. Dış çağrılar `timed()` ile sarılır.
+"""
+import json
+import logging
+import random
+import threading
+import time
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.core import signing
+from django.db import connections
+from django.template.backends.django import Template as BackendTemplate
+from django.template.context import RequestContext
+
+from .db_metrics import request_connections
+
+logger = logging.getLogger(__name__)
+
+PROFILE_PARAM = '_profile'
+SIGNING_SALT = 'main.profiling'
+
+_profile = threading.local()
+_installed = False
+
+
+def _active():
+    return getattr(_profile, 'timings', None) is not None
+
+
+def _add(name, seconds):
+    if _active():
+        _profile.timings[name] += seconds
+
+
+@contextmanager
+def timed(name):
+    """Profillenen istekte bloğun süresini `name` başlığına ekler; diğer isteklerde bir şey yapmaz."""
+    if not _active():
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        _add(name, time.perf_counter() - started)
+
+
+def _install():
+    """Şablon render'ı ve context processor'ları ölçen sarmalayıcıları bir kez yerleştirir."""
+    global _installed
+    if _installed:
+        return
+    _installed = True
+
+    render = BackendTemplate.render
+    bind_template = RequestContext.bind_template
+
+    def profiled_render(self, context=None, request=None):
+        if not _active():
+            return render(self, context, request)
+        started = time.perf_counter()
+        try:
+            return render(self, context, request)
+        finally:
+            _add('render', time.perf_counter() - started)
+
+    @contextmanager
+    def profiled_bind_template(self, template):
+        # Context processor'lar bind_template'e girilirken çalışır.
+        started = time.perf_counter()
+        with bind_template(self, template):
+            _add('ctx', time.perf_counter() - started)
+            yield
+
+    BackendTemplate.render = profiled_render
+    RequestContext.bind_template = profiled_bind_template
+
+
+class _QueryTimer:
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            _profile.timings['db'] += time.perf_counter() - started
+            _profile.queries += 1
+
+
+def profile_token(user):
+    """Kullanıcıya özel, süreli `?_profile=` değeri."""
+    return signing.TimestampSigner(salt=SIGNING_SALT).sign(str(user.pk))
+
+
+def _forced(request):
+    value = request.GET.get(PROFILE_PARAM)
+    user = getattr(request, 'user', None)
+    if not value or user is None or not user.is_staff:
+        return False
+    try:
+        signed_pk = signing.TimestampSigner(salt=SIGNING_SALT).unsign(
+            value, max_age=getattr(settings, 'PROFILING_TOKEN_MAX_AGE', 86400)
+        )
+    except signing.BadSignature:
+        return False
+    return signed_pk == str(user.pk)
+
+
+METRICS = (
+    ('db', 'queries'),
+    ('tpl', 'templates'),
+    ('ctx', 'context processors'),
+    ('http', 'outbound HTTP'),
+    ('smtp', 'SMTP'),
+)
+
+
+def breakdown(timings):
+    """Ölçümlerden başlık başına süre (sn); şablon süresinden context processor süresi düşülür."""
+    durations = {name: timings.get(name, 0.0) for name, _ in METRICS}
+    durations['tpl'] = max(timings.get('render', 0.0) - durations['ctx'], 0.0)
+    return durations
+
+
+def server_timing(durations, queries, total):
+    """`Server-Timing` başlık değeri (süreler ms)."""
+    parts = [
+        f'{name};dur={durations[name] * 1000:.1f};desc="{queries} {desc}"' if name == 'db'
+        else f'{name};dur={durations[name] * 1000:.1f};desc="{desc}"'
+        for name, desc in METRICS
+    ]
+    parts.append(f'total;dur={total * 1000:.1f}')
+    return ', '.join(parts)
+
+
+def _connection_fields(db_connections):
+    if db_connections is None:
+        return {}
+    new, reused, connect_seconds = db_connections
+    return {'db_connects': new, 'db_reuses': reused, 'db_connect_ms': round(connect_seconds * 1000, 1)}
+
+
+class RequestProfilingMiddleware:
+    """Örneklenen veya personelin zorladığı isteklerin zaman dağılımını loga (personel isteklerinde başlığa da) yazar."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        _install()
+
+    def __call__(self, request):
+        forced = _forced(request)
+        if not forced and random.random() >= getattr(settings, 'PROFILING_SAMPLE_RATE', 0.0):
+            return self.get_response(request)
+
+        _profile.timings = Counter()
+        _profile.queries = 0
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                timer = _QueryTimer()
+                for alias in connections:
+                    stack.enter_context(connections[alias].execute_wrapper(timer))
+                response = self.get_response(request)
+            total = time.perf_counter() - started
+            durations, queries = breakdown(_profile.timings), _profile.queries
+            db_connections = request_connections()
+        finally:
+            _profile.timings = None
+
+        user = getattr(request, 'user', None)
+        if forced or (user is not None and user.is_staff):
+            response['Server-Timing'] = server_timing(durations, queries, total)
+        logger.info(json.dumps({
+            'path': request.path,
+            'method': request.method,
+            'status': response.status_code,
+            'forced': forced,
+            'total_ms': round(total * 1000, 1),
+            'queries': queries,
+            **{f'{name}_ms': round(seconds * 1000, 1) for name, seconds in durations.items()},
+            **_connection_fields(db_connections),
+        }))
+        return response
@@ -0,0 +1,121 @@
+"""
+Kullanılmayan CSS seçicilerinin temizlenmesi (purge).
+
+Şablonlarda, site JS'inde ve veritabanında (Service.color_class, Service.icon_class,
+Feature.icon_class) geçen sınıf adlarını toplar ve PURGE_TARGETS'taki stil
+dosyalarından sadece bunlarla eşleşen kuralları PURGED_CSS_DIR altına yazar.
+Kullanılan sınıflar ve safelist PURGE_MANIFEST'e yazılır; bir Service veya Feature
+temizlenmiş CSS'te olmayan bir sınıfla kaydedildiğinde temizleme ertelenmiş iş
+olarak tekrarlanır (signals.py, `run_deferred_tasks`).
+"""
+import json
+import os
+import re
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+
+from .assets import PURGE_MANIFEST, PURGE_TARGETS, purged_css_path
+from .css import UsedSelectors, extract_from_markup, extract_from_text, filter_rules, parse_stylesheet, \
+    rewrite_urls, serialize
+from .icons import output_dirs
+
+SCRIPT_RE = re.compile(r'<script\b[^>]*>(.*?)</script>', re.S | re.I)
+# Şablon dışında sınıf adı üreten kaynaklar: form widget'ları ve sitenin kendi JS dosyası.
+EXTRA_TEXT_SOURCES = ['main/forms.py']
+SCRIPT_SOURCES = ['assets/js/main.js']
+
+
+def read_static(path):
+    absolute = finders.find(path)
+    if not absolute:
+        raise FileNotFoundError(path)
+    return Path(absolute).read_text(encoding='utf-8')
+
+
+def database_classes():
+    """Veritabanındaki sınıf adı alanlarının değerleri."""
+    from .models import Feature, Service
+
+    values = list(Service.objects.values_list('color_class', 'icon_class'))
+    values += [(icon,) for icon in Feature.objects.values_list('icon_class', flat=True)]
+    return [value for row in values for value in row if value]
+
+
+def collect_used_selectors(safelist, include_database=True):
+    """(kullanılan seçiciler, taranan şablon sayısı) döndürür."""
+    used = UsedSelectors(safelist=safelist)
+    templates = sorted(Path(settings.TEMPLATES[0]['DIRS'][0]).rglob('*.html'))
+    for path in templates:
+        source = path.read_text(encoding='utf-8')
+        used.update(extract_from_markup(source, with_tags=False))
+        for script in SCRIPT_RE.findall(source):
+            used.update(extract_from_text(script))
+    for path in SCRIPT_SOURCES:
+        used.update(extract_from_text(read_static(path)))
+    for path in EXTRA_TEXT_SOURCES:
+        used.update(extract_from_text((Path(settings.BASE_DIR) / path).read_text(encoding='utf-8')))
+    if include_database:
+        used.update(extract_from_text(' '.join(database_classes())))
+    return used, len(templates)
+
+
+def purge_stylesheets(used, safelist, targets=None, dry_run=False):
+    """
+    PURGE_TARGETS'ı temizler ve (varsayılan: STATICFILES_DIRS[0] ve varsa STATIC_ROOT) altına yazar.
+    [(kaynak yol, orijinal CSS, temizlenmiş CSS), ...] döndürür.
+    """
+    results = []
+    for path in PURGE_TARGETS:
+        original = read_static(path)
+        # Dizin değiştiği için göreli url()'ler mutlak hale getirilir; çıktı dosyası her yerden çalışır.
+        results.append((path, original, serialize(filter_rules(parse_stylesheet(rewrite_urls(original, path)), used))))
+    if dry_run:
+        return results
+
+    manifest = json.dumps({'classes': sorted(used.classes), 'safelist': list(safelist)}, indent=2)
+    for root in targets or output_dirs():
+        for path, _, purged in results:
+            target = root / purged_css_path(path)
+            target.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = target.with_name(f'.{target.name}.tmp')
+            tmp_path.write_text(purged, encoding='utf-8')
+            os.replace(tmp_path, target)
+        # Manifest en son yazılır.
+        manifest_path = root / PURGE_MANIFEST
+        tmp_path = manifest_path.with_name(f'.{manifest_path.name}.tmp')
+        tmp_path.write_text(manifest, encoding='utf-8')
+        os.replace(tmp_path, manifest_path)
+    return results
+
+
+def purge_manifest():
+    """Son temizlemenin manifest'i ({'classes', 'safelist'}); temizleme hiç yapılmamışsa None."""
+    path = finders.find(PURGE_MANIFEST)
+    if not path:
+        return None
+    with open(path, encoding='utf-8') as manifest:
+        return json.load(manifest)
+
+
+def missing_classes(text):
+    """Metindeki sınıf adlarından son temizlemede kullanılmış sayılmayanlar; temizleme yoksa boş küme."""
+    manifest = purge_manifest()
+    if manifest is None:
+        return set()
+    used = UsedSelectors(manifest['classes'], safelist=manifest['safelist'])
+    return {name for name in extract_from_text(text or '').classes
+            if name not in used.classes and not used.is_safelisted(name)}
+
+
+def rebuild_purged_css(arguments=()):
+    """
+    Ertelenmiş iş ('css'): temizlenmiş CSS'i veritabanındaki güncel sınıflarla yeniden üretir.
+    Son temizlemede kullanılan safelist korunur; temizleme hiç yapılmamışsa bir şey yapılmaz.
+    """
+    manifest = purge_manifest()
+    if manifest is None:
+        return
+    used, _ = collect_used_selectors(manifest['safelist'])
+    purge_stylesheets(used, manifest['safelist'])
@@ -0,0 +1,149 @@
+"""
+"Bunu alanlar şunları da aldı" önerileri.
+
+Tamamlanmış siparişlerdeki ürün çiftleri CoPurchase tablosunda sayılır ve her
+ürünün en sık birlikte alındığı ALSO_BOUGHT_LIMIT ürün AlsoBought tablosuna
+yazılır. Hesap istek sırasında değil `build_also_bought` komutuyla yapılır;
+komut sadece henüz sayılmamış siparişleri okur ve sadece sayacı değişen
+ürünlerin listelerini yeniden yazar. Sayıldıktan sonra `completed` durumundan
+çıkan (iade/iptal) siparişlerin çiftleri bir sonraki çalıştırmada sayaçtan düşülür;
+sipariş tekrar tamamlanırsa yeniden sayılır. Sayfalar (item_id, rank) indeksi üzerinden
+tek sorgu yapar; ürün bilgileri süreç içi katalogdan gelir.
+"""
+import heapq
+from collections import Counter, defaultdict
+from itertools import combinations
+
+from django.db import transaction
+
+from .catalog import get_catalog
+from .models import AlsoBought, CoPurchase, Order, OrderItem
+
+ALSO_BOUGHT_LIMIT = 4
+ORDER_BATCH_SIZE = 1000
+CART_RECOMMENDATION_LIMIT = 4
+
+
+def count_pairs(baskets):
+    """Sepetlerdeki (sipariş -> ürün kümesi) sıralı ürün çiftlerinin sayısı; her çift iki yönde."""
+    pairs = Counter()
+    for items in baskets.values():
+        for first, second in combinations(sorted(items), 2):
+            pairs[first, second] += 1
+            pairs[second, first] += 1
+    return pairs
+
+
+def _baskets(order_ids):
+    baskets = defaultdict(set)
+    rows = OrderItem.objects.filter(order_id__in=order_ids).values_list('order_id', 'portfolio_item_id')
+    for order_id, item_id in rows.iterator(chunk_size=2000):
+        baskets[order_id].add(item_id)
+    return baskets
+
+
+def _add_pairs(pairs):
+    """
+    Çift sayılarını CoPurchase tablosuna ekler; mevcut satırlar artırılır (negatif sayılar düşer),
+    yeniler toplu eklenir, sayısı sıfıra inen satırlar silinir.
+    """
+    item_ids = {item_id for item_id, _ in pairs}
+    existing = {
+        (row.item_id, row.other_id): row
+        for row in CoPurchase.objects.filter(item_id__in=item_ids).select_for_update()
+        if (row.item_id, row.other_id) in pairs
+    }
+    for key, row in existing.items():
+        row.count += pairs[key]
+    CoPurchase.objects.bulk_update([row for row in existing.values() if row.count > 0], ['count'], batch_size=1000)
+    CoPurchase.objects.filter(pk__in=[row.pk for row in existing.values() if row.count <= 0]).delete()
+    CoPurchase.objects.bulk_create(
+        [CoPurchase(item_id=item_id, other_id=other_id, count=count)
+         for (item_id, other_id), count in pairs.items() if (item_id, other_id) not in existing and count > 0],
+        batch_size=1000,
+    )
+    return item_ids
+
+
+def _count_orders(orders, sign):
+    """
+    Siparişleri ORDER_BATCH_SIZE'lık gruplar halinde sayaca ekler (sign=1) veya sayaçtan düşer
+    (sign=-1) ve `co_purchase_counted` işaretini günceller. (sipariş sayısı, etkilenen ürünler) döndürür.
+    """
+    order_count, touched = 0, set()
+    while True:
+        # İşaret her grupta değiştiği için sorgu her turda ilk grubu döndürür.
+        order_ids = list(orders.values_list('pk', flat=True)[:ORDER_BATCH_SIZE])
+        if not order_ids:
+            break
+        with transaction.atomic():
+            pairs = count_pairs(_baskets(order_ids))
+            if pairs:
+                touched |= _add_pairs(Counter({key: sign * count for key, count in pairs.items()}))
+            Order.objects.filter(pk__in=order_ids).update(co_purchase_counted=sign > 0)
+        order_count += len(order_ids)
+    return order_count, touched
+
+
+def _store_top(item_ids, limit):
+    """Verilen ürünlerin AlsoBought listelerini CoPurchase sayılarından yeniden yazar."""
+    neighbours = defaultdict(list)
+    rows = CoPurchase.objects.filter(item_id__in=item_ids).values_list('item_id', 'other_id', 'count')
+    for item_id, other_id, count in rows.iterator(chunk_size=2000):
+        neighbours[item_id].append((count, other_id))
+
+    AlsoBought.objects.filter(item_id__in=item_ids).delete()
+    AlsoBought.objects.bulk_create([
+        AlsoBought(item_id=item_id, related_id=other_id, count=count, rank=rank)
+        for item_id, candidates in neighbours.items()
+        # Eşit sayıda yeni ürün (büyük pk) önce gelir.
+        for rank, (count, other_id) in enumerate(heapq.nlargest(limit, candidates), start=1)
+    ], batch_size=1000)
+
+
+def build_also_bought(rebuild=False, limit=ALSO_BOUGHT_LIMIT):
+    """
+    Henüz sayılmamış tamamlanmış siparişleri sayaca ekler, sayıldıktan sonra tamamlanmış durumundan
+    çıkanları sayaçtan düşer ve etkilenen ürünlerin listelerini günceller. `rebuild` ile tüm sayaçlar
+    silinip baştan hesaplanır. (sipariş, ürün) sayısı döndürür.
+    """
+    if rebuild:
+        with transaction.atomic():
+            CoPurchase.objects.all().delete()
+            AlsoBought.objects.all().delete()
+            Order.objects.filter(co_purchase_counted=True).update(co_purchase_counted=False)
+
+    withdrawn_count, withdrawn = _count_orders(
+        Order.objects.filter(co_purchase_counted=True).exclude(status='completed').order_by('pk'), -1,
+    )
+    added_count, added = _count_orders(
+        Order.objects.filter(status='completed', co_purchase_counted=False).order_by('pk'), 1,
+    )
+    order_count, touched = withdrawn_count + added_count, withdrawn | added
+
+    if touched:
+        with transaction.atomic():
+            _store_top(touched, limit)
+    return order_count, len(touched)
+
+
+def also_bought(item_id, limit=ALSO_BOUGHT_LIMIT):
+    """Ürün detay sayfası için birlikte alınan ürünler (CatalogItem); tek indeksli sorgu."""
+    related_ids = AlsoBought.objects.filter(item_id=item_id).order_by('rank').values_list('related_id', flat=True)
+    catalog = get_catalog()
+    return [item for item in map(catalog.get, related_ids[:limit]) if item is not None]
+
+
+def cart_recommendations(item_ids, limit=CART_RECOMMENDATION_LIMIT):
+    """Sepetteki ürünlerin komşu listeleri birleştirilir; sepette olanlar önerilmez."""
+    item_ids = set(item_ids)
+    if not item_ids:
+        return []
+    scores = Counter()
+    rows = AlsoBought.objects.filter(item_id__in=item_ids).values_list('related_id', 'count')
+    for related_id, count in rows:
+        if related_id not in item_ids:
+            scores[related_id] += count
+    catalog = get_catalog()
+    ranked = sorted(scores.items(), key=lambda entry: (-entry[1], -entry[0]))
+    return [item for item in (catalog.get(pk) for pk, _ in ranked) if item is not None][:limit]
@@ -0,0 +1,281 @@
+"""
+Blog yazıları için önceden hesaplanmış "benzer yazılar" indeksi.
+
+Her yazı seyrek bir özellik vektörüdür: etiketler, kategori ve başlık + içerikten
+TF-IDF ağırlıklı terimler. Benzerlik, ters indeks (özellik -> yazılar) üzerinden
+seyrek matris çarpımı (X · Xᵀ) satır satır yapılarak hesaplanır; sadece ortak
+etiketi veya terimi olan çiftler taranır. Kategori tek başına aday üretmez (aynı
+kategorideki her çifti taramak kategori büyüklüğünün karesiyle büyür); bulunan
+adaylardan aynı kategoride olanların skoruna eklenir. Her yazının en iyi RELATED_POSTS_LIMIT komşusu
+RelatedPost tablosuna yazılır ve detay sayfası tek bir indeksli sorgu ile okur.
+
+Yazıların terim sayıları PostTerm tablosunda tutulur. Tam kurulum
+(`build_related_posts`) tüm içerikleri okur ve tabloyu yeniden yazar. Yazı kaydında
+veya etiket değişikliğinde değişen yazılar ertelenmiş iş olarak kuyruğa eklenir
+(signals.py); `run_deferred_tasks` sadece bu yazıların içeriğini işler, indeksi de
+sadece bu yazılar, ortak etiket/terim üzerinden komşuları ve listesi yeniden
+hesaplanacak yazıların komşuları için kurar. Belge frekansları PostTerm'den
+sadece ilgili terimler için sayılır.
+"""
+import heapq
+import math
+import re
+from collections import Counter, defaultdict
+
+from django.db import transaction
+from django.db.models import Count, Min
+from django.utils.html import strip_tags
+
+from .models import BlogPost, PostTerm, RelatedPost
+
+RELATED_POSTS_LIMIT = 4
+
+# Skor = TAG_WEIGHT * ortak etiket sayısı + CATEGORY_WEIGHT * aynı kategori + TERM_WEIGHT * terim kosinüsü;
+# kategori ağırlığı sadece ortak etiketi veya terimi olan adaylara eklenir.
+TAG_WEIGHT = 3.0
+CATEGORY_WEIGHT = 2.0
+TERM_WEIGHT = 4.0
+
+# Yazıların yarısından fazlasında geçen terimler ayırt edici değildir ve ters indeksi şişirir.
+MAX_TERM_DOCUMENT_RATIO = 0.5
+MAX_TERMS_PER_POST = 50
+# PostTerm.term uzunluğu; daha uzun "kelimeler" (URL, kod parçası) terim sayılmaz.
+MAX_TERM_LENGTH = 50
+TOKEN_RE = re.compile(r'[^\W\d_]{3,}')
+STOP_WORDS = {
+    've', 'ile', 'bir', 'bu', 'için', 'gibi', 'daha', 'çok', 'olarak', 'olan', 'ama', 'veya', 'her', 'şu',
+    'the', 'and', 'for', 'with', 'that', 'this', 'are', 'from', 'you', 'your', 'our', 'was', 'not',
+}
+# Çok sayıda pk/terimle yapılan IN sorguları bu boyutta parçalanır (SQLite parametre sınırı).
+IN_BATCH_SIZE = 500
+
+
+def _terms(title, content):
+    text = f'{title} {strip_tags(content or "")}'.lower()
+    return Counter(
+        token for token in TOKEN_RE.findall(text) if token not in STOP_WORDS and len(token) <= MAX_TERM_LENGTH
+    )
+
+
+def _batches(values):
+    values = list(values)
+    for start in range(0, len(values), IN_BATCH_SIZE):
+        yield values[start:start + IN_BATCH_SIZE]
+
+
+class RelatedIndex:
+    """Yazıların seyrek özellik vektörleri ve ters indeksi; tüm yazılar (`build`) veya bir alt kümesi (`load`)."""
+
+    def __init__(self, term_counts, categories, tags, document_frequency, document_count):
+        self.term_counts = term_counts
+        self.categories = categories
+        self.tags = tags
+
+        max_df = max(2, document_count * MAX_TERM_DOCUMENT_RATIO)
+        idf = {
+            term: math.log((1 + document_count) / (1 + df)) + 1
+            for term, df in document_frequency.items() if 1 < df <= max_df
+        }
+
+        # Satırlar L2-normalize edilir; iki satırın iç çarpımı doğrudan kosinüs benzerliğidir.
+        self.vectors = {}
+        for pk, counts in term_counts.items():
+            weights = {term: (1 + math.log(count)) * idf[term] for term, count in counts.items() if term in idf}
+            weights = dict(heapq.nlargest(MAX_TERMS_PER_POST, weights.items(), key=lambda item: item[1]))
+            norm = math.sqrt(sum(weight * weight for weight in weights.values())) or 1.0
+            self.vectors[pk] = {term: weight / norm for term, weight in weights.items()}
+
+        self.term_postings = defaultdict(list)
+        for pk, weights in self.vectors.items():
+            for term, weight in weights.items():
+                self.term_postings[term].append((pk, weight))
+        self.tag_postings = defaultdict(list)
+        for pk, tag_ids in self.tags.items():
+            for tag_id in tag_ids:
+                self.tag_postings[tag_id].append(pk)
+
+    @classmethod
+    def build(cls):
+        """Tüm yayınlanmış yazılar; içerikler okunup terimlere ayrılır."""
+        posts = BlogPost.objects.filter(status='published').values_list('pk', 'title', 'content', 'category_id')
+        term_counts, categories = {}, {}
+        for pk, title, content, category_id in posts.iterator(chunk_size=500):
+            term_counts[pk] = _terms(title, content)
+            categories[pk] = category_id
+
+        tags = defaultdict(set)
+        tag_rows = BlogPost.tags.through.objects.filter(blogpost__status='published').values_list('blogpost_id', 'tag_id')
+        for post_id, tag_id in tag_rows.iterator(chunk_size=2000):
+            tags[post_id].add(tag_id)
+
+        document_frequency = Counter(term for counts in term_counts.values() for term in counts)
+        return cls(term_counts, categories, tags, document_frequency, len(term_counts))
+
+    @classmethod
+    def load(cls, post_ids):
+        """
+        Sadece verilen yayınlanmış yazılar; terim sayıları PostTerm'den okunur. Belge frekansları
+        tüm yayınlanmış yazılar üzerinden, sadece bu yazıların terimleri için sayılır.
+        """
+        categories = {}
+        for batch in _batches(post_ids):
+            categories.update(BlogPost.objects.filter(pk__in=batch, status='published').values_list('pk', 'category_id'))
+
+        term_counts = {pk: Counter() for pk in categories}
+        tags = defaultdict(set)
+        for batch in _batches(categories):
+            for post_id, term, count in PostTerm.objects.filter(post_id__in=batch).values_list('post_id', 'term', 'count'):
+                term_counts[post_id][term] = count
+            through = BlogPost.tags.through.objects.filter(blogpost_id__in=batch)
+            for post_id, tag_id in through.values_list('blogpost_id', 'tag_id'):
+                tags[post_id].add(tag_id)
+
+        document_frequency = {}
+        for batch in _batches({term for counts in term_counts.values() for term in counts}):
+            document_frequency.update(
+                PostTerm.objects.filter(term__in=batch, post__status='published').order_by()
+                .values('term').annotate(df=Count('pk')).values_list('term', 'df')
+            )
+        document_count = BlogPost.objects.filter(status='published').count()
+        return cls(term_counts, categories, tags, document_frequency, document_count)
+
+    def __contains__(self, pk):
+        return pk in self.categories
+
+    def scores(self, pk):
+        """Bir yazının ortak etiketi veya terimi olan yazılarla skoru: {diğer_pk: skor}."""
+        scores = defaultdict(float)
+        for tag_id in self.tags.get(pk, ()):
+            for other in self.tag_postings[tag_id]:
+                scores[other] += TAG_WEIGHT
+        for term, weight in self.vectors.get(pk, {}).items():
+            for other, other_weight in self.term_postings[term]:
+                scores[other] += TERM_WEIGHT * weight * other_weight
+        scores.pop(pk, None)
+        category_id = self.categories.get(pk)
+        if category_id:
+            for other in scores:
+                if self.categories[other] == category_id:
+                    scores[other] += CATEGORY_WEIGHT
+        return scores
+
+    def top(self, pk, limit=RELATED_POSTS_LIMIT):
+        # Eşit skorda yeni yazı (büyük pk) önce gelir.
+        return heapq.nlargest(limit, self.scores(pk).items(), key=lambda item: (item[1], item[0]))
+
+    def candidates(self):
+        """Bu indeksteki yazılarla ortak etiketi veya vektör terimi olan tüm yayınlanmış yazılar."""
+        tag_ids = {tag_id for tag_ids in self.tags.values() for tag_id in tag_ids}
+        terms = {term for weights in self.vectors.values() for term in weights}
+        found = set(self.categories)
+        for batch in _batches(tag_ids):
+            found.update(
+                BlogPost.tags.through.objects.filter(tag_id__in=batch, blogpost__status='published')
+                .values_list('blogpost_id', flat=True)
+            )
+        for batch in _batches(terms):
+            found.update(PostTerm.objects.filter(term__in=batch).values_list('post_id', flat=True))
+        return found
+
+
+def _index_around(post_ids):
+    """Verilen yazılar ve skorlarının hesaplanması için gereken tüm komşuları içeren indeks."""
+    return RelatedIndex.load(RelatedIndex.load(post_ids).candidates())
+
+
+def _store(post_id, neighbours):
+    RelatedPost.objects.filter(post_id=post_id).delete()
+    RelatedPost.objects.bulk_create([
+        RelatedPost(post_id=post_id, related_id=related_id, score=score, rank=rank)
+        for rank, (related_id, score) in enumerate(neighbours, start=1)
+    ])
+
+
+def _term_rows(pk, counts):
+    return [PostTerm(post_id=pk, term=term, count=count) for term, count in counts.items()]
+
+
+def _update_terms(post_ids):
+    """Değişen yazıların PostTerm satırlarını yeniden yazar; yayında olmayanlarınkini siler."""
+    posts = BlogPost.objects.filter(pk__in=post_ids, status='published').values_list('pk', 'title', 'content')
+    rows = [row for pk, title, content in posts for row in _term_rows(pk, _terms(title, content))]
+    PostTerm.objects.filter(post_id__in=post_ids).delete()
+    PostTerm.objects.bulk_create(rows, batch_size=1000)
+
+
+def build_related_posts(limit=RELATED_POSTS_LIMIT):
+    """Tüm tabloyu (ve PostTerm'i) baştan hesaplar; hesaplanan yazı sayısını döndürür."""
+    index = RelatedIndex.build()
+    rows = [
+        RelatedPost(post_id=pk, related_id=related_id, score=score, rank=rank)
+        for pk in index.categories
+        for rank, (related_id, score) in enumerate(index.top(pk, limit), start=1)
+    ]
+    with transaction.atomic():
+        PostTerm.objects.all().delete()
+        PostTerm.objects.bulk_create(
+            [row for pk, counts in index.term_counts.items() for row in _term_rows(pk, counts)], batch_size=1000,
+        )
+        RelatedPost.objects.all().delete()
+        RelatedPost.objects.bulk_create(rows, batch_size=1000)
+    return len(index.categories)
+
+
+def refresh_related_posts(post_ids, limit=RELATED_POSTS_LIMIT):
+    """
+    Değişen yazıların komşu listelerini yeniden hesaplar. Diğer yazıların listeleri sadece
+    değişen yazı onların listesinde olduğunda veya artık listeye girecek kadar yakın olduğunda
+    güncellenir. Sadece değişen yazıların içeriği okunur; indeks değişen ve güncellenecek
+    yazıların ortak etiket/terimli komşuları için kurulur.
+    """
+    # Ertelenmiş işten argümanlar metin olarak gelir.
+    post_ids = {int(pk) for pk in post_ids}
+    if not PostTerm.objects.exists():
+        # Terim tablosu henüz doldurulmamış (ilk kurulum): komşular bulunamaz, tam kurulum yapılır.
+        return build_related_posts(limit)
+
+    with transaction.atomic():
+        _update_terms(post_ids)
+        index = _index_around(post_ids)
+        changed = post_ids & set(index.categories)
+
+        # Listesinde değişen yazı olanlar her durumda etkilenir (yazı silinmiş/taslağa alınmış olabilir).
+        affected = set(RelatedPost.objects.filter(related_id__in=post_ids).values_list('post_id', flat=True))
+        # Diğer adaylar için sadece liste uzunluğu ve en düşük skor gerekir.
+        scores = {pk: index.scores(pk) for pk in changed}
+        candidates = {other for pk_scores in scores.values() for other in pk_scores} - affected - post_ids
+        thresholds = {}
+        for batch in _batches(candidates):
+            thresholds.update(
+                (row['post_id'], (row['count'], row['lowest']))
+                for row in RelatedPost.objects.filter(post_id__in=batch).order_by()
+                .values('post_id').annotate(count=Count('pk'), lowest=Min('score'))
+            )
+        for pk_scores in scores.values():
+            for other, score in pk_scores.items():
+                if other not in candidates:
+                    continue
+                count, lowest = thresholds.get(other, (0, None))
+                if count < limit or score > lowest:
+                    affected.add(other)
+
+        published = set(BlogPost.objects.filter(pk__in=post_ids | affected, status='published').values_list('pk', flat=True))
+        recompute = (post_ids | affected) & published
+        # Etkilenen yazıların skorları için onların komşuları da gerekir.
+        if recompute - changed:
+            index = _index_around(recompute)
+
+        RelatedPost.objects.filter(post_id__in=(post_ids | affected) - published).delete()
+        for pk in recompute:
+            _store(pk, index.top(pk, limit))
+    return len(post_ids | affected)
+
+
+def related_posts(post):
+    """Detay sayfası için komşular: (post_id, rank) indeksi üzerinden tek sorgu."""
+    entries = (
+        RelatedPost.objects.filter(post_id=post.pk, related__status='published')
+        .select_related('related').only('related__title', 'related__slug', 'related__created_at', 'related__image')
+        .order_by('rank')
+    )
+    return [entry.related for entry in entries]
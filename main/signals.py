@@ -1,7 +1,21 @@
-from django.db.models.signals import post_save, post_delete
+import logging
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete, m2m_changed, pre_save, pre_delete
 from django.contrib.auth.models import User
 from django.dispatch import receiver
-from .models import Profile, OrderItem
+from .blog_stats import invalidate_sidebar, month_of, refresh_archive_months, refresh_category_counts, \
+    refresh_tag_counts
+from .catalog import CATALOG_MODELS, bump_catalog_version
+from .comments import refresh_comment_count
+from .conditional import CONTENT_MODELS, FEED_MODELS, FEED_VERSION_KEY, bump_content_version
+from . import deferred, sitemaps
+from .icons import icon_names_in, subset_manifest
+from .purge import missing_classes
+from .models import Profile, OrderItem, Service, Feature, Comment, BlogPost, Tag, Category, RelatedPost
+
+logger = logging.getLogger(__name__)
 
 @receiver(post_save, sender=User)
 def create_profile(sender, instance, created, **kwargs):
@@ -21,5 +35,163 @@ def delete_empty_order(sender, instance, **kwargs):
     """
     order = instance.order
     if order.items.count() == 0:
+        # delete() sonrasında order.id None olur.
+        order_id = order.id
         order.delete()
-        print(f"Sinyal: Sepet {order.id} boş olduğu için silindi.")
\ No newline at end of file
+        logger.info("Sepet %s boş olduğu için silindi.", order_id)
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def update_comment_count(sender, instance, **kwargs):
+    """Yorum eklendiğinde, onay durumu değiştiğinde veya silindiğinde yazının comment_count alanını günceller."""
+    refresh_comment_count(instance.post_id)
+
+
+@receiver(pre_save, sender=BlogPost)
+def remember_blog_post_state(sender, instance, **kwargs):
+    """Sayaçlar için yazının kaydedilmeden önceki durumunu, kategorisini ve ayını saklar."""
+    instance._counter_state = None
+    if instance.pk and not kwargs.get('raw'):
+        instance._counter_state = BlogPost.objects.filter(pk=instance.pk).values(
+            'status', 'category_id', 'created_at'
+        ).first()
+
+
+@receiver(post_save, sender=BlogPost)
+def update_blog_counters_on_save(sender, instance, created, **kwargs):
+    """Sadece etkilenen kategori, ay ve (yayın durumu değiştiyse) etiket sayaçlarını yeniden hesaplar."""
+    if kwargs.get('raw'):
+        return
+    old = getattr(instance, '_counter_state', None) or {}
+    categories = {old.get('category_id'), instance.category_id}
+    months = {month_of(instance.created_at)}
+    if old.get('created_at'):
+        months.add(month_of(old['created_at']))
+    refresh_category_counts(categories)
+    refresh_archive_months(months)
+    if not created and old.get('status') != instance.status:
+        refresh_tag_counts(instance.tags.values_list('pk', flat=True))
+
+
+@receiver(pre_delete, sender=BlogPost)
+def remember_blog_post_tags(sender, instance, **kwargs):
+    # Silme sırasında m2m satırları m2m_changed olmadan gider; etiketler önceden alınır.
+    instance._counter_tag_ids = list(instance.tags.values_list('pk', flat=True))
+
+
+@receiver(post_delete, sender=BlogPost)
+def update_blog_counters_on_delete(sender, instance, **kwargs):
+    refresh_category_counts({instance.category_id})
+    refresh_archive_months({month_of(instance.created_at)})
+    refresh_tag_counts(getattr(instance, '_counter_tag_ids', []))
+
+
+@receiver(m2m_changed, sender=BlogPost.tags.through)
+def update_tag_counters(sender, instance, action, reverse, pk_set, **kwargs):
+    """Yazıya etiket eklendiğinde/çıkarıldığında ilgili etiket sayaçlarını günceller."""
+    if action == 'pre_clear':
+        # clear() pk_set vermez; temizlenecek etiketler önceden alınır.
+        instance._counter_tag_ids = [instance.pk] if reverse else list(instance.tags.values_list('pk', flat=True))
+    elif action == 'post_clear':
+        refresh_tag_counts(getattr(instance, '_counter_tag_ids', []))
+    elif action in ('post_add', 'post_remove'):
+        refresh_tag_counts([instance.pk] if reverse else pk_set or [])
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def refresh_blog_sidebar(sender, **kwargs):
+    """Etiket/kategori adı veya slug'ı değiştiğinde önbellekteki sidebar'ı geçersiz kılar."""
+    invalidate_sidebar()
+
+
+@receiver(post_save, sender=Service)
+@receiver(post_save, sender=Feature)
+def refresh_icon_subset(sender, instance, **kwargs):
+    """
+    Kaydedilen ikon mevcut font alt kümesinde yoksa alt kümenin yeniden üretilmesini
+    `run_deferred_tasks` komutuna bırakır; statik dosyalar admin isteğinde yazılmaz.
+    Alt küme hiç üretilmemişse site tam ikon setini kullandığından bir şey yapılmaz.
+    Silme işlemlerinde alt küme zaten bir üst küme olarak kalır.
+    """
+    subset = subset_manifest()
+    if subset is None:
+        return
+    if not icon_names_in(instance.icon_class) <= subset:
+        deferred.schedule('icons')
+
+
+@receiver(post_save, sender=Service)
+@receiver(post_save, sender=Feature)
+def refresh_purged_css(sender, instance, **kwargs):
+    """
+    Kaydedilen sınıf adları (Service.color_class, icon_class) temizlenmiş CSS'te yoksa
+    temizlemenin tekrarlanmasını `run_deferred_tasks` komutuna bırakır. Temizleme hiç
+    yapılmamışsa site tam stil dosyalarını kullandığından bir şey yapılmaz.
+    """
+    classes = ' '.join(filter(None, [getattr(instance, 'color_class', ''), instance.icon_class]))
+    if missing_classes(classes):
+        deferred.schedule('css')
+
+
+@receiver([post_save, post_delete, m2m_changed])
+def content_changed(sender, **kwargs):
+    """Detay sayfalarında veya akışlarda görünen bir model değiştiğinde koşullu GET doğrulayıcılarını geçersiz kılar."""
+    # Commit'ten önce güncellenirse eşzamanlı bir istek eski satırlarla yeni sürümün ETag'ini üretip önbelleğe alır.
+    if sender in CONTENT_MODELS:
+        transaction.on_commit(bump_content_version)
+    if sender in FEED_MODELS:
+        transaction.on_commit(partial(bump_content_version, FEED_VERSION_KEY))
+
+
+@receiver([post_save, post_delete])
+def catalog_changed(sender, **kwargs):
+    """Katalogdaki bir ürün, kategori veya hizmet değiştiğinde süreç içi katalog görüntülerini eskitir."""
+    if sender in CATALOG_MODELS:
+        # Commit'ten önce güncellenirse başka bir süreç eski veriyi yeni sürümle yükleyebilir.
+        transaction.on_commit(bump_catalog_version)
+
+
+@receiver([post_save, post_delete])
+def refresh_sitemap_section(sender, **kwargs):
+    """BlogPost veya PortfolioItem değiştiğinde sadece ilgili site haritası bölümünün yeniden yazılmasını erteler."""
+    section = sitemaps.SECTION_MODELS.get(sender)
+    if section is None or kwargs.get('raw'):
+        return
+    deferred.schedule('sitemap', section)
+
+
+@receiver(post_save, sender=BlogPost)
+def refresh_related_on_save(sender, instance, **kwargs):
+    """Kaydedilen yazının ve ona yakın yazıların benzer yazı listelerinin güncellenmesini erteler."""
+    if not kwargs.get('raw'):
+        deferred.schedule('related-posts', instance.pk)
+
+
+@receiver(m2m_changed, sender=BlogPost.tags.through)
+def refresh_related_on_tags(sender, instance, action, reverse, pk_set, **kwargs):
+    if reverse and action == 'pre_clear':
+        # Etiket tarafından clear(): etkilenen yazılar temizlenmeden önce alınır.
+        instance._related_post_ids = list(instance.blog_posts.values_list('pk', flat=True))
+        return
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        post_ids = [instance.pk]
+    elif action == 'post_clear':
+        post_ids = getattr(instance, '_related_post_ids', [])
+    else:
+        post_ids = pk_set or []
+    if post_ids:
+        deferred.schedule('related-posts', *post_ids)
+
+
+@receiver(pre_delete, sender=BlogPost)
+def refresh_related_on_delete(sender, instance, **kwargs):
+    # Cascade ile silinecek satırlardan önce, bu yazıyı listesinde gösteren yazılar alınır.
+    listing = list(RelatedPost.objects.filter(related=instance).values_list('post_id', flat=True))
+    if listing:
+        deferred.schedule('related-posts', *listing)
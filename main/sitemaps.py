@@ -1,39 +1,201 @@
-from django.contrib.sitemaps import Sitemap
+"""
+Diske önceden yazılan site haritaları.
+
+Her bölüm (statik sayfalar, blog, portfolyo) en fazla SITEMAP_PAGE_SIZE URL içeren
+gzip'li dosyalara bölünür ve `sitemap.xml` bu dosyaları listeleyen bir sitemap
+index'tir. Satırlar `values_list` ile akış halinde okunur; bir BlogPost veya
+PortfolioItem değiştiğinde sadece o bölümün yeniden yazılması ertelenmiş iş olarak
+kuyruğa eklenir (signals.py) ve `run_deferred_tasks` ile admin isteği dışında yapılır.
+Dosyalar SITEMAP_ROOT altındadır ve web sunucusu tarafından statik olarak sunulur;
+bölüm sayfalarını listeleyen manifest (SITEMAP_MANIFEST) bu dizinin dışındadır.
+Bölümler cron ve worker süreçlerinde aynı anda yazılabildiği için manifest'in
+güncellenmesi bir dosya kilidiyle sıraya konur.
+"""
+import gzip
+import json
+import os
+from datetime import datetime, timezone as dt_timezone
+from pathlib import Path
+from xml.sax.saxutils import escape
+
+from django.conf import settings
 from django.urls import reverse
+
+from .file_lock import file_lock
 from .models import BlogPost, PortfolioItem
 
-class StaticViewSitemap(Sitemap):
-    """Statik sayfalar için site haritası"""
-    priority = 0.8
-    changefreq = 'weekly'
+# Protokol sınırı: bir sitemap dosyasında en fazla 50.000 URL.
+SITEMAP_PAGE_SIZE = 50000
+SITEMAP_INDEX = 'sitemap.xml'
+SITEMAP_FILES_URL = '/sitemaps/'
+# Eski sürümlerin SITEMAP_ROOT altına yazdığı manifest; ilk güncellemede taşınır.
+LEGACY_MANIFEST_NAME = 'manifest.json'
+SLUG_PLACEHOLDER = 'slug-placeholder'
+# Haritalar henüz üretilmemişken crawler'a önerilen bekleme (sn); `run_deferred_tasks` birkaç dakikada bir çalışır.
+RETRY_AFTER = 600
+
+XML_HEADER = '<?xml version="1.0" encoding="UTF-8"?>\n'
+URLSET_OPEN = '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+URLSET_CLOSE = '</urlset>\n'
+
+
+def _static_rows():
+    # Site haritasına eklemek istediğimiz statik sayfaların URL adları
+    for name in ['index', 'about', 'services', 'portfolio', 'blog', 'contact']:
+        yield reverse(name), None
+
+
+def _slug_rows(queryset, url_name, date_field):
+    # reverse() her satır için çağrılmaz; URL şablonu bir kez çözülüp slug yerleştirilir.
+    prefix, suffix = reverse(url_name, kwargs={'slug': SLUG_PLACEHOLDER}).split(SLUG_PLACEHOLDER)
+    rows = queryset.order_by('pk').values_list('slug', date_field).iterator(chunk_size=2000)
+    for slug, lastmod in rows:
+        if slug:
+            yield f'{prefix}{slug}{suffix}', lastmod
+
+
+def _blog_rows():
+    # Sadece yayınlanmış yazıları dahil et
+    return _slug_rows(BlogPost.objects.filter(status='published'), 'blog_details', 'updated_at')
+
+
+def _portfolio_rows():
+    return _slug_rows(PortfolioItem.objects.all(), 'portfolio_details', 'created_at')
+
+
+# bölüm adı -> (satır üreteci, changefreq, priority)
+SECTIONS = {
+    'static': (_static_rows, 'weekly', '0.8'),
+    'blog': (_blog_rows, 'daily', '0.9'),
+    'portfolio': (_portfolio_rows, 'monthly', '0.7'),
+}
+
+# Değiştiğinde ilgili bölümün yeniden yazılması gereken modeller.
+SECTION_MODELS = {
+    BlogPost: 'blog',
+    PortfolioItem: 'portfolio',
+}
+
+
+def sitemap_root():
+    return Path(settings.SITEMAP_ROOT)
+
+
+def manifest_path():
+    return Path(settings.SITEMAP_MANIFEST)
+
+
+def _lock_path():
+    path = manifest_path()
+    return path.with_name(f'.{path.name}.lock')
+
+
+def _base_url():
+    return settings.SITE_URL.rstrip('/')
+
+
+def _url_entry(base_url, location, lastmod, changefreq, priority):
+    entry = f'<url><loc>{escape(base_url + location)}</loc>'
+    if lastmod:
+        entry += f'<lastmod>{lastmod.date().isoformat()}</lastmod>'
+    return entry + f'<changefreq>{changefreq}</changefreq><priority>{priority}</priority></url>\n'
+
+
+def _atomic_write(path, data):
+    # Tarayıcı/crawler yarım yazılmış bir dosya görmesin.
+    tmp_path = path.with_name(f'.{path.name}.{os.getpid()}.tmp')
+    tmp_path.write_bytes(data)
+    os.replace(tmp_path, path)
+
+
+def _write_page(root, name, entries):
+    body = XML_HEADER + URLSET_OPEN + ''.join(entries) + URLSET_CLOSE
+    # mtime=0: içerik aynıysa gzip çıktısı da byte byte aynı kalır.
+    _atomic_write(root / name, gzip.compress(body.encode('utf-8'), mtime=0))
+
+
+def _load_manifest():
+    path = manifest_path()
+    if not path.exists():
+        path = sitemap_root() / LEGACY_MANIFEST_NAME
+        if not path.exists():
+            return {}
+    return json.loads(path.read_text(encoding='utf-8'))
+
+
+def build_section(section, page_size=SITEMAP_PAGE_SIZE):
+    """Bir bölümün sayfalarını yeniden yazar ve index'i günceller. Yazılan dosya adlarını döndürür."""
+    rows, changefreq, priority = SECTIONS[section]
+    root = sitemap_root()
+    root.mkdir(parents=True, exist_ok=True)
+    base_url = _base_url()
+
+    # Aynı bölümü yazan iki süreç sayfaları, diğer bölümleri yazanlar manifest'i ezmesin.
+    with file_lock(_lock_path()):
+        pages = _write_section_pages(root, section, rows(), base_url, changefreq, priority, page_size)
+        manifest = _load_manifest()
+        manifest[section] = pages
+        _atomic_write(manifest_path(), json.dumps(manifest, indent=2).encode('utf-8'))
+        (root / LEGACY_MANIFEST_NAME).unlink(missing_ok=True)
+        write_index(manifest)
+    return list(pages)
+
+
+def _write_section_pages(root, section, rows, base_url, changefreq, priority, page_size):
+    """Bölüm sayfalarını yazar, eskilerini siler; {dosya adı: lastmod} döndürür."""
+    pages = {}
+    entries, page_lastmod = [], None
+    for location, lastmod in rows:
+        entries.append(_url_entry(base_url, location, lastmod, changefreq, priority))
+        if lastmod and (page_lastmod is None or lastmod > page_lastmod):
+            page_lastmod = lastmod
+        if len(entries) == page_size:
+            name = f'sitemap-{section}-{len(pages) + 1}.xml.gz'
+            _write_page(root, name, entries)
+            pages[name] = page_lastmod.isoformat() if page_lastmod else None
+            entries, page_lastmod = [], None
+    if entries or not pages:
+        name = f'sitemap-{section}-{len(pages) + 1}.xml.gz'
+        _write_page(root, name, entries)
+        pages[name] = page_lastmod.isoformat() if page_lastmod else None
+
+    # Bölüm küçüldüyse artık index'te olmayan eski sayfalar silinir.
+    for stale in root.glob(f'sitemap-{section}-*.xml.gz'):
+        if stale.name not in pages:
+            stale.unlink()
+    return pages
 
-    def items(self):
-        # Site haritasına eklemek istediğimiz statik sayfaların URL adları
-        return ['index', 'about', 'services', 'portfolio', 'blog', 'contact']
 
-    def location(self, item):
-        return reverse(item)
+def write_index(manifest):
+    base_url = _base_url()
+    generated = datetime.now(dt_timezone.utc).date().isoformat()
+    parts = [XML_HEADER, '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n']
+    for section in SECTIONS:
+        for name, lastmod in manifest.get(section, {}).items():
+            lastmod = datetime.fromisoformat(lastmod).date().isoformat() if lastmod else generated
+            parts.append(
+                f'<sitemap><loc>{escape(base_url + SITEMAP_FILES_URL + name)}</loc>'
+                f'<lastmod>{lastmod}</lastmod></sitemap>\n'
+            )
+    parts.append('</sitemapindex>\n')
+    _atomic_write(sitemap_root() / SITEMAP_INDEX, ''.join(parts).encode('utf-8'))
 
-class BlogPostSitemap(Sitemap):
-    """Blog yazıları için dinamik site haritası"""
-    changefreq = "daily"
-    priority = 0.9
 
-    def items(self):
-        # Sadece yayınlanmış yazıları dahil et
-        return BlogPost.objects.filter(status='published')
+def build_sitemaps(sections=None, page_size=SITEMAP_PAGE_SIZE):
+    """Verilen (varsayılan: tüm) bölümleri yeniden yazar; {bölüm: dosya adları} döndürür."""
+    return {section: build_section(section, page_size) for section in sections or SECTIONS}
 
-    def lastmod(self, obj):
-        # Her yazının en son güncellenme tarihini al
-        return obj.updated_at
 
-class PortfolioItemSitemap(Sitemap):
-    """Portfolyo projeleri için dinamik site haritası"""
-    changefreq = "monthly"
-    priority = 0.7
+def rebuild_sections(sections):
+    """Ertelenmiş iş ('sitemap'): değişen bölümleri yeniden yazar."""
+    # Henüz hiç üretilmemişse (örn. sitemap.xml ilk kez istendiğinde) tüm bölümler birlikte yazılır.
+    if not index_exists():
+        build_sitemaps()
+        return
+    for section in sorted(sections):
+        if section in SECTIONS:
+            build_section(section)
 
-    def items(self):
-        return PortfolioItem.objects.all()
 
-    def lastmod(self, obj):
-        return obj.created_at
\ No newline at end of file
+def index_exists():
+    return (sitemap_root() / SITEMAP_INDEX).exists()
@@ -0,0 +1,161 @@
+"""
+Yavaş sorgu yakalama.
+
+`SlowQueryMiddleware` isteğin bağlantılarına bir execute wrapper ekler; süresi
+SLOW_QUERY_THRESHOLD_MS'i aşan sorgular normalize edilmiş SQL, parmak izi,
+çağıran view ve kısaltılmış yığın ile süreç içindeki sınırlı bir halka
+tampona (en fazla SLOW_QUERY_BUFFER_SIZE kayıt, en eskisi düşer) eklenir.
+Parametreler saklanmaz. Tampon SLOW_QUERY_FLUSH_INTERVAL saniyede bir (bir
+sonraki istekten sonra) veya süreç kapanırken SlowQuery tablosuna toplu
+yazılır; SLOW_QUERY_RETENTION_DAYS'ten eski kayıtlar aynı anda silinir.
+Yönetim panelindeki liste kayıtları parmak izine göre toplar.
+"""
+import atexit
+import hashlib
+import logging
+import os
+import re
+import threading
+import time
+import traceback
+from collections import deque
+from contextlib import ExitStack
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import DatabaseError, connections
+from django.utils import timezone
+
+from .models import SlowQuery
+
+logger = logging.getLogger(__name__)
+
+SLOW_QUERY_BUFFER_SIZE = 500
+SLOW_QUERY_FLUSH_INTERVAL = 60
+SLOW_QUERY_RETENTION_DAYS = 14
+STACK_DEPTH = 8
+
+_buffer = deque(maxlen=SLOW_QUERY_BUFFER_SIZE)
+_lock = threading.Lock()
+_last_flush = time.monotonic()
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'\b\d+(?:\.\d+)?\b')
+_IN_LIST = re.compile(r'\bIN\s*\((?:\s*(?:%s|\?)\s*,?)+\)', re.IGNORECASE)
+_SPACE = re.compile(r'\s+')
+
+_PROJECT_DIR = str(settings.BASE_DIR)
+# Yığında gösterilmeyen ölçüm/middleware modülleri; her sorguda aynı çerçeveleri eklerler.
+_SKIPPED_FILES = {
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), f'{module}.py')
+    for module in ('slow_queries', 'metrics', 'profiling', 'logs', 'db_metrics', 'db_router', 'benchmark')
+}
+
+
+def normalize(sql):
+    """Sabitler ve değişken uzunluklu IN listeleri tek bir yer tutucuya indirgenir."""
+    sql = _STRING.sub('?', sql)
+    sql = _NUMBER.sub('?', sql)
+    sql = sql.replace('%s', '?')
+    sql = _IN_LIST.sub('IN (...)', sql)
+    return _SPACE.sub(' ', sql).strip()
+
+
+def fingerprint(normalized_sql):
+    return hashlib.sha1(normalized_sql.encode('utf-8')).hexdigest()
+
+
+def _stack():
+    # Sadece proje kodu; Django ve kütüphane çerçeveleri atlanır.
+    frames = [
+        frame for frame in traceback.extract_stack()
+        if frame.filename.startswith(_PROJECT_DIR) and frame.filename not in _SKIPPED_FILES
+        and 'site-packages' not in frame.filename
+    ]
+    return '\n'.join(
+        f"{os.path.relpath(frame.filename, _PROJECT_DIR)}:{frame.lineno} {frame.name}"
+        for frame in frames[-STACK_DEPTH:]
+    )
+
+
+def _threshold():
+    return getattr(settings, 'SLOW_QUERY_THRESHOLD_MS', 200) / 1000
+
+
+class SlowQueryRecorder:
+    """Execute wrapper: eşiği aşan sorguları tampona ekler."""
+
+    def __init__(self, request, alias):
+        self.request = request
+        self.alias = alias
+        self.threshold = _threshold()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            if elapsed >= self.threshold:
+                self.capture(sql, elapsed)
+
+    def capture(self, sql, elapsed):
+        normalized = normalize(sql)
+        match = self.request.resolver_match
+        with _lock:
+            _buffer.append(SlowQuery(
+                fingerprint=fingerprint(normalized),
+                sql=normalized,
+                duration_ms=round(elapsed * 1000, 2),
+                database=self.alias,
+                view=(match.view_name if match else self.request.path)[:200],
+                stack=_stack(),
+                captured_at=timezone.now(),
+            ))
+
+
+def flush_slow_queries():
+    """Tampondaki kayıtları yazar ve eski kayıtları siler. Yazılan kayıt sayısını döndürür."""
+    with _lock:
+        pending = list(_buffer)
+        _buffer.clear()
+    if not pending:
+        return 0
+    try:
+        SlowQuery.objects.bulk_create(pending)
+        cutoff = timezone.now() - timedelta(days=SLOW_QUERY_RETENTION_DAYS)
+        SlowQuery.objects.filter(captured_at__lt=cutoff).delete()
+    except DatabaseError:
+        # Yazılamayan kayıtlar atılır; yakalama isteği asla hataya düşürmez.
+        logger.exception("Yavaş sorgular yazılamadı: %s kayıt", len(pending))
+        return 0
+    return len(pending)
+
+
+def _maybe_flush():
+    global _last_flush
+    with _lock:
+        due = bool(_buffer) and time.monotonic() - _last_flush >= SLOW_QUERY_FLUSH_INTERVAL
+        if due:
+            _last_flush = time.monotonic()
+    if due:
+        flush_slow_queries()
+
+
+class SlowQueryMiddleware:
+    """İsteğin tüm bağlantılarında yavaş sorguları yakalar; tamponu istekten sonra boşaltır."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(SlowQueryRecorder(request, alias)))
+            response = self.get_response(request)
+        # Tampon yazımı yakalamanın dışında kalır; kendi sorguları kaydedilmez.
+        _maybe_flush()
+        return response
+
+
+atexit.register(flush_slow_queries)
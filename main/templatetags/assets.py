@@ -0,0 +1,69 @@
+from django import template
+from django.templatetags.static import static
+from django.utils.html import format_html, format_html_join
+from django.utils.safestring import mark_safe
+
+from main.assets import SITE_STYLESHEETS, bundle_files, load_critical_css, stylesheet_path
+
+register = template.Library()
+
+
+def _template_name(context):
+    # `extends` kullanılsa bile context.template, render edilen alt şablondur (örn. blog.html).
+    return getattr(context.template, 'name', None)
+
+
+def _has_critical_css(context):
+    return bool(load_critical_css(_template_name(context)))
+
+
+def _resolve_url(path):
+    if path.startswith(('http://', 'https://', '//')):
+        return path
+    return static(stylesheet_path(path))
+
+
+def _stylesheet_tag(url, deferred):
+    if not deferred:
+        return format_html('<link href="{}" rel="stylesheet">', url)
+    # Kritik CSS satır içi olduğunda tam stil dosyası render'ı bloklamadan yüklenir.
+    return format_html(
+        '<link rel="preload" href="{0}" as="style" onload="this.onload=null;this.rel=\'stylesheet\'">'
+        '<noscript><link href="{0}" rel="stylesheet"></noscript>',
+        url,
+    )
+
+
+@register.simple_tag(takes_context=True)
+def critical_css(context):
+    """Şablon için `build_critical_css` ile üretilmiş kritik CSS'i <style> olarak gömer."""
+    css = load_critical_css(_template_name(context))
+    if not css:
+        return ''
+    return mark_safe(f'<style id="critical-css">{css}</style>')
+
+
+@register.simple_tag(takes_context=True)
+def stylesheet(context, path):
+    """Tek bir stil dosyası; kritik CSS varsa asenkron yüklenir."""
+    return _stylesheet_tag(_resolve_url(path), _has_critical_css(context))
+
+
+@register.simple_tag(takes_context=True)
+def site_stylesheets(context):
+    deferred = _has_critical_css(context)
+    return mark_safe(''.join(_stylesheet_tag(_resolve_url(path), deferred) for path in SITE_STYLESHEETS))
+
+
+@register.simple_tag(takes_context=True)
+def vendor_assets(context, *bundles):
+    """
+    Şablonun ihtiyaç duyduğu vendor paketlerini (varsayılanlarla birlikte) yükler.
+    Script'ler `defer` ile eklenir; sıraları korunur ve HTML ayrıştırmasını bloklamazlar.
+    """
+    deferred = _has_critical_css(context)
+    styles = ''.join(_stylesheet_tag(_resolve_url(path), deferred) for path in bundle_files(bundles, 'css'))
+    scripts = format_html_join(
+        '', '<script src="{}" defer></script>', ((static(path),) for path in bundle_files(bundles, 'js'))
+    )
+    return mark_safe(styles + scripts)
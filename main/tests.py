@@ -1,3 +1,1963 @@
-from django.test import TestCase
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+from collections import Counter
+from datetime import date, timedelta
+from decimal import Decimal
+from pathlib import Path
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import DatabaseError, IntegrityError, connection, connections, transaction
+from django.db.migrations.executor import MigrationExecutor
+from django.db.models.functions import Upper
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from . import assets, catalog, db_router, deferred, view_counter
+from .css import UsedSelectors, extract_from_markup, filter_rules, parse_stylesheet, rewrite_urls, \
+    selector_requirements, serialize, split_selectors
+from .db_router import PRIMARY_PIN_COOKIE, PrimaryReplicaRouter
+from .feeds import _published_posts
+from .models import (
+    AboutPage, AlsoBought, BlogArchiveMonth, BlogPost, CarouselItem, Category, Client, Comment, CoPurchase,
+    DeferredTask, DiscountCode, Feature, Order, OrderItem, PortfolioCategory, PortfolioImage, PortfolioItem,
+    RelatedPost, Service, SiteSetting, Skill, SlowQuery, Tag, TeamMember, Testimonial,
+)
+from .urls import urlpatterns
+
+
+@override_settings(DATABASE_REPLICA_READS=True)
+class ReplicaRoutingTests(TransactionTestCase):
+    """
+    'replica' testlerde ayrı bir SQLite veritabanıdır. Bir kategori sadece bir tarafta
+    oluşturulur; sayfanın 200 veya 404 dönmesi okumanın hangi veritabanından yapıldığını gösterir.
+    """
+    databases = {'default', 'replica'}
+
+    def category_url(self, slug):
+        return f'/blog/category/{slug}/'
+
+    def test_get_request_reads_from_replica(self):
+        Category.objects.using('replica').create(name='Replica', slug='replica')
+        Category.objects.create(name='Primary', slug='primary')
+
+        self.assertEqual(self.client.get(self.category_url('replica')).status_code, 200)
+        self.assertEqual(self.client.get(self.category_url('primary')).status_code, 404)
+
+    @override_settings(DATABASE_REPLICA_READS=False)
+    def test_replica_reads_can_be_disabled(self):
+        Category.objects.create(name='Primary', slug='primary')
+
+        self.assertEqual(self.client.get(self.category_url('primary')).status_code, 200)
+
+    def test_write_pins_session_to_primary(self):
+        Category.objects.create(name='Primary', slug='primary')
+
+        response = self.client.post('/subscribe/', {'email': 'reader@example.com'})
+
+        self.assertEqual(response.status_code, 201)
+        self.assertIn(PRIMARY_PIN_COOKIE, response.cookies)
+        self.assertEqual(self.client.get(self.category_url('primary')).status_code, 200)
+
+    def test_expired_pin_returns_to_replica(self):
+        Category.objects.create(name='Primary', slug='primary')
+        self.client.post('/subscribe/', {'email': 'reader@example.com'})
+
+        # Çerez süresi dolduğunda tarayıcı onu göndermez.
+        del self.client.cookies[PRIMARY_PIN_COOKIE]
+
+        self.assertEqual(self.client.get(self.category_url('primary')).status_code, 404)
+
+    def test_read_only_request_does_not_pin(self):
+        Category.objects.using('replica').create(name='Replica', slug='replica')
+
+        response = self.client.get(self.category_url('replica'))
+
+        self.assertNotIn(PRIMARY_PIN_COOKIE, response.cookies)
+
+
+@override_settings(DATABASE_REPLICA_READS=True)
+class PrimaryReplicaRouterTests(TransactionTestCase):
+    databases = {'default', 'replica'}
+
+    def setUp(self):
+        self.router = PrimaryReplicaRouter()
+        db_router._state.replica_reads = True
+        self.addCleanup(setattr, db_router._state, 'replica_reads', False)
+
+    def test_content_reads_go_to_replica(self):
+        self.assertEqual(self.router.db_for_read(BlogPost), 'replica')
+
+    def test_order_and_auth_reads_stay_on_primary(self):
+        self.assertEqual(self.router.db_for_read(Order), 'default')
+        self.assertEqual(self.router.db_for_read(User), 'default')
+
+    def test_reads_inside_transaction_stay_on_primary(self):
+        with transaction.atomic():
+            self.assertEqual(self.router.db_for_read(BlogPost), 'default')
+
+    def test_writes_go_to_primary(self):
+        self.assertEqual(self.router.db_for_write(BlogPost), 'default')
+
+    def test_reads_outside_requests_stay_on_primary(self):
+        db_router._state.replica_reads = False
+
+        self.assertEqual(self.router.db_for_read(BlogPost), 'default')
+
+
+@skipUnless(connection.vendor == 'sqlite', "EXPLAIN QUERY PLAN çıktısı SQLite'a göre okunuyor.")
+class QueryPlanTests(TestCase):
+    """
+    Sıcak sorguların planları: her tablo bir index ile aranmalı (SEARCH), tam tarama (SCAN)
+    olmamalı. Sayfalanan listelerde sıralama da index'ten gelmeli (geçici B-tree yok).
+    """
+
+    def assertUsesIndex(self, queryset, index_name=None, ordered=False):
+        plan = queryset.explain()
+        scans = [line for line in plan.splitlines() if re.search(r'\bSCAN\b', line)]
+        self.assertFalse(scans, f"Tam tarama:\n{plan}")
+        if index_name:
+            self.assertIn(f'USING INDEX {index_name}', plan)
+        if ordered:
+            self.assertNotIn('TEMP B-TREE', plan, f"Sıralama index'ten gelmiyor:\n{plan}")
+
+    def test_cart_lookup(self):
+        # context_processors.cart_item_count, her sayfada
+        self.assertUsesIndex(Order.objects.filter(user_id=1, status='cart'), 'order_user_status_idx')
+
+    def test_blog_listing(self):
+        queryset = BlogPost.objects.filter(status='published').order_by('-created_at')[:6]
+        self.assertUsesIndex(queryset, 'blogpost_status_created_idx', ordered=True)
+
+    def test_feed_items(self):
+        self.assertUsesIndex(_published_posts()[:20], 'blogpost_status_created_idx', ordered=True)
+
+    def test_category_listing(self):
+        queryset = BlogPost.objects.filter(category_id=1, status='published').order_by('-created_at')[:6]
+        self.assertUsesIndex(queryset, 'blogpost_cat_status_idx', ordered=True)
+
+    def test_comment_page(self):
+        queryset = Comment.objects.filter(post_id=1, active=True).order_by('created_at', 'pk')[:11]
+        self.assertUsesIndex(queryset, 'comment_active_keyset_idx', ordered=True)
+
+    def test_discount_code_lookup(self):
+        queryset = DiscountCode.objects.alias(code_upper=Upper('code')).filter(code_upper='YAZ25')
+        self.assertUsesIndex(queryset, 'discount_code_upper_unique')
+
+    def test_related_posts(self):
+        queryset = RelatedPost.objects.filter(post_id=1, related__status='published').order_by('rank')
+        # Tablo düzeyindeki UNIQUE kısıtları SQLite'ta otomatik isimli index olur (sqlite_autoindex_*).
+        self.assertUsesIndex(queryset, ordered=True)
+
+    def test_also_bought(self):
+        queryset = AlsoBought.objects.filter(item_id=1).order_by('rank').values_list('related_id', flat=True)
+        self.assertUsesIndex(queryset, ordered=True)
+
+
+class HotPathConstraintTests(TestCase):
+    def test_discount_codes_are_unique_ignoring_case(self):
+        now = timezone.now()
+        DiscountCode.objects.create(code='YAZ25', discount_percentage=10, valid_from=now, valid_to=now)
+        with self.assertRaises(IntegrityError):
+            DiscountCode.objects.create(code='yaz25', discount_percentage=10, valid_from=now, valid_to=now)
+
+    @skipUnless(connection.features.supports_partial_indexes, "Kısmi index desteklenmiyor.")
+    def test_one_cart_per_user(self):
+        user = User.objects.create_user('buyer')
+        Order.objects.create(user=user, status='completed')
+        Order.objects.create(user=user, status='completed')
+        Order.objects.create(user=user, status='cart')
+        with self.assertRaises(IntegrityError):
+            Order.objects.create(user=user, status='cart')
+
+
+class QueryBudgetTests(TestCase):
+    """
+    Her URL ve ana admin listeleri için en fazla kaç sorgu yapılabileceği. Veri, listelerin
+    birden fazla satır içerdiği gerçekçi bir örnekle doldurulur; bir N+1 satır sayısıyla
+    büyüdüğü için bütçeyi aşar ve test çalıştırılan SQL'leri yazdırarak kırılır.
+    Önbellekler her testte temizlenir; bütçeler soğuk önbellekteki sayılardır.
+    """
+
+    # URL adı -> (yöntem, URL argümanları, POST verisi, anonim bütçe, giriş yapmış müşteri bütçesi).
+    # Giriş yapmış kullanıcıda oturum, kullanıcı ve sepet sayacı için 3 sorgu daha yapılır.
+    BUDGETS = {
+        'index': ('get', None, None, 6, 9),
+        'about': ('get', None, None, 5, 8),
+        'services': ('get', None, None, 3, 6),
+        'team': ('get', None, None, 3, 6),
+        'testimonials': ('get', None, None, 3, 6),
+        'contact': ('get', None, None, 2, 5),
+        'service_details': ('get', 'service', None, 5, 7),
+        'subscribe': ('post', None, {'email': 'reader-{role}@example.com'}, 1, 1),
+        'blog': ('get', None, None, 4, 7),
+        'blog_details': ('get', 'post', None, 12, 14),
+        'blog_comments': ('get', 'post', None, 3, 6),
+        'posts_by_category': ('get', 'category', None, 5, 8),
+        'blog_feed_rss': ('get', None, None, 1, 1),
+        'blog_feed_atom': ('get', None, None, 1, 1),
+        'category_feed_rss': ('get', 'category', None, 2, 2),
+        'category_feed_atom': ('get', 'category', None, 2, 2),
+        'search': ('get', None, {'q': 'Yazı'}, 4, 7),
+        'portfolio': ('get', None, None, 4, 7),
+        'portfolio_items': ('get', None, {'page': 1}, 2, 5),
+        'portfolio_details': ('get', 'portfolio', None, 8, 10),
+        'register': ('get', None, None, 2, 5),
+        # login_required: anonim kullanıcı sorgusuz yönlendirilir.
+        'profile': ('get', 'username', None, 0, 6),
+        'order_history': ('get', 'username', None, 0, 8),
+        'add_to_cart': ('get', 'item', None, 0, 10),
+        'cart_detail': ('get', None, None, 0, 9),
+        'remove_from_cart': ('post', 'cart_item', None, 0, 7),
+        'remove_item': ('post', 'cart_item', None, 0, 3),
+        'apply_discount': ('post', None, {'code': 'yaz25'}, 0, 8),
+        'checkout': ('get', None, None, 0, 9),
+        'payment_success': ('get', None, None, 0, 2),
+        'payment_cancel': ('get', None, None, 0, 2),
+        'order_success': ('get', 'order', None, 0, 8),
+        'order_failed': ('get', None, None, 0, 5),
+        'invoice_view': ('get', 'order', None, 0, 8),
+        'paytr_checkout_embed': ('get', None, None, 0, 2),
+        'metrics': ('get', None, None, 0, 2),
+    }
+    # Bütçesi ölçülmeyen URL'ler ve nedeni.
+    SKIPPED = {
+        'iyzico_callback': "Iyzico API'sine istek atar.",
+        'start_paytr_payment': "PayTR API'sine istek atar.",
+        'paytr_callback': "PayTR mağaza anahtarları gerekir.",
+        'iyzico_webhook': "Iyzico imzası gerekir.",
+    }
+    # Yönetici listeleri (app_label, model) -> bütçe; satır sayısından bağımsız olmalı.
+    ADMIN_BUDGETS = {
+        ('auth', 'user'): 10,
+        ('main', 'order'): 10,
+        ('main', 'blogpost'): 13,
+        ('main', 'portfolioitem'): 10,
+        ('main', 'profile'): 10,
+        ('main', 'category'): 9,
+        ('main', 'tag'): 9,
+        ('main', 'discountcode'): 9,
+        ('main', 'contactmessage'): 9,
+        ('main', 'subscriber'): 9,
+        ('main', 'slowquery'): 9,
+    }
+
+    @classmethod
+    def setUpTestData(cls):
+        SiteSetting.objects.create(address='İstanbul', phone='0212', email='info@example.com')
+        AboutPage.objects.create(
+            story_title='Hikaye', story_subtitle='Biz', story_description='...', image='about/a.jpg',
+            bullet_point_1='a', bullet_point_2='b', bullet_point_3='c',
+        )
+        services = [
+            Service.objects.create(title=f'Hizmet {i}', slug=f'hizmet-{i}', description='...',
+                                   icon_class='bi-star', color_class='item-cyan')
+            for i in range(3)
+        ]
+        for i in range(3):
+            Feature.objects.create(title=f'Özellik {i}', icon_class='bi-star')
+            CarouselItem.objects.create(title=f'Slayt {i}', description='...', image='carousel/c.jpg', is_active=True, order=i)
+            TeamMember.objects.create(full_name=f'Üye {i}', title='Tasarımcı', photo='team_photos/t.jpg', order=i)
+            Testimonial.objects.create(name=f'Müşteri {i}', title='CEO', comment='...', photo='testimonials/t.jpg')
+            Skill.objects.create(name=f'Yetenek {i}', percentage=80, order=i)
+            Client.objects.create(name=f'Firma {i}', logo='client_logos/l.jpg')
+
+        cls.staff = User.objects.create_user('staff', 'staff@example.com', 'pw', is_staff=True, is_superuser=True)
+        cls.customer = User.objects.create_user('customer', 'customer@example.com', 'pw')
+
+        categories = [Category.objects.create(name=f'Kategori {i}', slug=f'kategori-{i}') for i in range(3)]
+        tags = [Tag.objects.create(name=f'Etiket {i}', slug=f'etiket-{i}') for i in range(4)]
+        posts = []
+        for i in range(12):
+            post = BlogPost.objects.create(
+                title=f'Yazı {i}', slug=f'yazi-{i}', content='<p>İçerik</p>' * 20, author=cls.staff,
+                category=categories[i % 3], image='blog_images/b.jpg', status='published',
+            )
+            post.tags.set(tags[i % 4:i % 4 + 2])
+            posts.append(post)
+        cls.post = posts[0]
+        for i in range(8):
+            Comment.objects.create(post=cls.post, name=f'Okur {i}', email='okur@example.com', body='...', active=True)
+        for rank, related in enumerate(posts[1:4], start=1):
+            RelatedPost.objects.create(post=cls.post, related=related, score=1.0 / rank, rank=rank)
+
+        portfolio_categories = [PortfolioCategory.objects.create(name=f'Proje {i}', slug=f'proje-{i}') for i in range(3)]
+        items = []
+        for i in range(12):
+            item = PortfolioItem.objects.create(
+                title=f'Proje {i}', slug=f'proje-{i}', short_description='...', long_description='...',
+                category=portfolio_categories[i % 3], service=services[i % 3], main_image='portfolio_images/p.jpg',
+                price=Decimal(500 * (i + 1)), project_date=date(2025, 1, 1) + timedelta(days=i),
+            )
+            PortfolioImage.objects.create(portfolio_item=item, image='portfolio_images/details/d1.jpg')
+            PortfolioImage.objects.create(portfolio_item=item, image='portfolio_images/details/d2.jpg')
+            items.append(item)
+        cls.portfolio_item = items[0]
+        for rank, related in enumerate(items[1:4], start=1):
+            AlsoBought.objects.create(item=items[0], related=related, count=5 - rank, rank=rank)
+
+        now = timezone.now()
+        DiscountCode.objects.create(code='YAZ25', discount_percentage=25, valid_from=now - timedelta(days=1),
+                                    valid_to=now + timedelta(days=30))
+        for n in range(5):
+            order = Order.objects.create(user=cls.customer, status='completed', payment_method='bank_transfer',
+                                         billing_email='customer@example.com', payment_date=now)
+            for item in items[n:n + 3]:
+                OrderItem.objects.create(order=order, portfolio_item=item, price=item.price, quantity=1 + n % 2)
+        cls.order = order
+        cart = Order.objects.create(user=cls.customer, status='cart')
+        for item in items[4:7]:
+            OrderItem.objects.create(order=cart, portfolio_item=item, price=item.price)
+        cls.cart_item = cart.items.first()
+
+    def setUp(self):
+        cache.clear()
+        catalog._catalog = None
+        # Tamponlanan görüntülenmeler test veritabanı kapandıktan sonra (atexit) yazılmaya çalışılmasın.
+        self.addCleanup(view_counter._buffer.clear)
+
+    def url_kwargs(self, key):
+        return {
+            None: None,
+            'post': {'slug': self.post.slug},
+            'portfolio': {'slug': self.portfolio_item.slug},
+            'service': {'slug': 'hizmet-0'},
+            'category': {'category_slug': 'kategori-0'},
+            'username': {'username': self.customer.username},
+            'order': {'order_id': self.order.pk},
+            'item': {'item_id': self.portfolio_item.pk},
+            'cart_item': {'item_id': self.cart_item.pk},
+        }[key]
+
+    def assertQueryBudget(self, label, budget, func):
+        with CaptureQueriesContext(connections['default']) as context:
+            response = func()
+        self.assertLess(response.status_code, 500, label)
+        executed = len(context.captured_queries)
+        if executed > budget:
+            queries = '\n'.join(f"{n}. {query['sql']}" for n, query in enumerate(context.captured_queries, start=1))
+            self.fail(f"{label}: {executed} sorgu, bütçe {budget}.\n{queries}")
+        return executed
+
+    def test_every_url_has_a_budget(self):
+        names = {pattern.name for pattern in urlpatterns}
+        self.assertEqual(names - set(self.BUDGETS) - set(self.SKIPPED), set())
+        self.assertEqual(set(self.BUDGETS) - names, set())
+
+    def check_views(self, role, user=None):
+        for name, (method, kwargs_key, data, *budgets) in self.BUDGETS.items():
+            with self.subTest(name, role=role):
+                self.client.logout()
+                if user:
+                    self.client.force_login(user)
+                cache.clear()
+                catalog._catalog = None
+                url = reverse(name, kwargs=self.url_kwargs(kwargs_key))
+                data = {key: str(value).format(role=role) for key, value in (data or {}).items()}
+                budget = budgets[0] if user is None else budgets[1]
+                self.assertQueryBudget(f"{role} {method.upper()} {url}", budget,
+                                       lambda: getattr(self.client, method)(url, data))
+
+    def test_anonymous_views(self):
+        self.check_views('anonymous')
+
+    def test_customer_views(self):
+        self.check_views('customer', self.customer)
+
+    def test_admin_blog_post_comments(self):
+        # Yorum satırları (CommentInline) yazı başlığını gösterir; sorgu sayısı yorum sayısıyla büyümemeli.
+        self.client.force_login(self.staff)
+        url = reverse('admin:main_blogpost_change', args=[self.post.pk])
+        baseline = self.assertQueryBudget(f"admin {url}", 30, lambda: self.client.get(url))
+        for i in range(5):
+            Comment.objects.create(post=self.post, name=f'Yeni {i}', email='okur@example.com', body='...')
+
+        self.assertQueryBudget(f"admin {url}", baseline, lambda: self.client.get(url))
+        self.assertContains(self.client.get(url), f"on &#x27;{self.post.title}&#x27;")
+
+    def test_admin_changelists(self):
+        self.client.force_login(self.staff)
+        for (app_label, model), budget in self.ADMIN_BUDGETS.items():
+            with self.subTest(f'{app_label}.{model}'):
+                url = reverse(f'admin:{app_label}_{model}_changelist')
+                self.assertQueryBudget(f"admin {url}", budget, lambda: self.client.get(url))
+
+
+class CssTests(SimpleTestCase):
+    """Kritik CSS ve purge_css'in kullandığı ayrıştırıcı ve seçici eşleştirme."""
+
+    STYLESHEET = """
+        /* yorum { } */
+        @charset "utf-8";
+        .btn, .btn-unused { color: red; }
+        .card > .card-body:hover { content: "}"; }
+        #hero .title::before { margin: 0 }
+        @media (min-width: 768px) { .btn { padding: 1rem } .navbar-unused { display: none } }
+        @font-face { font-family: "icons"; src: url("fonts/icons.woff2") format("woff2") }
+        @font-face { font-family: "unused-font"; src: url("fonts/unused.woff2") }
+        @keyframes spin { from { transform: rotate(0) } to { transform: rotate(360deg) } }
+        .spinner { animation: spin 1s; font-family: icons }
+    """
+
+    def test_parse_stylesheet(self):
+        rules = parse_stylesheet(self.STYLESHEET)
+
+        self.assertEqual([rule.prelude for rule in rules][:4], [
+            '@charset "utf-8"', '.btn, .btn-unused', '.card > .card-body:hover', '#hero .title::before',
+        ])
+        # Tırnak içindeki süslü parantez bloğu kapatmaz.
+        self.assertEqual(rules[2].body, 'content: "}";')
+        media = rules[4]
+        self.assertEqual(media.at_name, 'media')
+        self.assertEqual([child.prelude for child in media.children], ['.btn', '.navbar-unused'])
+        # Keyframes iç içe kural olarak ayrıştırılmaz, gövdesi korunur.
+        self.assertIsNone(rules[7].children)
+        self.assertIn('rotate(360deg)', rules[7].body)
+
+    def test_split_selectors_keeps_parentheses(self):
+        self.assertEqual(
+            split_selectors('.a:not(.b, .c), [data-x="1,2"] .d ,.e'),
+            ['.a:not(.b, .c)', '[data-x="1,2"] .d', '.e'],
+        )
+
+    def test_selector_requirements(self):
+        classes, ids, tags = selector_requirements('ul#menu > li.item:not(.hidden)::after [href]')
+        self.assertEqual(classes, {'item'})
+        self.assertEqual(ids, {'menu'})
+        self.assertEqual(tags, {'ul', 'li'})
+
+    def test_extract_from_markup_ignores_template_syntax(self):
+        used = extract_from_markup(
+            '<div class="row {% if active %}active{% endif %} {{ extra }}" id="main">'
+            '<span class="{{ post.css }} badge">{# <p class="note"> #}</span></div>'
+        )
+        self.assertEqual(used.classes, {'row', 'active', 'badge'})
+        self.assertEqual(used.ids, {'main'})
+        self.assertTrue({'div', 'span'} <= used.tags)
+
+    def test_safelist(self):
+        used = UsedSelectors(classes={'btn'}, safelist=[r'^alert-', r'^show$'])
+
+        self.assertTrue(used.matches('.btn.show'))
+        self.assertTrue(used.matches('.alert-danger .btn'))
+        self.assertFalse(used.matches('.btn.showing'))
+        self.assertFalse(used.matches('.toast'))
+
+    def test_filter_rules(self):
+        used = UsedSelectors(classes={'btn', 'card', 'card-body', 'title', 'spinner'}, ids={'hero'}, tags=set())
+        css = serialize(filter_rules(parse_stylesheet(self.STYLESHEET), used))
+
+        self.assertIn('.btn{color:red}', css)
+        self.assertIn('@media (min-width: 768px){.btn{padding:1rem}}', css)
+        self.assertIn('#hero .title::before{', css)
+        self.assertIn('@keyframes spin', css)
+        self.assertIn('"icons"', css)
+        for removed in ('btn-unused', 'navbar-unused', 'unused-font', '@charset'):
+            self.assertNotIn(removed, css)
+
+    def test_filter_rules_checks_tags_when_known(self):
+        rules = parse_stylesheet('table td { padding: 0 } p { margin: 0 }')
+
+        self.assertEqual(serialize(filter_rules(rules, UsedSelectors(tags={'div'}))), 'p{margin:0}')
+        self.assertEqual(serialize(filter_rules(rules, UsedSelectors(tags=None))), 'table td{padding:0}p{margin:0}')
+
+    @override_settings(STATIC_URL='/static/')
+    def test_rewrite_urls(self):
+        css = rewrite_urls(
+            'a{background:url(../img/x.png)} b{src:url("fonts/f.woff2")} '
+            'c{background:url(data:image/png;base64,AA)} d{background:url(/abs.png)}',
+            'assets/vendor/lib/css/lib.css',
+        )
+        self.assertIn('url("/static/assets/vendor/lib/img/x.png")', css)
+        self.assertIn('url("/static/assets/vendor/lib/css/fonts/f.woff2")', css)
+        self.assertIn('url(data:image/png;base64,AA)', css)
+        self.assertIn('url(/abs.png)', css)
+
+
+class CriticalCssTests(TestCase):
+    """base.html'in `critical_css` ve `vendor_assets` blokları ile `build_critical_css` komutu."""
+
+    def setUp(self):
+        static_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(static_dir.cleanup)
+        self.static_dir = Path(static_dir.name)
+        self.enterContext(override_settings(STATICFILES_DIRS=[self.static_dir, *settings.STATICFILES_DIRS], DEBUG=False))
+        for cached in (assets._cached_find, assets._cached_critical_css):
+            cached.cache_clear()
+            self.addCleanup(cached.cache_clear)
+
+    def render_contact(self):
+        response = self.client.get(reverse('contact'))
+        self.assertEqual(response.status_code, 200)
+        return response.content.decode()
+
+    def test_built_css_is_inlined_and_stylesheets_are_deferred(self):
+        import io
+        from django.core.management import call_command
+
+        call_command('build_critical_css', 'contact.html', output_dir=str(self.static_dir), stdout=io.StringIO())
+        css = (self.static_dir / assets.critical_css_path('contact.html')).read_text()
+        self.assertIn('.header', css)
+        self.assertNotIn('.footer', css)
+
+        html = self.render_contact()
+        self.assertIn(f'<style id="critical-css">{css}</style>', html)
+        for path in ['assets/vendor/bootstrap/css/bootstrap.min.css', 'assets/vendor/aos/aos.css', 'assets/css/main.css']:
+            self.assertIn(f'<link rel="preload" href="/static/{path}" as="style"', html)
+            self.assertIn(f'<noscript><link href="/static/{path}" rel="stylesheet"></noscript>', html)
+            # Bloklayan <link> sadece JS kapalıyken (noscript) kullanılır.
+            self.assertEqual(html.count(f'<link href="/static/{path}" rel="stylesheet">'), 1)
+        for path in ['assets/vendor/bootstrap/js/bootstrap.bundle.min.js', 'assets/vendor/aos/aos.js']:
+            self.assertIn(f'<script src="/static/{path}" defer></script>', html)
+        # Şablonun istemediği paketler yüklenmez.
+        self.assertNotIn('glightbox', html)
+
+    def test_missing_critical_css_falls_back_to_blocking_stylesheets(self):
+        html = self.render_contact()
+        self.assertNotIn('id="critical-css"', html)
+        self.assertNotIn('rel="preload"', html)
+        for path in ['assets/vendor/bootstrap/css/bootstrap.min.css', 'assets/vendor/aos/aos.css', 'assets/css/main.css']:
+            self.assertIn(f'<link href="/static/{path}" rel="stylesheet">', html)
+        self.assertIn('<script src="/static/assets/vendor/aos/aos.js" defer></script>', html)
+
+
+class DeferredTaskTests(TestCase):
+    def test_schedule_enqueues_once_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            deferred.schedule('icons')
+            deferred.schedule('icons')
+            self.assertFalse(DeferredTask.objects.exists())
+        with self.captureOnCommitCallbacks(execute=True):
+            deferred.schedule('icons')
+
+        self.assertEqual(list(DeferredTask.objects.values_list('name', 'argument')), [('icons', '')])
+
+    def test_batched_calls_run_once_per_transaction(self):
+        calls = []
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            deferred.on_commit_batched('test', calls.append, 1)
+            deferred.on_commit_batched('test', calls.append, 2, 3)
+
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(calls, [{1, 2, 3}])
+
+    def test_rolled_back_batch_is_not_reused(self):
+        calls = []
+        with self.captureOnCommitCallbacks(execute=True):
+            with self.assertRaises(IntegrityError), transaction.atomic():
+                deferred.on_commit_batched('test', calls.append, 1)
+                raise IntegrityError
+            deferred.on_commit_batched('test', calls.append, 2)
+
+        self.assertEqual(calls, [{2}])
+
+    def test_run_pending_removes_finished_tasks(self):
+        DeferredTask.objects.create(name='icons')
+        with mock.patch('main.icons.rebuild_icon_subset') as rebuild:
+            self.assertEqual(deferred.run_pending(), {'icons': (1, True)})
+
+        rebuild.assert_called_once_with(set())
+        self.assertFalse(DeferredTask.objects.exists())
+
+    def test_failed_task_is_requeued(self):
+        DeferredTask.objects.create(name='icons')
+        with mock.patch('main.icons.rebuild_icon_subset', side_effect=OSError), self.assertLogs('main.deferred'):
+            self.assertEqual(deferred.run_pending(), {'icons': (1, False)})
+
+        self.assertTrue(DeferredTask.objects.filter(name='icons').exists())
+
+
+class IconSubsetTests(TestCase):
+    def setUp(self):
+        static_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(static_dir.cleanup)
+        self.static_dir = Path(static_dir.name)
+        self.enterContext(override_settings(STATICFILES_DIRS=[self.static_dir, *settings.STATICFILES_DIRS], DEBUG=False))
+        assets._cached_find.cache_clear()
+        self.addCleanup(assets._cached_find.cache_clear)
+
+    def build(self, *names):
+        from .icons import build_icon_subset
+        build_icon_subset(set(names), targets=[self.static_dir])
+
+    def test_stylesheet_name_changes_with_content(self):
+        self.build('star')
+        first = assets.stylesheet_path(assets.ICONS_STYLESHEET)
+        self.build('star', 'heart')
+        second = assets.stylesheet_path(assets.ICONS_STYLESHEET)
+
+        self.assertRegex(first, r'^assets/css/icons/bootstrap-icons\.[0-9a-f]{12}\.css$')
+        self.assertNotEqual(first, second)
+        self.assertIn('.bi-heart::before', (self.static_dir / second).read_text())
+        # Eski CSS silinmez; önbellekteki sayfalar hâlâ ona başvurabilir.
+        self.assertTrue((self.static_dir / first).exists())
+
+    def test_new_icon_defers_rebuild(self):
+        self.build('star')
+        with self.captureOnCommitCallbacks(execute=True):
+            Feature.objects.create(title='Yıldız', icon_class='bi bi-star')
+        self.assertFalse(DeferredTask.objects.exists())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Feature.objects.create(title='Kalp', icon_class='bi bi-heart')
+        self.assertTrue(DeferredTask.objects.filter(name='icons').exists())
+
+        deferred.run_pending()
+        manifest = json.loads((self.static_dir / assets.ICON_SUBSET_MANIFEST).read_text())
+        self.assertIn('heart', manifest['icons'])
+        self.assertEqual(assets.stylesheet_path(assets.ICONS_STYLESHEET), f"{assets.ICON_SUBSET_DIR}/{manifest['css']}")
+
+
+class PurgeCssTests(TestCase):
+    def setUp(self):
+        static_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(static_dir.cleanup)
+        self.static_dir = Path(static_dir.name)
+        self.enterContext(override_settings(STATICFILES_DIRS=[self.static_dir, *settings.STATICFILES_DIRS], DEBUG=False))
+        assets._cached_find.cache_clear()
+        self.addCleanup(assets._cached_find.cache_clear)
+
+    def purged_bootstrap(self):
+        return (self.static_dir / assets.purged_css_path(assets.PURGE_TARGETS[0])).read_text()
+
+    def test_no_rebuild_without_purged_css(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Service.objects.create(title='Web', description='-', icon_class='bi bi-star', color_class='text-bg-warning')
+        self.assertFalse(DeferredTask.objects.filter(name='css').exists())
+
+    def test_new_database_class_defers_rebuild(self):
+        from .purge import collect_used_selectors, purge_stylesheets
+
+        used, _ = collect_used_selectors(assets.DEFAULT_PURGE_SAFELIST)
+        purge_stylesheets(used, assets.DEFAULT_PURGE_SAFELIST, targets=[self.static_dir])
+        self.assertNotIn('.text-bg-warning', self.purged_bootstrap())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Service.objects.create(title='Web', description='-', icon_class='bi bi-star', color_class='text-bg-warning')
+        self.assertTrue(DeferredTask.objects.filter(name='css').exists())
+
+        with mock.patch('main.purge.output_dirs', return_value=[self.static_dir]):
+            deferred.run_pending()
+        self.assertIn('.text-bg-warning', self.purged_bootstrap())
+        manifest = json.loads((self.static_dir / assets.PURGE_MANIFEST).read_text())
+        self.assertIn('text-bg-warning', manifest['classes'])
+        self.assertEqual(manifest['safelist'], assets.DEFAULT_PURGE_SAFELIST)
+
+        # Temizlenmiş CSS'te zaten olan bir sınıf yeniden üretim istemez.
+        DeferredTask.objects.all().delete()
+        with self.captureOnCommitCallbacks(execute=True):
+            Service.objects.create(title='Mobil', description='-', icon_class='bi bi-star', color_class='text-bg-warning')
+        self.assertFalse(DeferredTask.objects.exists())
+
+
+class ConditionalGetTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        author = User.objects.create_user('author')
+        cls.post = BlogPost.objects.create(title='Yazı', slug='yazi', content='<p>İçerik</p>', author=author,
+                                           image='blog_images/b.jpg', status='published')
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(view_counter._buffer.clear)
+        # İlk yanıt CSRF çerezini verir; çerez ETag'e dahil olduğundan önce bir kez alınır.
+        self.get()
+
+    def get(self, **headers):
+        return self.client.get(reverse('blog_details', kwargs={'slug': self.post.slug}), headers=headers)
+
+    def test_unchanged_page_is_not_modified(self):
+        etag = self.get()['ETag']
+
+        self.assertEqual(self.get(if_none_match=etag).status_code, 304)
+
+    def test_comment_approval_invalidates_validators(self):
+        etag = self.get()['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            comment = Comment.objects.create(post=self.post, name='Okur', email='okur@example.com', body='...')
+            comment.active = True
+            comment.save()
+
+        self.assertEqual(self.get(if_none_match=etag).status_code, 200)
+
+    def test_version_changes_only_after_commit(self):
+        from .conditional import FEED_VERSION_KEY, content_version
+        etag = self.get()['ETag']
+        versions = content_version(), content_version(FEED_VERSION_KEY)
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                self.post.title = 'Yeni başlık'
+                self.post.save()
+                # İşlem açıkken başka bir istek eski satırları okur; sürümler de eski kalmalı.
+                self.assertEqual((content_version(), content_version(FEED_VERSION_KEY)), versions)
+
+        self.assertNotEqual(content_version(), versions[0])
+        self.assertNotEqual(content_version(FEED_VERSION_KEY), versions[1])
+        self.assertEqual(self.get(if_none_match=etag).status_code, 200)
+
+    def test_write_in_another_process_invalidates_validators(self):
+        # Testler süreç içi önbellek kullanır; burada worker'ların paylaştığı dosya önbelleği gerekir.
+        cache_dir = self.enterContext(tempfile.TemporaryDirectory())
+        self.enterContext(override_settings(CACHES={'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': cache_dir,
+        }}))
+        etag = self.get()['ETag']
+        # Başka bir worker süreci (aynı ayarlarla) bir içerik değişikliğini kaydeder.
+        subprocess.run([sys.executable, '-c', (
+            "import django; django.setup(); "
+            "from main.conditional import bump_content_version; bump_content_version()"
+        )], check=True, cwd=settings.BASE_DIR, capture_output=True,
+            env={**os.environ, 'DJANGO_SETTINGS_MODULE': 'company.settings', 'CACHE_DIR': cache_dir})
+
+        self.assertEqual(self.get(if_none_match=etag).status_code, 200)
+
+
+class ViewCounterTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        author = User.objects.create_user('author')
+        cls.post = BlogPost.objects.create(title='Yazı', slug='yazi', content='<p>İçerik</p>', author=author,
+                                           image='blog_images/b.jpg', status='published')
+
+    def setUp(self):
+        cache.clear()
+        view_counter._buffer.clear()
+        self.addCleanup(view_counter._buffer.clear)
+        self.url = reverse('blog_details', kwargs={'slug': self.post.slug})
+
+    def test_not_modified_response_is_counted(self):
+        self.client.get(self.url)
+        etag = self.client.get(self.url)['ETag']
+        response = self.client.get(self.url, headers={'if_none_match': etag})
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(view_counter._buffer['blog', self.post.slug], 3)
+        self.assertEqual(view_counter.flush_views(), 3)
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.view_count, 3)
+        self.assertIsNotNone(self.post.popularity)
+
+    def test_missing_page_is_not_counted(self):
+        self.client.get(reverse('blog_details', kwargs={'slug': 'yok'}))
+
+        self.assertFalse(view_counter._buffer)
+
+    def test_flush_during_request_does_not_pin_session(self):
+        with mock.patch.object(view_counter, 'VIEW_FLUSH_INTERVAL', 0):
+            response = self.client.get(self.url)
+
+        self.assertFalse(view_counter._buffer)
+        self.assertEqual(BlogPost.objects.get(pk=self.post.pk).view_count, 1)
+        self.assertNotIn(PRIMARY_PIN_COOKIE, response.cookies)
+
+
+class PortfolioTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        # Kategorisi, hizmeti ve fiyatı olmayan bir ürün de sayılara dahil olmalı.
+        cls.item = PortfolioItem.objects.create(
+            title='Items', slug='items', short_description='...', long_description='...',
+            main_image='portfolio_images/p.jpg',
+        )
+        cls.categories = [PortfolioCategory.objects.create(name=f'Proje {i}', slug=f'proje-{i}') for i in range(2)]
+        cls.services = [
+            Service.objects.create(title=f'Hizmet {i}', slug=f'hizmet-{i}', description='...',
+                                   icon_class='bi-star', color_class='item-cyan')
+            for i in range(2)
+        ]
+        prices = [None, Decimal('999.99'), Decimal('1000'), Decimal('4999'), Decimal('5000'), Decimal('20000')]
+        for i in range(18):
+            PortfolioItem.objects.create(
+                title=f'Ürün {i}', slug=f'urun-{i}', short_description='...', long_description='...',
+                main_image='portfolio_images/p.jpg', price=prices[i % 6],
+                category=cls.categories[i % 2] if i % 5 else None, service=cls.services[i % 3 % 2] if i % 3 else None,
+            )
+
+    def setUp(self):
+        cache.clear()
+        catalog._catalog = None
+        self.addCleanup(view_counter._buffer.clear)
+
+    def filters(self, category=None, service=None, price=None):
+        from .portfolio import PortfolioFilters
+        params = {'category': category.slug if category else '', 'service': str(service.pk) if service else '',
+                  'price': price or ''}
+        return PortfolioFilters(params)
+
+    def expected(self, category=None, service=None, price=None):
+        from .portfolio import _price_q
+        queryset = PortfolioItem.objects.all()
+        if category:
+            queryset = queryset.filter(category=category)
+        if service:
+            queryset = queryset.filter(service=service)
+        if price:
+            queryset = queryset.filter(_price_q(price))
+        return queryset.count()
+
+    def test_facet_counts_match_queryset(self):
+        from .portfolio import PRICE_BUCKETS, portfolio_facets, portfolio_items
+        for category in [None, *self.categories]:
+            for service in [None, *self.services]:
+                for price in [None, *PRICE_BUCKETS]:
+                    with self.subTest(category=category, service=service, price=price):
+                        filters = self.filters(category, service, price)
+                        facets = portfolio_facets(filters)
+                        categories, services, prices = facets['groups']
+
+                        self.assertEqual(facets['total'], self.expected(category, service, price))
+                        self.assertEqual(len(portfolio_items(filters)), facets['total'])
+                        self.assertEqual(categories[0][2], self.expected(None, service, price))
+                        for option in categories[1:]:
+                            match = next(c for c in self.categories if c.name == option[0])
+                            self.assertEqual(option[2], self.expected(match, service, price))
+                            self.assertEqual(option[3], match == category)
+                        self.assertEqual(services[0][2], self.expected(category, None, price))
+                        for option in services[1:]:
+                            match = next(s for s in self.services if s.title == option[0])
+                            self.assertEqual(option[2], self.expected(category, match, price))
+                        self.assertEqual(prices[0][2], self.expected(category, service, None))
+                        for option in prices[1:]:
+                            bucket = next(key for key, value in PRICE_BUCKETS.items() if value[0] == option[0])
+                            self.assertEqual(option[2], self.expected(category, service, bucket))
+                            self.assertEqual(option[3], bucket == price)
+
+    def test_facet_cache_key_changes_after_commit(self):
+        from .portfolio import portfolio_facets
+        filters = self.filters()
+        key = filters.cache_key()
+        total = portfolio_facets(filters)['total']
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                PortfolioItem.objects.create(
+                    title='Yeni', slug='yeni', short_description='...', long_description='...',
+                    main_image='portfolio_images/p.jpg',
+                )
+                # Eşzamanlı bir istek commit'ten önce eski sayıları hesaplarsa eski sürümün anahtarına yazar.
+                self.assertEqual(filters.cache_key(), key)
+
+        self.assertNotEqual(filters.cache_key(), key)
+        self.assertEqual(portfolio_facets(filters)['total'], total + 1)
+
+    def test_facet_urls_keep_other_filters(self):
+        from .portfolio import next_page_url, portfolio_facets, portfolio_page
+        category, service = self.categories[0], self.services[1]
+        filters = self.filters(category, service, '1000-5000')
+        categories, services, prices = portfolio_facets(filters)['groups']
+        base = reverse('portfolio')
+
+        self.assertEqual(categories[0][1], f'{base}?service={service.pk}&price=1000-5000')
+        # Seçili kategori sayısı 0 olsa da listelenir; diğerleri ancak ürünü varsa.
+        self.assertIn((category.name, f'{base}?category=proje-0&service={service.pk}&price=1000-5000', 0, True),
+                      categories)
+        self.assertEqual(services[0][1], f'{base}?category=proje-0&price=1000-5000')
+        self.assertEqual(prices[0][1], f'{base}?category=proje-0&service={service.pk}')
+        self.assertEqual(self.filters().url(), base)
+
+        unfiltered = self.filters()
+        page = portfolio_page(unfiltered, 1)
+        self.assertEqual(next_page_url(unfiltered, page), f"{reverse('portfolio_items')}?page=2")
+        self.assertIsNone(next_page_url(unfiltered, portfolio_page(unfiltered, 2)))
+
+    def test_cart_price_is_read_from_database(self):
+        from .catalog import get_catalog
+        customer = User.objects.create_user('customer', password='pw')
+        item = PortfolioItem.objects.get(slug='urun-1')
+        get_catalog()
+        # update() sinyal göndermez; katalog görüntüsü eski fiyatla kalır.
+        PortfolioItem.objects.filter(pk=item.pk).update(price=Decimal('1234.50'))
+        self.assertEqual(get_catalog().get(item.pk).price, Decimal('999.99'))
+
+        self.client.force_login(customer)
+        self.client.get(reverse('add_to_cart', kwargs={'item_id': item.pk}))
+
+        self.assertEqual(OrderItem.objects.get(portfolio_item=item).price, Decimal('1234.50'))
+        self.assertEqual(self.client.get(reverse('add_to_cart', kwargs={'item_id': 0})).status_code, 404)
+
+    def test_invalid_filters_are_not_found(self):
+        for params in ({'category': 'yok'}, {'service': 'x'}, {'service': '9999'}, {'price': 'bedava'}):
+            with self.subTest(params):
+                self.assertEqual(self.client.get(reverse('portfolio'), params).status_code, 404)
+
+    def test_item_slug_is_not_shadowed_by_next_page_url(self):
+        response = self.client.get(self.item.get_absolute_url())
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['item'], self.item)
+        self.assertEqual(self.client.get(reverse('portfolio_items')).status_code, 200)
+
+
+class RecommendationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.customer = User.objects.create_user('customer')
+        cls.items = [
+            PortfolioItem.objects.create(title=f'Ürün {i}', slug=f'urun-{i}', short_description='...',
+                                         long_description='...', main_image='portfolio_images/p.jpg')
+            for i in range(5)
+        ]
+
+    def setUp(self):
+        cache.clear()
+        catalog._catalog = None
+
+    def order(self, *indexes, status='completed'):
+        order = Order.objects.create(user=self.customer, status=status)
+        for index in indexes:
+            OrderItem.objects.create(order=order, portfolio_item=self.items[index], price=Decimal('10'))
+        return order
+
+    def related(self, index):
+        return list(AlsoBought.objects.filter(item=self.items[index]).order_by('rank')
+                    .values_list('related_id', 'count'))
+
+    def test_count_pairs(self):
+        from .recommendations import count_pairs
+        pairs = count_pairs({1: {1, 2, 3}, 2: {2, 3}, 3: {4}})
+
+        self.assertEqual(pairs, Counter({(2, 3): 2, (3, 2): 2, (1, 2): 1, (2, 1): 1, (1, 3): 1, (3, 1): 1}))
+
+    def test_ranking_and_incremental_counting(self):
+        from .recommendations import also_bought, build_also_bought
+        a, b, c, d, e = (item.pk for item in self.items)
+        self.order(0, 1, 2)
+        self.order(0, 1)
+        self.order(0, 3)
+        self.order(0, 4, status='cart')
+
+        self.assertEqual(build_also_bought(), (3, 4))
+        self.assertEqual(self.related(0), [(b, 2), (d, 1), (c, 1)])
+        self.assertEqual([item.id for item in also_bought(a)], [b, d, c])
+        self.assertEqual(build_also_bought(), (0, 0))
+
+        self.order(0, 2)
+        self.order(0, 2)
+        build_also_bought()
+        self.assertEqual(self.related(0), [(c, 3), (b, 2), (d, 1)])
+        self.assertEqual(self.related(2), [(a, 3), (b, 1)])
+
+    def test_refunded_order_is_withdrawn(self):
+        from .recommendations import build_also_bought
+        a, b, c = (item.pk for item in self.items[:3])
+        self.order(0, 1)
+        refunded = self.order(0, 1, 2)
+        build_also_bought()
+        self.assertEqual(self.related(0), [(b, 2), (c, 1)])
+
+        refunded.refresh_from_db()
+        refunded.status = 'refunded'
+        refunded.save()
+        self.assertEqual(build_also_bought(), (1, 3))
+        self.assertEqual(self.related(0), [(b, 1)])
+        self.assertEqual(self.related(2), [])
+        self.assertFalse(CoPurchase.objects.filter(item_id=c).exists())
+
+        # Tekrar tamamlanan sipariş yeniden sayılır; sonuç baştan hesapla aynıdır.
+        refunded.refresh_from_db()
+        refunded.status = 'completed'
+        refunded.save()
+        build_also_bought()
+        incremental = sorted(CoPurchase.objects.values_list('item_id', 'other_id', 'count'))
+        build_also_bought(rebuild=True)
+        self.assertEqual(incremental, sorted(CoPurchase.objects.values_list('item_id', 'other_id', 'count')))
+
+
+class ConnectionMetricsTests(SimpleTestCase):
+    class FakeWrapper:
+        def __init__(self, alias, connected=False):
+            self.alias = alias
+            self.connection = object() if connected else None
+
+        def connect(self):
+            self.connection = object()
+
+        def ensure_connection(self):
+            if self.connection is None:
+                self.connect()
+
+    def wrapper(self, alias, connected=False):
+        from .db_metrics import ConnectionMetricsMixin
+        return type('Wrapper', (ConnectionMetricsMixin, self.FakeWrapper), {})(alias, connected)
+
+    def test_reuse_rate_counts_connections_per_request(self):
+        from .db_metrics import ConnectionMetricsMiddleware, connection_stats
+        before = connection_stats()
+        # İstek dışında (örn. yönetim komutu) kurulan bağlantı oranı etkilemez.
+        self.wrapper('default').ensure_connection()
+        persistent = self.wrapper('default', connected=True)
+        replica = self.wrapper('replica')
+
+        def view(request):
+            persistent.ensure_connection()
+            replica.ensure_connection()
+            replica.ensure_connection()
+            return 'ok'
+
+        middleware = ConnectionMetricsMiddleware(view)
+        middleware(mock.Mock(path='/'))
+        middleware(mock.Mock(path='/'))
+        stats = connection_stats()
+
+        def delta(key):
+            return stats.get(key, 0) - before.get(key, 0)
+
+        self.assertEqual(delta('connects'), 2)
+        self.assertEqual(delta('request_connects'), 1)
+        self.assertEqual(delta('request_reuses'), 3)
+
+    @override_settings(METRICS_DIR=None)
+    def test_request_connections_are_exported(self):
+        from . import metrics
+        from .db_metrics import connection_stats
+        stats = connection_stats()
+        output = metrics.render_metrics()
+
+        self.assertIn(f'django_db_request_connections_total{{connection="reused"}} '
+                      f'{float(stats.get("request_reuses", 0))!r}', output)
+        self.assertIn('django_db_request_connections_total{connection="new"}', output)
+
+    @override_settings(PROFILING_SAMPLE_RATE=1.0)
+    def test_profile_log_includes_request_connections(self):
+        from .db_metrics import ConnectionMetricsMiddleware
+        from .profiling import RequestProfilingMiddleware
+        database = self.wrapper('default', connected=True)
+
+        def view(request):
+            database.ensure_connection()
+            return mock.MagicMock(status_code=200)
+
+        with self.assertLogs('main.profiling') as logs:
+            ConnectionMetricsMiddleware(RequestProfilingMiddleware(view))(
+                mock.Mock(path='/', method='GET', GET={}, user=mock.Mock(is_staff=False)),
+            )
+
+        line = json.loads(logs.records[0].getMessage())
+        self.assertEqual((line['db_connects'], line['db_reuses']), (0, 1))
+
+
+class HotPathMigrationTests(TransactionTestCase):
+    """0009 tekil kısıtları eklemeden önce mevcut çakışmaları gidermeli."""
+
+    before = [('main', '0008_also_bought')]
+    after = [('main', '0009_hot_path_indexes')]
+
+    def setUp(self):
+        self.executor = MigrationExecutor(connection)
+        self.latest = self.executor.loader.graph.leaf_nodes('main')
+        self.executor.migrate(self.before)
+        self.addCleanup(self.migrate_latest)
+
+    def migrate_latest(self):
+        MigrationExecutor(connection).migrate(self.latest)
+
+    def migrate(self):
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate(self.after)
+        return executor.loader.project_state(self.after).apps
+
+    def test_duplicate_carts_are_merged_per_item(self):
+        apps = self.executor.loader.project_state(self.before).apps
+        UserModel, OrderModel = apps.get_model('auth', 'User'), apps.get_model('main', 'Order')
+        ItemModel, LineModel = apps.get_model('main', 'PortfolioItem'), apps.get_model('main', 'OrderItem')
+        user = UserModel.objects.create(username='customer')
+        first, second = (
+            ItemModel.objects.create(title=slug, slug=slug, short_description='...', long_description='...',
+                                     main_image='portfolio_images/p.jpg')
+            for slug in ('bir', 'iki')
+        )
+        old_cart = OrderModel.objects.create(user=user, status='cart')
+        new_cart = OrderModel.objects.create(user=user, status='cart')
+        LineModel.objects.create(order=old_cart, portfolio_item=first, price=Decimal('10'), quantity=2)
+        LineModel.objects.create(order=old_cart, portfolio_item=second, price=Decimal('5'), quantity=1)
+        LineModel.objects.create(order=new_cart, portfolio_item=first, price=Decimal('12'), quantity=1)
+
+        apps = self.migrate()
+
+        lines = apps.get_model('main', 'OrderItem').objects.order_by('portfolio_item_id')
+        self.assertEqual(list(apps.get_model('main', 'Order').objects.values_list('pk', flat=True)), [new_cart.pk])
+        self.assertEqual(
+            list(lines.values_list('order_id', 'portfolio_item_id', 'price', 'quantity')),
+            [(new_cart.pk, first.pk, Decimal('12'), 3), (new_cart.pk, second.pk, Decimal('5'), 1)],
+        )
+
+    def test_case_insensitive_duplicate_codes_are_renamed(self):
+        apps = self.executor.loader.project_state(self.before).apps
+        CodeModel = apps.get_model('main', 'DiscountCode')
+        now = timezone.now()
+        expired = CodeModel.objects.create(code='yaz25', discount_percentage=10, valid_from=now,
+                                           valid_to=now + timedelta(days=1))
+        current = CodeModel.objects.create(code='YAZ25', discount_percentage=25, valid_from=now,
+                                           valid_to=now + timedelta(days=30))
+
+        apps = self.migrate()
+
+        codes = apps.get_model('main', 'DiscountCode').objects.order_by('pk')
+        self.assertEqual(
+            list(codes.values_list('pk', 'code', 'is_active')),
+            [(expired.pk, f'yaz25-{expired.pk}', False), (current.pk, 'YAZ25', True)],
+        )
+
+
+class SlowQueryTests(TestCase):
+    def setUp(self):
+        from . import slow_queries
+        self.slow_queries = slow_queries
+        slow_queries._buffer.clear()
+        self.addCleanup(slow_queries._buffer.clear)
+
+    def test_normalize(self):
+        normalize = self.slow_queries.normalize
+        self.assertEqual(
+            normalize("SELECT *  FROM \"t1\"\n WHERE name = 'O''Neil' AND x > 3.5 AND id IN (%s, %s, %s) LIMIT 21"),
+            'SELECT * FROM "t1" WHERE name = ? AND x > ? AND id IN (...) LIMIT ?',
+        )
+        self.assertEqual(normalize('SELECT 1 WHERE id IN (?,?)'), 'SELECT ? WHERE id IN (...)')
+
+    def test_fingerprint_ignores_literals(self):
+        normalize, fingerprint = self.slow_queries.normalize, self.slow_queries.fingerprint
+        first = fingerprint(normalize("SELECT * FROM t WHERE id IN (1, 2) AND s = 'a'"))
+
+        self.assertEqual(first, fingerprint(normalize("SELECT * FROM t WHERE id IN (3) AND s = 'bb'")))
+        self.assertNotEqual(first, fingerprint(normalize("SELECT * FROM u WHERE id IN (3) AND s = 'bb'")))
+        self.assertRegex(first, r'^[0-9a-f]{40}$')
+
+    @override_settings(SLOW_QUERY_THRESHOLD_MS=0)
+    def test_request_queries_are_buffered_and_flushed(self):
+        with mock.patch.object(self.slow_queries, 'SLOW_QUERY_FLUSH_INTERVAL', 3600):
+            self.client.get(reverse('about'))
+        buffered = list(self.slow_queries._buffer)
+        self.assertTrue(buffered)
+        self.assertFalse(SlowQuery.objects.exists())
+        self.assertEqual({query.view for query in buffered}, {'about'})
+        self.assertNotIn("'", ''.join(query.sql for query in buffered))
+
+        old = SlowQuery.objects.create(fingerprint='0' * 40, sql='SELECT ?', duration_ms=1, database='default',
+                                       captured_at=timezone.now() - timedelta(days=30))
+        self.assertEqual(self.slow_queries.flush_slow_queries(), len(buffered))
+        self.assertEqual(SlowQuery.objects.count(), len(buffered))
+        self.assertFalse(SlowQuery.objects.filter(pk=old.pk).exists())
+        self.assertEqual(self.slow_queries.flush_slow_queries(), 0)
+
+    def test_failed_flush_drops_records(self):
+        self.slow_queries._buffer.append(SlowQuery(fingerprint='0' * 40, sql='SELECT ?', duration_ms=1,
+                                                   database='default', captured_at=timezone.now()))
+        with mock.patch.object(SlowQuery.objects, 'bulk_create', side_effect=DatabaseError), \
+                self.assertLogs('main.slow_queries', 'ERROR'):
+            self.assertEqual(self.slow_queries.flush_slow_queries(), 0)
+        self.assertFalse(self.slow_queries._buffer)
+
+    def test_buffer_is_bounded(self):
+        for index in range(self.slow_queries.SLOW_QUERY_BUFFER_SIZE + 10):
+            self.slow_queries._buffer.append(index)
+        self.assertEqual(len(self.slow_queries._buffer), self.slow_queries.SLOW_QUERY_BUFFER_SIZE)
+        self.assertEqual(self.slow_queries._buffer[0], 10)
+
+    def test_admin_summary_takes_one_sample_per_fingerprint(self):
+        now = timezone.now()
+        for index in range(20):
+            SlowQuery.objects.create(fingerprint='a' * 40, sql='SELECT a', duration_ms=10, database='default',
+                                     view=f'view-{index % 2}', captured_at=now)
+        SlowQuery.objects.create(fingerprint='b' * 40, sql='SELECT b', duration_ms=500, database='default',
+                                 view='other', captured_at=now)
+        self.client.force_login(User.objects.create_user('staff', is_staff=True, is_superuser=True))
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('admin:main_slowquery_changelist'))
+
+        groups = response.context['groups']
+        self.assertEqual([(group['sql'], group['count'], group['views']) for group in groups], [
+            ('SELECT b', 1, ['other']),
+            ('SELECT a', 20, ['view-0', 'view-1']),
+        ])
+        sample_queries = [query['sql'] for query in queries if 'main_slowquery' in query['sql']]
+        self.assertEqual(len(sample_queries), 3)
+
+
+class QueueHandlerTests(SimpleTestCase):
+    def handler(self, handler_class='logging.handlers.BufferingHandler', **kwargs):
+        from .logs import QueueHandler
+        handler = QueueHandler(handler_class, **kwargs)
+        self.addCleanup(handler.close)
+        return handler
+
+    def record(self, msg, *args, exc_info=None):
+        import logging
+        return logging.LogRecord('test', logging.INFO, __file__, 1, msg, args, exc_info)
+
+    def test_prepare_copies_record_and_merges_arguments(self):
+        handler = self.handler(capacity=10)
+        values = ['ilk']
+        record = self.record('değer: %s', values)
+        try:
+            raise ValueError('hata')
+        except ValueError:
+            failed = self.record('başarısız', exc_info=sys.exc_info())
+
+        handler.handle(record)
+        handler.handle(failed)
+        # Kuyrukta beklerken argüman değişse de kayıt loglandığı andaki haliyle yazılır.
+        values.append('sonra')
+        handler._stop()
+
+        written, written_failure = handler.target.buffer
+        self.assertEqual(written.getMessage(), "değer: ['ilk']")
+        self.assertIsNot(written, record)
+        self.assertEqual(record.args, (values,))
+        self.assertIsNone(written_failure.exc_info)
+        self.assertIn('ValueError: hata', written_failure.exc_text)
+
+    def test_trace_json_is_serialized_on_listener_thread(self):
+        import io
+        import threading
+        from .tracing import _JsonLine
+        stream = io.StringIO()
+        handler = self.handler('logging.StreamHandler', stream=stream)
+        threads = []
+
+        def payload():
+            threads.append(threading.current_thread())
+            return {'resourceSpans': []}
+
+        handler.handle(self.record('%s', _JsonLine(payload)))
+        handler._stop()
+
+        self.assertEqual(stream.getvalue(), '{"resourceSpans":[]}\n')
+        self.assertEqual(len(threads), 1)
+        self.assertIsNot(threads[0], threading.current_thread())
+
+    @skipUnless(hasattr(os, 'fork'), "fork gerekir")
+    def test_listener_restarts_after_fork(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = Path(directory.name) / 'log.txt'
+        handler = self.handler('logging.FileHandler', filename=str(path))
+
+        pid = os.fork()
+        if pid == 0:
+            try:
+                handler.handle(self.record('çocuk %s', os.getpid()))
+                handler.close()
+            finally:
+                os._exit(0)
+        os.waitpid(pid, 0)
+
+        self.assertIn(f'çocuk {pid}', path.read_text(encoding='utf-8'))
+
+
+@override_settings(METRICS_ALLOWED_IPS=['10.0.0.9'], METRICS_DIR=None)
+class MetricsAccessTests(TestCase):
+    def get(self, remote_addr, forwarded=None):
+        extra = {'REMOTE_ADDR': remote_addr}
+        if forwarded:
+            extra['HTTP_X_FORWARDED_FOR'] = forwarded
+        return self.client.get(reverse('metrics'), **extra).status_code
+
+    def test_spoofed_forwarded_for_is_rejected(self):
+        self.assertEqual(self.get('10.0.0.9'), 200)
+        self.assertEqual(self.get('203.0.113.5', forwarded='10.0.0.9'), 403)
+
+    @override_settings(METRICS_TRUSTED_PROXY_COUNT=1)
+    def test_address_added_by_trusted_proxy(self):
+        # Vekil (REMOTE_ADDR) gerçek istemciyi sona ekler; istemcinin yazdığı soldaki değer okunmaz.
+        self.assertEqual(self.get('192.168.0.1', forwarded='10.0.0.9'), 200)
+        self.assertEqual(self.get('192.168.0.1', forwarded='10.0.0.9, 203.0.113.5'), 403)
+        self.assertEqual(self.get('10.0.0.9'), 403)
+
+
+class MetricsFileTests(SimpleTestCase):
+    def setUp(self):
+        from . import metrics
+        self.metrics = metrics
+        self.directory = self.enterContext(tempfile.TemporaryDirectory())
+        self.enterContext(override_settings(METRICS_DIR=self.directory))
+        self.enterContext(mock.patch.object(metrics, '_retired_checked', False))
+
+    def files(self):
+        return sorted(name for name in os.listdir(self.directory) if not name.startswith('.'))
+
+    def write(self, name, pid, emails):
+        import socket
+        path = os.path.join(self.directory, name)
+        Path(path).write_text(json.dumps({'host': socket.gethostname(), 'pid': pid, 'metrics': {
+            'email_send_errors_total': [[[], emails]],
+        }}), encoding='utf-8')
+
+    def emails(self):
+        return self.metrics.collect()['email_send_errors_total'][()]
+
+    def dead_pid(self):
+        process = subprocess.Popen([sys.executable, '-c', 'pass'])
+        process.wait()
+        return process.pid
+
+    def test_processes_without_requests_do_not_write(self):
+        with mock.patch.object(self.metrics, '_served', False):
+            self.metrics.flush_metrics()
+        self.assertEqual(self.files(), [])
+
+        with mock.patch.object(self.metrics, '_served', True):
+            self.metrics.flush_metrics()
+        [name] = self.files()
+        self.assertRegex(name, rf'^metrics-{os.getpid()}-[0-9a-f]{{12}}\.json$')
+
+    def test_dead_process_files_are_folded_into_retired_total(self):
+        own = self.metrics.EMAIL_ERRORS.values.get((), 0.0)
+        self.write('metrics-1-aaaa.json', self.dead_pid(), 2.0)
+        # Aynı pid'i kullanan önceki bir süreç: yeni süreç onun dosyasının üzerine yazmaz, toplama ekler.
+        self.write(f'metrics-{os.getpid()}-bbbb.json', os.getpid(), 3.0)
+        # Yaşayan bir sürecin dosyasına dokunulmaz.
+        self.write('metrics-2-cccc.json', os.getppid(), 5.0)
+
+        with mock.patch.object(self.metrics, '_served', True):
+            self.assertEqual(self.emails(), own + 10.0)
+            self.assertEqual(self.files(), sorted([
+                'metrics-2-cccc.json', 'metrics-retired.json', self.metrics._process_file(),
+            ]))
+
+            # Sonraki toplamalar ve yeni bir sürecin birleştirmesi değerleri tekrar saymaz.
+            self.assertEqual(self.emails(), own + 10.0)
+            self.metrics._retired_checked = False
+            self.assertEqual(self.emails(), own + 10.0)
+
+
+@override_settings(PROFILING_SAMPLE_RATE=1.0)
+class ProfilingTests(TestCase):
+    def test_server_timing_only_for_staff(self):
+        with self.assertLogs('main.profiling') as logs:
+            response = self.client.get(reverse('about'))
+        self.assertNotIn('Server-Timing', response)
+        self.assertEqual(json.loads(logs.records[0].getMessage())['path'], reverse('about'))
+
+        staff = User.objects.create_user('staff', is_staff=True)
+        self.client.force_login(staff)
+        with self.assertLogs('main.profiling'):
+            response = self.client.get(reverse('about'))
+        self.assertRegex(response['Server-Timing'], r'db;dur=[\d.]+;desc="\d+ queries"')
+
+    @override_settings(PROFILING_SAMPLE_RATE=0.0)
+    def test_forced_profile(self):
+        from .profiling import PROFILE_PARAM, profile_token
+        staff = User.objects.create_user('staff', is_staff=True)
+        self.client.force_login(staff)
+
+        self.assertNotIn('Server-Timing', self.client.get(reverse('about')))
+        with self.assertLogs('main.profiling') as logs:
+            response = self.client.get(reverse('about'), {PROFILE_PARAM: profile_token(staff)})
+        self.assertIn('Server-Timing', response)
+        self.assertTrue(json.loads(logs.records[0].getMessage())['forced'])
+
+
+@override_settings(TRACING_SAMPLE_RATE=0.0)
+class TracingTests(TestCase):
+    CHECKOUT = {
+        'billing_name': 'Ayşe Yılmaz', 'billing_email': 'ayse@example.com', 'billing_phone_number': '05551234567',
+        'billing_address': 'Moda Cd. 1', 'billing_city': 'İstanbul', 'billing_postal_code': '34710',
+        'payment_method': 'bank_transfer', 'currency': 'TRY',
+    }
+
+    def setUp(self):
+        self.user = User.objects.create_user('customer')
+        self.client.force_login(self.user)
+        item = PortfolioItem.objects.create(
+            title='Ürün', slug='urun', short_description='...', long_description='...',
+            main_image='portfolio_images/p.jpg', price=Decimal('100'),
+        )
+        self.cart = Order.objects.create(user=self.user, status='cart')
+        OrderItem.objects.create(order=self.cart, portfolio_item=item, price=item.price)
+
+    def spans(self, logs):
+        self.assertEqual(len(logs.records), 1)
+        payload = json.loads(logs.records[0].getMessage())
+        [resource] = payload['resourceSpans']
+        self.assertIn({'key': 'service.name', 'value': {'stringValue': 'novusliva'}},
+                      resource['resource']['attributes'])
+        return resource['scopeSpans'][0]['spans']
+
+    def attributes(self, span):
+        return {attribute['key']: attribute['value'] for attribute in span['attributes']}
+
+    def test_checkout_trace_payload(self):
+        with self.assertLogs('main.tracing', 'INFO') as logs:
+            response = self.client.post(reverse('checkout'), self.CHECKOUT)
+        self.assertEqual(response.status_code, 302)
+        root, *children = self.spans(logs)
+
+        self.assertEqual(root['name'], 'POST /checkout/')
+        self.assertNotIn('parentSpanId', root)
+        attributes = self.attributes(root)
+        self.assertEqual(attributes['order.id'], {'intValue': str(self.cart.id)})
+        self.assertEqual(attributes['http.response.status_code'], {'intValue': '302'})
+        self.assertNotIn('trace.dropped_spans', attributes)
+
+        self.assertTrue(children)
+        self.assertIn('UPDATE', {span['name'] for span in children})
+        for span in children:
+            self.assertEqual(span['traceId'], root['traceId'])
+            self.assertEqual(span['parentSpanId'], root['spanId'])
+            self.assertEqual(self.attributes(span)['db.system'], {'stringValue': 'sqlite'})
+        self.assertEqual(len({span['spanId'] for span in [root, *children]}), len(children) + 1)
+
+    def test_span_limit_counts_dropped_spans(self):
+        with self.assertLogs('main.tracing', 'INFO') as logs:
+            self.client.post(reverse('checkout'), self.CHECKOUT)
+        total = len(self.spans(logs))
+        Order.objects.filter(pk=self.cart.pk).update(status='cart')
+
+        with mock.patch('main.tracing.MAX_SPANS', 3), self.assertLogs('main.tracing', 'INFO') as logs:
+            self.client.post(reverse('checkout'), self.CHECKOUT)
+        spans = self.spans(logs)
+        self.assertEqual(len(spans), 3)
+        self.assertEqual(self.attributes(spans[0])['trace.dropped_spans'], {'intValue': str(total - 3)})
+
+    def test_incoming_traceparent_is_continued(self):
+        trace_id, parent_id = '4bf92f3577b34da6a3ce929d0e0e4736', '00f067aa0ba902b7'
+        with self.assertLogs('main.tracing', 'INFO') as logs:
+            self.client.get(reverse('cart_detail'), headers={'traceparent': f'00-{trace_id}-{parent_id}-01'})
+        root, *children = self.spans(logs)
+        self.assertEqual(root['traceId'], trace_id)
+        self.assertEqual(root['parentSpanId'], parent_id)
+        self.assertTrue(children)
+        self.assertTrue(all(span['traceId'] == trace_id for span in children))
+
+        # Geçersiz başlık yok sayılır; trace istek kimliğinden türetilir.
+        with self.assertLogs('main.tracing', 'INFO') as logs:
+            self.client.get(reverse('cart_detail'), headers={'traceparent': f'00-{trace_id}-zz-01'})
+        root = self.spans(logs)[0]
+        self.assertNotEqual(root['traceId'], trace_id)
+        self.assertNotIn('parentSpanId', root)
+
+    def test_untraced_views_write_nothing(self):
+        with self.assertNoLogs('main.tracing'):
+            response = self.client.get(reverse('portfolio'))
+        self.assertEqual(response.status_code, 200)
+
+        with override_settings(TRACING_SAMPLE_RATE=1.0), self.assertLogs('main.tracing', 'INFO') as logs:
+            self.client.get(reverse('portfolio'))
+        self.assertEqual(self.spans(logs)[0]['name'], 'GET /portfolio/')
+
+
+class BenchmarkCommandTests(SimpleTestCase):
+    def test_refuses_to_write_to_implicit_database(self):
+        from django.core.management import CommandError, call_command
+        environ = {key: value for key, value in os.environ.items() if key != 'SQLITE_PATH'}
+        with mock.patch.dict(os.environ, environ, clear=True), mock.patch('main.benchmark.Benchmark.run') as run:
+            with self.assertRaisesMessage(CommandError, '--allow-writes'):
+                call_command('benchmark', duration=0)
+        run.assert_not_called()
+
+
+class GenerateDatasetCommandTests(TransactionTestCase):
+    # Komut boş bir veritabanı ister; TestCase'in işlemi yerine tablolar her testten sonra boşaltılır.
+    SIZE = {'users': 5, 'posts': 4, 'comments': 10, 'items': 3, 'orders': 6, 'subscribers': 3}
+
+    def setUp(self):
+        media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(media_root.cleanup)
+        self.enterContext(override_settings(MEDIA_ROOT=media_root.name))
+
+    def generate(self):
+        import io
+        from django.core.management import call_command
+        call_command('generate_dataset', seed=7, until=date(2025, 6, 1), stdout=io.StringIO(), **self.SIZE)
+
+    def snapshot(self):
+        return {
+            'users': list(User.objects.order_by('pk').values_list('username', 'email', 'date_joined')),
+            'posts': list(BlogPost.objects.order_by('pk').values_list('slug', 'category__slug', 'created_at', 'comment_count')),
+            'comments': list(Comment.objects.order_by('pk').values_list('post__slug', 'body', 'created_at', 'active')),
+            'items': list(PortfolioItem.objects.order_by('pk').values_list('slug', 'price')),
+            'orders': list(Order.objects.order_by('pk').values_list('user__username', 'status', 'created_at')),
+            'order_items': list(OrderItem.objects.order_by('pk').values_list('order_id', 'portfolio_item__slug', 'quantity')),
+        }
+
+    def test_tiny_dataset_row_counts(self):
+        from .models import Subscriber
+
+        self.generate()
+        counts = {
+            'users': User.objects.count(), 'posts': BlogPost.objects.count(), 'comments': Comment.objects.count(),
+            'items': PortfolioItem.objects.count(), 'orders': Order.objects.count(),
+            'subscribers': Subscriber.objects.count(),
+        }
+        self.assertEqual(counts, self.SIZE)
+        # Toplu yüklemede sinyaller çalışmaz; sayaçlar komut tarafından doldurulur.
+        for post in BlogPost.objects.all():
+            self.assertEqual(post.comment_count, post.comments.filter(active=True).count())
+
+    def test_same_seed_generates_same_data_and_refuses_non_empty_database(self):
+        from django.core.management import CommandError, call_command
+
+        self.generate()
+        first = self.snapshot()
+        with self.assertRaisesMessage(CommandError, 'boş değil'):
+            self.generate()
+        self.assertEqual(self.snapshot(), first)
+
+        call_command('flush', interactive=False, verbosity=0)
+        self.generate()
+        self.assertEqual(self.snapshot(), first)
+
+
+class FeedTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user('author', first_name='Ayşe', last_name='Yazar')
+        cls.news = Category.objects.create(name='Haber', slug='haber')
+        cls.guides = Category.objects.create(name='Rehber', slug='rehber')
+        cls.post = cls.create_post('haber-yazisi', cls.news, content='<p>Kısa &amp; <b>öz</b> içerik</p>')
+        cls.create_post('rehber-yazisi', cls.guides)
+        cls.create_post('taslak', cls.news, status='draft')
+
+    @classmethod
+    def create_post(cls, slug, category, status='published', content='<p>...</p>'):
+        return BlogPost.objects.create(title=slug, slug=slug, content=content, author=cls.author,
+                                       category=category, image='blog_images/b.jpg', status=status)
+
+    def setUp(self):
+        cache.clear()
+
+    def titles(self, response, tag):
+        return re.findall(rf'<{tag}><title>([^<]*)</title>', response.content.decode())
+
+    def test_rss_lists_published_posts_with_excerpt(self):
+        response = self.client.get(reverse('blog_feed_rss'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('application/rss+xml'))
+        self.assertEqual(sorted(self.titles(response, 'item')), ['haber-yazisi', 'rehber-yazisi'])
+        content = response.content.decode()
+        self.assertIn('<description>Kısa &amp; öz içerik</description>', content)
+        self.assertIn('Ayşe Yazar', content)
+        self.assertIn('<category>Haber</category>', content)
+
+    def test_atom_feed(self):
+        response = self.client.get(reverse('blog_feed_atom'))
+
+        self.assertTrue(response['Content-Type'].startswith('application/atom+xml'))
+        self.assertEqual(sorted(self.titles(response, 'entry')), ['haber-yazisi', 'rehber-yazisi'])
+
+    def test_category_feeds(self):
+        for name in ('category_feed_rss', 'category_feed_atom'):
+            with self.subTest(name):
+                response = self.client.get(reverse(name, kwargs={'category_slug': 'rehber'}))
+                self.assertEqual(self.titles(response, 'entry' if 'atom' in name else 'item'), ['rehber-yazisi'])
+                self.assertIn('Rehber', response.content.decode())
+        response = self.client.get(reverse('category_feed_rss', kwargs={'category_slug': 'yok'}))
+        self.assertEqual(response.status_code, 404)
+
+    def test_conditional_headers(self):
+        url = reverse('blog_feed_rss')
+        response = self.client.get(url)
+        self.assertIn('ETag', response)
+        self.assertIn('Last-Modified', response)
+
+        self.assertEqual(self.client.get(url, headers={'if_none_match': response['ETag']}).status_code, 304)
+        modified_since = self.client.get(url, headers={'if_modified_since': response['Last-Modified']})
+        self.assertEqual(modified_since.status_code, 304)
+        # Akış aynı sürüm için önbellekten sunulur; içerik sorgulanmaz.
+        with self.assertNumQueries(0):
+            self.client.get(url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.create_post('yeni', self.news)
+        changed = self.client.get(url, headers={'if_none_match': response['ETag']})
+        self.assertEqual(changed.status_code, 200)
+        self.assertIn('yeni', self.titles(changed, 'item'))
+
+    def test_save_inside_transaction_keeps_cached_feed_consistent(self):
+        url = reverse('blog_feed_rss')
+        etag = self.client.get(url)['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                self.create_post('yeni', self.news)
+                # Commit'ten önce sürüm değişmez; akış eski sürümün anahtarıyla sunulur.
+                during = self.client.get(url)
+                self.assertEqual(during['ETag'], etag)
+                self.assertNotIn('yeni', self.titles(during, 'item'))
+
+        after = self.client.get(url)
+        self.assertNotEqual(after['ETag'], etag)
+        self.assertIn('yeni', self.titles(after, 'item'))
+        # Yeni sürümün anahtarında commit edilmiş içerik vardır.
+        with self.assertNumQueries(0):
+            self.assertIn('yeni', self.titles(self.client.get(url), 'item'))
+
+    def test_excerpt_backfill(self):
+        import importlib
+        from django.apps import apps
+        migration = importlib.import_module('main.migrations.0006_blogpost_excerpt')
+        BlogPost.objects.filter(pk=self.post.pk).update(excerpt='')
+        BlogPost.objects.filter(slug='rehber-yazisi').update(excerpt='', meta_description='Meta özet')
+
+        migration.fill_excerpts(apps, None)
+
+        self.assertEqual(BlogPost.objects.get(pk=self.post.pk).excerpt, 'Kısa & öz içerik')
+        self.assertEqual(BlogPost.objects.get(slug='rehber-yazisi').excerpt, 'Meta özet')
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.excerpt, self.post.build_excerpt())
+
+
+class SitemapTests(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.root = Path(directory.name) / 'public'
+        self.manifest = Path(directory.name) / 'sitemap-manifest.json'
+        self.enterContext(override_settings(SITEMAP_ROOT=self.root, SITEMAP_MANIFEST=self.manifest,
+                                            SITE_URL='https://example.com'))
+        self.author = User.objects.create_user('author')
+
+    def create_post(self, slug):
+        return BlogPost.objects.create(title=slug, slug=slug, content='...', author=self.author,
+                                       image='blog_images/b.jpg', status='published')
+
+    def blog_urls(self):
+        import gzip
+        return gzip.decompress((self.root / 'sitemap-blog-1.xml.gz').read_bytes()).decode()
+
+    def test_post_change_rebuilds_section_outside_request(self):
+        from .sitemaps import build_sitemaps
+        build_sitemaps()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.create_post('ilk')
+            self.create_post('ikinci')
+
+        # Kayıt sırasında dosya yazılmaz; bölüm bir kez kuyruğa alınır.
+        self.assertNotIn('/ilk/', self.blog_urls())
+        self.assertEqual(list(DeferredTask.objects.filter(name='sitemap').values_list('argument', flat=True)), ['blog'])
+
+        deferred.run_pending()
+        self.assertIn('https://example.com/blog/ilk/', self.blog_urls())
+        self.assertIn('https://example.com/blog/ikinci/', self.blog_urls())
+
+    def test_missing_index_is_built_outside_request(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.create_post('ilk')
+        DeferredTask.objects.all().delete()
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.get('/sitemap.xml')
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response['Retry-After'], '600')
+        self.assertFalse(self.root.exists())
+        self.assertTrue(DeferredTask.objects.filter(name='sitemap').exists())
+
+        deferred.run_pending()
+        response = self.client.get('/sitemap.xml')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'https://example.com/sitemaps/sitemap-blog-1.xml.gz', b''.join(response.streaming_content))
+        self.assertIn('https://example.com/blog/ilk/', self.blog_urls())
+        self.assertEqual(self.client.get('/sitemaps/sitemap-blog-9.xml.gz').status_code, 404)
+
+    def test_manifest_is_kept_outside_public_root(self):
+        from .sitemaps import build_section, build_sitemaps
+        # Eski sürümlerin SITEMAP_ROOT'a yazdığı manifest okunur ve taşınır.
+        self.root.mkdir()
+        (self.root / 'manifest.json').write_text(json.dumps({'portfolio': {'sitemap-portfolio-1.xml.gz': None}}))
+        build_section('blog')
+        self.assertEqual(set(json.loads(self.manifest.read_text())), {'blog', 'portfolio'})
+        self.assertFalse((self.root / 'manifest.json').exists())
+
+        build_sitemaps()
+        self.assertEqual(sorted(path.name for path in self.root.iterdir()), [
+            'sitemap-blog-1.xml.gz', 'sitemap-portfolio-1.xml.gz', 'sitemap-static-1.xml.gz', 'sitemap.xml',
+        ])
+
+    @skipUnless(os.name == 'posix', "flock sadece POSIX'te")
+    def test_manifest_update_holds_file_lock(self):
+        import fcntl
+        from . import sitemaps
+        lock_path = self.manifest.with_name(f'.{self.manifest.name}.lock')
+        load_manifest = sitemaps._load_manifest
+
+        def load_while_locked():
+            # Başka bir süreç (ayrı bir dosya tanıtıcısı) kilidi alamamalı.
+            with open(lock_path) as other, self.assertRaises(BlockingIOError):
+                fcntl.flock(other.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return load_manifest()
+
+        with mock.patch.object(sitemaps, '_load_manifest', side_effect=load_while_locked) as patched:
+            sitemaps.build_section('blog')
+        patched.assert_called_once()
+        with open(lock_path) as other:
+            fcntl.flock(other.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+
+
+class CommentPagingTests(TestCase):
+    """Yorumların keyset sayfalaması ve BlogPost.comment_count."""
+
+    @classmethod
+    def setUpTestData(cls):
+        author = User.objects.create_user('author')
+        cls.post = BlogPost.objects.create(title='Yazı', slug='yazi', content='...', author=author,
+                                           image='blog_images/b.jpg', status='published')
+
+    def create_comments(self, count, active=True):
+        return [Comment.objects.create(post=self.post, name=f'Okur {i}', email='okur@example.com', body='...',
+                                       active=active) for i in range(count)]
+
+    def assertCommentCount(self, expected):
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.comment_count, expected)
+
+    def test_pages_are_complete_when_created_at_values_are_equal(self):
+        from .comments import comment_page
+
+        comments = self.create_comments(7)
+        self.create_comments(2, active=False)
+        # Aynı anda gelen yorumlar: sıra ve imleç pk ile belirlenir.
+        Comment.objects.update(created_at=timezone.now().replace(microsecond=123456))
+
+        seen, cursor = [], None
+        while True:
+            page, cursor = comment_page(self.post.pk, cursor, page_size=3)
+            seen += [comment.pk for comment in page]
+            if cursor is None:
+                break
+        self.assertEqual(seen, [comment.pk for comment in comments])
+
+    def test_fragment_view_follows_cursor(self):
+        comments = self.create_comments(12)
+        Comment.objects.update(created_at=timezone.now())
+        url = reverse('blog_comments', kwargs={'slug': self.post.slug})
+
+        first = self.client.get(url)
+        self.assertEqual([comment.pk for comment in first.context['comments']], [c.pk for c in comments[:10]])
+        second = self.client.get(first.context['next_comments_url'])
+        self.assertEqual([comment.pk for comment in second.context['comments']], [c.pk for c in comments[10:]])
+        self.assertIsNone(second.context['next_comments_url'])
+
+    def test_bad_cursor_returns_400(self):
+        self.create_comments(1)
+        url = reverse('blog_comments', kwargs={'slug': self.post.slug})
+        for cursor in ['abc', 'abc_1', '20250101000000000000_x', '2025_1']:
+            with self.subTest(cursor):
+                self.assertEqual(self.client.get(url, {'after': cursor}).status_code, 400)
+
+    def test_comment_count_follows_create_approve_deactivate_and_delete(self):
+        pending, approved = self.create_comments(2, active=False)[0], self.create_comments(1)[0]
+        self.assertCommentCount(1)
+
+        pending.active = True
+        pending.save()
+        self.assertCommentCount(2)
+
+        approved.active = False
+        approved.save()
+        self.assertCommentCount(1)
+
+        pending.delete()
+        self.assertCommentCount(0)
+        approved.delete()
+        self.assertCommentCount(0)
+
+
+class BlogCounterTests(TestCase):
+    """Sidebar sayaçları (Category/Tag.post_count, BlogArchiveMonth) sinyallerle güncel kalmalı."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user('author')
+        cls.news = Category.objects.create(name='Haber', slug='haber')
+        cls.guides = Category.objects.create(name='Rehber', slug='rehber')
+        cls.django = Tag.objects.create(name='Django', slug='django')
+        cls.python = Tag.objects.create(name='Python', slug='python')
+
+    def setUp(self):
+        cache.clear()
+
+    def create_post(self, status='published', category=None, tags=()):
+        post = BlogPost.objects.create(title='Yazı', slug=f'yazi-{BlogPost.objects.count()}', content='...',
+                                       author=self.author, image='blog_images/b.jpg', status=status,
+                                       category=category or self.news)
+        post.tags.set(tags)
+        return post
+
+    def assertCounts(self, news=None, guides=None, django=None, python=None, months=None):
+        for obj, expected in ((self.news, news), (self.guides, guides), (self.django, django), (self.python, python)):
+            if expected is not None:
+                obj.refresh_from_db()
+                self.assertEqual(obj.post_count, expected, obj.name)
+        if months is not None:
+            self.assertEqual(dict(BlogArchiveMonth.objects.values_list('month', 'post_count')), months)
+
+    def this_month(self):
+        return timezone.localtime().date().replace(day=1)
+
+    def test_publish_and_unpublish(self):
+        post = self.create_post(status='draft', tags=[self.django])
+        self.assertCounts(news=0, django=0, months={})
+
+        post.status = 'published'
+        post.save()
+        self.assertCounts(news=1, django=1, months={self.this_month(): 1})
+
+        post.status = 'draft'
+        post.save()
+        self.assertCounts(news=0, django=0, months={})
+
+    def test_delete(self):
+        keep = self.create_post(tags=[self.django])
+        post = self.create_post(tags=[self.django, self.python])
+        self.assertCounts(news=2, django=2, python=1, months={self.this_month(): 2})
+
+        post.delete()
+        self.assertCounts(news=1, django=1, python=0, months={self.this_month(): 1})
+        keep.delete()
+        self.assertCounts(news=0, django=0, months={})
+
+    def test_tag_add_remove_and_clear(self):
+        post = self.create_post()
+        post.tags.add(self.django, self.python)
+        self.assertCounts(django=1, python=1)
+
+        post.tags.remove(self.python)
+        self.assertCounts(django=1, python=0)
+
+        # Etiket tarafından (reverse) temizleme
+        self.django.blog_posts.clear()
+        self.assertCounts(django=0)
+
+        post.tags.add(self.python)
+        post.tags.clear()
+        self.assertCounts(python=0)
+
+    def test_draft_tags_are_not_counted(self):
+        self.create_post(status='draft', tags=[self.django])
+        self.assertCounts(django=0)
+
+    def test_category_move(self):
+        post = self.create_post()
+        post.category = self.guides
+        post.save()
+        self.assertCounts(news=0, guides=1)
+
+    def test_month_move(self):
+        post = self.create_post()
+        last_year = post.created_at - timedelta(days=366)
+        post.created_at = last_year
+        post.save()
+
+        self.assertCounts(months={timezone.localtime(last_year).date().replace(day=1): 1})
+
+    def test_sidebar_reflects_counters(self):
+        from .blog_stats import blog_sidebar
+        self.create_post(tags=[self.django])
+        self.assertEqual([tag['slug'] for tag in blog_sidebar()['popular_tags']], ['django'])
+
+        self.create_post(tags=[self.python])
+        self.create_post(tags=[self.python])
+        self.assertEqual([tag['slug'] for tag in blog_sidebar()['popular_tags']], ['python', 'django'])
+
+
+class RelatedPostsTests(TestCase):
+    """Benzer yazılar admin isteğinde hesaplanmaz; ertelenmiş iş tam yeniden üretimle aynı sonucu vermeli."""
+
+    def rows(self):
+        return sorted(RelatedPost.objects.values_list('post_id', 'related_id', 'rank'))
+
+    def test_save_defers_refresh_and_matches_full_build(self):
+        from .related_posts import build_related_posts
+        author = User.objects.create_user('author')
+        category = Category.objects.create(name='Haber', slug='haber')
+        tags = [Tag.objects.create(name=f'Etiket {i}', slug=f'etiket-{i}') for i in range(3)]
+        with self.captureOnCommitCallbacks(execute=True):
+            for i in range(6):
+                post = BlogPost.objects.create(
+                    title=f'Django yazısı {i}', slug=f'yazi-{i}', content=f'<p>Django önbellek {i % 2}</p>',
+                    author=author, category=category, image='blog_images/b.jpg', status='published',
+                )
+                post.tags.set(tags[i % 3:])
+        self.assertFalse(RelatedPost.objects.exists())
+        self.assertEqual(DeferredTask.objects.filter(name='related-posts').count(), 6)
+
+        deferred.run_pending()
+        incremental = self.rows()
+        self.assertTrue(incremental)
+        build_related_posts()
+        self.assertEqual(incremental, self.rows())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            BlogPost.objects.filter(slug='yazi-0').get().delete()
+        deferred.run_pending()
+        self.assertFalse(RelatedPost.objects.filter(related__slug='yazi-0').exists())
+        incremental = self.rows()
+        build_related_posts()
+        self.assertEqual(incremental, self.rows())
+
+    def test_category_only_adds_to_tag_or_term_candidates(self):
+        from .related_posts import CATEGORY_WEIGHT, TAG_WEIGHT, RelatedIndex
+        author = User.objects.create_user('author')
+        news, guides = Category.objects.create(name='Haber', slug='haber'), Category.objects.create(name='Rehber', slug='rehber')
+        tag = Tag.objects.create(name='Django', slug='django')
+        posts = [
+            BlogPost.objects.create(title=f'Yazı {i}', slug=f'yazi-{i}', content=f'<p>{word}</p>', author=author,
+                                    category=category, image='blog_images/b.jpg', status='published')
+            for i, (category, word) in enumerate([(news, 'elma'), (news, 'armut'), (guides, 'kiraz'), (news, 'erik')])
+        ]
+        for post in posts[:3]:
+            post.tags.add(tag)
+
+        scores = RelatedIndex.build().scores(posts[0].pk)
+        # Aynı kategoride olup ortak etiketi/terimi olmayan yazı aday değildir.
+        self.assertEqual(scores, {posts[1].pk: TAG_WEIGHT + CATEGORY_WEIGHT, posts[2].pk: TAG_WEIGHT})
+
+    def test_refresh_reads_only_changed_posts_and_neighbours(self):
+        from . import related_posts
+        author = User.objects.create_user('author')
+        category = Category.objects.create(name='Haber', slug='haber')
+        django, other = Tag.objects.create(name='Django', slug='django'), Tag.objects.create(name='Diğer', slug='diger')
+        posts = []
+        for i in range(12):
+            post = BlogPost.objects.create(
+                title=f'Yazı {i}', slug=f'yazi-{i}', content=f'<p>{"önbellek sorgu" if i < 4 else f"konu{i}"}</p>',
+                author=author, category=category, image='blog_images/b.jpg', status='published',
+            )
+            post.tags.add(django if i < 4 else other)
+            posts.append(post)
+        related_posts.build_related_posts()
+
+        BlogPost.objects.filter(pk=posts[0].pk).update(content='<p>önbellek sorgu indeks</p>')
+        with mock.patch.object(related_posts, '_terms', wraps=related_posts._terms) as terms, \
+                mock.patch.object(related_posts.RelatedIndex, 'load', wraps=related_posts.RelatedIndex.load) as load:
+            related_posts.refresh_related_posts({str(posts[0].pk)})
+
+        # Sadece değişen yazının içeriği işlenir; indeksler değişen yazı ve etiket/terim komşularıyla sınırlıdır.
+        self.assertEqual(terms.call_count, 1)
+        loaded = set().union(*(set(call.args[0]) for call in load.call_args_list))
+        self.assertEqual(loaded, {post.pk for post in posts[:4]})
+        incremental = self.rows()
+        related_posts.build_related_posts()
+        self.assertEqual(incremental, self.rows())
+
+
+class EmptyOrderSignalTests(TestCase):
+    def test_order_without_items_is_deleted_and_logged(self):
+        service = Service.objects.create(title='Web', description='...', icon_class='bi bi-star', color_class='item-cyan')
+        item = PortfolioItem.objects.create(
+            title='Proje', slug='proje', short_description='...', long_description='...',
+            category=PortfolioCategory.objects.create(name='Proje', slug='proje'), service=service,
+            main_image='portfolio_images/p.jpg', price=Decimal(500), project_date=date(2025, 1, 1),
+        )
+        user = User.objects.create_user('customer')
+        order = Order.objects.create(user=user, status='cart')
+        first = OrderItem.objects.create(order=order, portfolio_item=item, price=item.price)
+        second = OrderItem.objects.create(order=order, portfolio_item=item, price=item.price)
+
+        with self.assertNoLogs('main.signals'):
+            first.delete()
+        self.assertTrue(Order.objects.filter(pk=order.pk).exists())
+
+        order_id = order.pk
+        with self.assertLogs('main.signals', 'INFO') as logs:
+            second.delete()
+        self.assertFalse(Order.objects.filter(pk=order_id).exists())
+        self.assertEqual(logs.records[0].getMessage(), f"Sepet {order_id} boş olduğu için silindi.")
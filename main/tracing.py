@@ -0,0 +1,265 @@
+"""
+Ödeme akışı için hafif span izleme.
+
+`TracingMiddleware` her istek için bir kök (SERVER) span açar. İzlenen isteklerde
+veritabanı sorguları, ödeme sağlayıcısı çağrıları ve e-posta gönderimleri alt
+span olur. Ödeme akışındaki view'ler (TRACED_VIEWS) her zaman izlenir; diğer
+istekler TRACING_SAMPLE_RATE oranında örneklenir. Trace kimliği istek
+kimliğinden (`X-Request-ID`) türetilir, gelen geçerli bir W3C `traceparent`
+varsa ona bağlanılır.
+
+Bir satın alma birden fazla istekten (checkout, sağlayıcı, callback, başarı
+sayfası) geçer; bu isteklerin kök span'lerine `order.id` özniteliği eklenir
+(`set_order`), böylece trace'ler sipariş numarasıyla aranabilir.
+
+Biten trace'ler `main.tracing` logger'ına OTLP/JSON (`ExportTraceServiceRequest`)
+olarak satır başına bir kayıt yazılır; kuyruklu log handler'ı TRACING_FILE'a
+aktarır. Dosya OpenTelemetry Collector'ın `otlpjsonfile` alıcısıyla veya
+OTLP/JSON okuyan araçlarla açılabilir; collector gerekmez.
+"""
+import hashlib
+import json
+import logging
+import os
+import random
+import re
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.db import connections
+
+from .logs import LazyArgument
+
+logger = logging.getLogger(__name__)
+
+SERVICE_NAME = 'novusliva'
+MAX_SPANS = 256
+MAX_STATEMENT_LENGTH = 1000
+
+# OTLP span türleri ve durum kodları
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_SERVER = 2
+SPAN_KIND_CLIENT = 3
+STATUS_UNSET = 0
+STATUS_ERROR = 2
+
+# Bir satın alma akışındaki view'ler (URL adları) her zaman izlenir.
+TRACED_VIEWS = {
+    'cart_detail', 'apply_discount', 'checkout', 'start_paytr_payment', 'paytr_checkout_embed',
+    'paytr_callback', 'iyzico_callback', 'iyzico_webhook', 'payment_success', 'order_success', 'order_failed',
+}
+
+TRACEPARENT = re.compile(r'^00-([0-9a-f]{32})-([0-9a-f]{16})-[0-9a-f]{2}$')
+HEX_TRACE_ID = re.compile(r'^[0-9a-f]{32}$')
+
+_state = threading.local()
+
+
+def _span_id():
+    return os.urandom(8).hex()
+
+
+class Span:
+    __slots__ = ('name', 'kind', 'span_id', 'parent_id', 'start_ns', 'end_ns', 'attributes', 'status', 'events')
+
+    def __init__(self, name, kind, parent_id, attributes):
+        self.name = name
+        self.kind = kind
+        self.span_id = _span_id()
+        self.parent_id = parent_id
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.attributes = attributes
+        self.status = (STATUS_UNSET, '')
+        self.events = []
+
+    def record_exception(self, exc):
+        self.status = (STATUS_ERROR, str(exc)[:200])
+        self.events.append(('exception', time.time_ns(), {
+            'exception.type': type(exc).__name__, 'exception.message': str(exc)[:500],
+        }))
+
+
+class Trace:
+    def __init__(self, trace_id, parent_span_id=None):
+        self.trace_id = trace_id
+        self.parent_span_id = parent_span_id
+        self.sampled = False
+        self.spans = []
+        self.active = []
+        self.dropped = 0
+
+    def start(self, name, kind=SPAN_KIND_INTERNAL, attributes=None):
+        if len(self.spans) >= MAX_SPANS:
+            self.dropped += 1
+            return None
+        parent = self.active[-1].span_id if self.active else self.parent_span_id
+        span = Span(name, kind, parent, attributes or {})
+        self.spans.append(span)
+        self.active.append(span)
+        return span
+
+    def end(self, span):
+        span.end_ns = time.time_ns()
+        if self.active and self.active[-1] is span:
+            self.active.pop()
+
+
+def current_trace():
+    return getattr(_state, 'trace', None)
+
+
+@contextmanager
+def span(name, kind=SPAN_KIND_INTERNAL, **attributes):
+    """İzlenen istekte bloğu bir alt span olarak kaydeder; diğer durumlarda bir şey yapmaz."""
+    trace = current_trace()
+    current = trace.start(name, kind, attributes) if trace is not None and trace.sampled else None
+    if current is None:
+        yield None
+        return
+    try:
+        yield current
+    except Exception as exc:
+        current.record_exception(exc)
+        raise
+    finally:
+        trace.end(current)
+
+
+def set_order(order_id):
+    """İsteğin kök span'ine sipariş numarasını ekler; aynı siparişin trace'leri bununla bulunur."""
+    trace = current_trace()
+    if trace is not None and trace.spans:
+        trace.spans[0].attributes['order.id'] = order_id
+
+
+class _DatabaseSpans:
+    def __init__(self, alias):
+        self.alias = alias
+
+    def __call__(self, execute, sql, params, many, context):
+        trace = current_trace()
+        if trace is None or not trace.sampled:
+            return execute(sql, params, many, context)
+        operation = sql.lstrip().split(' ', 1)[0].upper()
+        with span(operation, SPAN_KIND_CLIENT, **{
+            'db.system': context['connection'].vendor,
+            'db.name': self.alias,
+            'db.operation': operation,
+            'db.statement': sql[:MAX_STATEMENT_LENGTH],
+        }):
+            return execute(sql, params, many, context)
+
+
+def _trace_context(request):
+    match = TRACEPARENT.match(request.headers.get('traceparent', ''))
+    if match:
+        return match.group(1), match.group(2)
+    request_id = getattr(request, 'request_id', None) or os.urandom(16).hex()
+    if HEX_TRACE_ID.match(request_id):
+        return request_id, None
+    return hashlib.sha256(request_id.encode('utf-8')).hexdigest()[:32], None
+
+
+def _attribute(key, value):
+    if isinstance(value, bool):
+        typed = {'boolValue': value}
+    elif isinstance(value, int):
+        typed = {'intValue': str(value)}
+    elif isinstance(value, float):
+        typed = {'doubleValue': value}
+    else:
+        typed = {'stringValue': str(value)}
+    return {'key': key, 'value': typed}
+
+
+def _span_json(trace, span):
+    data = {
+        'traceId': trace.trace_id,
+        'spanId': span.span_id,
+        'name': span.name,
+        'kind': span.kind,
+        'startTimeUnixNano': str(span.start_ns),
+        'endTimeUnixNano': str(span.end_ns or span.start_ns),
+        'attributes': [_attribute(key, value) for key, value in span.attributes.items()],
+        'status': {'code': span.status[0], 'message': span.status[1]} if span.status[0] else {},
+    }
+    if span.parent_id:
+        data['parentSpanId'] = span.parent_id
+    if span.events:
+        data['events'] = [
+            {'name': name, 'timeUnixNano': str(at), 'attributes': [_attribute(k, v) for k, v in attrs.items()]}
+            for name, at, attrs in span.events
+        ]
+    return data
+
+
+def otlp_payload(trace):
+    """Trace'in OTLP/JSON `ExportTraceServiceRequest` gösterimi."""
+    return {'resourceSpans': [{
+        'resource': {'attributes': [_attribute('service.name', SERVICE_NAME)]},
+        'scopeSpans': [{
+            'scope': {'name': __name__},
+            'spans': [_span_json(trace, span) for span in trace.spans],
+        }],
+    }]}
+
+
+class _JsonLine(LazyArgument):
+    # JSON sadece kayıt gerçekten yazılacaksa (logger ve handler seviyeleri izin veriyorsa) ve kuyruklu
+    # handler'ın listener thread'inde üretilir; biten trace'in span'leri artık değişmez.
+    def __init__(self, payload_factory):
+        self.payload_factory = payload_factory
+
+    def __str__(self):
+        return json.dumps(self.payload_factory(), ensure_ascii=False, separators=(',', ':'))
+
+
+class TracingMiddleware:
+    """İstek için kök span açar; izlenen isteklerin trace'ini OTLP/JSON olarak yazar."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        trace = Trace(*_trace_context(request))
+        root = trace.start(request.method, SPAN_KIND_SERVER, {
+            'http.request.method': request.method,
+            'url.path': request.path,
+            'request.id': getattr(request, 'request_id', ''),
+        })
+        _state.trace = trace
+        try:
+            with ExitStack() as stack:
+                for alias in connections:
+                    stack.enter_context(connections[alias].execute_wrapper(_DatabaseSpans(alias)))
+                response = self.get_response(request)
+            root.attributes['http.response.status_code'] = response.status_code
+            if response.status_code >= 500:
+                root.status = (STATUS_ERROR, '')
+            return response
+        except Exception as exc:
+            root.record_exception(exc)
+            raise
+        finally:
+            _state.trace = None
+            trace.end(root)
+            match = request.resolver_match
+            if match and match.route:
+                root.name = f'{request.method} /{match.route}'
+                root.attributes['http.route'] = f'/{match.route}'
+            if trace.sampled:
+                if trace.dropped:
+                    root.attributes['trace.dropped_spans'] = trace.dropped
+                logger.info('%s', _JsonLine(lambda: otlp_payload(trace)))
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        trace = current_trace()
+        if trace is not None:
+            trace.sampled = (
+                request.resolver_match.url_name in TRACED_VIEWS
+                or random.random() < getattr(settings, 'TRACING_SAMPLE_RATE', 0.0)
+            )
+        return None
@@ -1,6 +1,6 @@
 # main/urls.py
 from django.urls import path
-from . import views
+from . import feeds, metrics, views
 
 urlpatterns = [
     # Ana Sayfa ve Statik Sayfalar
@@ -16,11 +16,18 @@ urlpatterns = [
     # Blog ve İçerik Yönetimi
     path('blog/', views.blog_view, name='blog'),
     path('blog/<slug:slug>/', views.blog_details_view, name='blog_details'),
+    path('blog/<slug:slug>/comments/', views.blog_comments_view, name='blog_comments'),
     path('blog/category/<slug:category_slug>/', views.posts_by_category_view, name='posts_by_category'),
+    path('blog/feed/rss/', feeds.latest_posts_rss, name='blog_feed_rss'),
+    path('blog/feed/atom/', feeds.latest_posts_atom, name='blog_feed_atom'),
+    path('blog/category/<slug:category_slug>/feed/rss/', feeds.category_posts_rss, name='category_feed_rss'),
+    path('blog/category/<slug:category_slug>/feed/atom/', feeds.category_posts_atom, name='category_feed_atom'),
     path('search/', views.search_view, name='search'),
 
     # Portfolyo
     path('portfolio/', views.portfolio_view, name='portfolio'),
+    # Proje slug'ları başlıktan üretilir; '_' önekli yol 'items' gibi bir proje slug'ını gölgelemez.
+    path('portfolio/_items/', views.portfolio_items_view, name='portfolio_items'),
     path('portfolio/<slug:slug>/', views.portfolio_details_view, name='portfolio_details'),
 
     # Kullanıcı ve Profil Yönetimi
@@ -55,4 +62,7 @@ urlpatterns = [
 
     path('iyzico/webhook/', views.iyzico_webhook_view, name='iyzico_webhook'),
 
+    # Prometheus metrikleri (personel veya METRICS_ALLOWED_IPS)
+    path('metrics/', metrics.metrics_view, name='metrics'),
+
 ]
@@ -0,0 +1,149 @@
+"""
+Write-behind görüntülenme sayaçları ve "en çok okunanlar" listesi.
+
+Her istek veritabanına yazmak yerine sayacı süreç içindeki bir tamponda artırır.
+Sayaç `counts_views` ile koşullu GET katmanının dışında tutulur; tarayıcı
+önbelleğinden gelen ve 304 alan okumalar da sayılır. Tampon slug ile tutulur,
+böylece 304 yanıtları için nesne yüklenmez. Tampon VIEW_FLUSH_INTERVAL saniyede
+bir (bir sonraki kayıtta) veya süreç kapanırken tek seferde yazılır: model başına
+bir SELECT ... FOR UPDATE ve bir bulk UPDATE. Bu yazmalar isteği yapan
+ziyaretçinin yazması sayılmaz; oturum ana veritabanına sabitlenmez (db_router.py). Popülerlik, yarı ömrü POPULARITY_HALF_LIFE olan üstel sönümle
+flush sırasında hesaplanır ve en popüler liste önbelleğe yazılır.
+
+Popülerlik log ölçeğinde saklanır: log(Σ hit · e^(λ·(t - EPOCH))). Böylece
+sadece yeni hit alan satırlar güncellenir, yine de tüm satırlar aynı ölçekte
+sıralanabilir (eski satırlar ayrıca sönümlendirilmez).
+"""
+import atexit
+import logging
+import math
+import threading
+import time
+from collections import Counter
+from functools import wraps
+
+from django.core.cache import cache
+from django.db import DatabaseError, transaction
+
+from .db_router import untracked_writes
+from .metrics import cache_lookup
+from .models import BlogPost, PortfolioItem
+
+logger = logging.getLogger(__name__)
+
+VIEW_FLUSH_INTERVAL = 30
+POPULARITY_HALF_LIFE = 7 * 24 * 60 * 60
+POPULARITY_EPOCH = 1735689600  # 2025-01-01 UTC
+POPULAR_LIMIT = 5
+POPULAR_CACHE_TIMEOUT = 60 * 60
+
+DECAY_RATE = math.log(2) / POPULARITY_HALF_LIFE
+
+# tampon anahtarı -> (model, yayınlanmış kayıtları döndüren queryset fonksiyonu)
+TRACKED_MODELS = {
+    'blog': (BlogPost, lambda: BlogPost.objects.filter(status='published')),
+    'portfolio': (PortfolioItem, lambda: PortfolioItem.objects.all()),
+}
+
+_buffer = Counter()
+_lock = threading.Lock()
+_last_flush = time.monotonic()
+
+
+def record_view(kind, slug):
+    """Görüntülenmeyi tampona ekler; süre dolduysa tamponu veritabanına yazar."""
+    global _last_flush
+    with _lock:
+        _buffer[kind, slug] += 1
+        due = time.monotonic() - _last_flush >= VIEW_FLUSH_INTERVAL
+        if due:
+            _last_flush = time.monotonic()
+    if due:
+        flush_views()
+
+
+def counts_views(kind, slug_kwarg='slug'):
+    """
+    Detay görünümünün başarılı GET yanıtlarını (200 ve 304) sayar. `conditional_page`'in
+    üstüne konmalıdır; 304 yanıtında görünüm gövdesi hiç çalışmaz.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            response = view(request, *args, **kwargs)
+            if request.method == 'GET' and response.status_code in (200, 304):
+                record_view(kind, kwargs[slug_kwarg])
+            return response
+        return wrapper
+    return decorator
+
+
+def _add_log(log_score, hits, now):
+    """log(e^log_score + hits · e^(λ·(now - EPOCH))) taşma olmadan."""
+    new = math.log(hits) + DECAY_RATE * (now - POPULARITY_EPOCH)
+    if log_score is None:
+        return new
+    high, low = max(log_score, new), min(log_score, new)
+    return high + math.log1p(math.exp(low - high))
+
+
+def flush_views():
+    """Tampondaki sayaçları yazar ve popüler listeleri yeniler. Yazılan hit sayısını döndürür."""
+    with _lock:
+        pending = Counter(_buffer)
+        _buffer.clear()
+    if not pending:
+        return 0
+
+    now = time.time()
+    written = 0
+    for kind, (model, _) in TRACKED_MODELS.items():
+        hits = {slug: count for (hit_kind, slug), count in pending.items() if hit_kind == kind}
+        if not hits:
+            continue
+        try:
+            # Flush istek sırasında tetiklenebilir; sayaç yazması ziyaretçiyi ana veritabanına sabitlemez.
+            with untracked_writes(), transaction.atomic():
+                rows = list(
+                    model.objects.select_for_update().filter(slug__in=hits)
+                    .only('slug', 'view_count', 'popularity').order_by('pk')
+                )
+                for row in rows:
+                    row.view_count += hits[row.slug]
+                    row.popularity = _add_log(row.popularity, hits[row.slug], now)
+                model.objects.bulk_update(rows, ['view_count', 'popularity'])
+            refresh_popular(kind)
+        except DatabaseError:
+            # Yazılamayan sayaçlar bir sonraki flush'a kalır; istek hata vermez.
+            logger.exception("Görüntülenme sayaçları yazılamadı: %s", kind)
+            with _lock:
+                _buffer.update({(kind, slug): count for slug, count in hits.items()})
+            continue
+        written += sum(hits.values())
+    return written
+
+
+def _popular_key(kind):
+    return f'popular:{kind}'
+
+
+def refresh_popular(kind, limit=POPULAR_LIMIT):
+    _, queryset = TRACKED_MODELS[kind]
+    popular = list(
+        queryset().filter(popularity__isnull=False).order_by('-popularity')
+        .values('pk', 'title', 'slug', 'view_count')[:limit]
+    )
+    cache.set(_popular_key(kind), popular, POPULAR_CACHE_TIMEOUT)
+    return popular
+
+
+def popular(kind):
+    """Widget için en popüler kayıtlar (pk, title, slug, view_count); önbellekten okunur."""
+    items = cache.get(_popular_key(kind))
+    cache_lookup('popular', items is not None)
+    if items is None:
+        items = refresh_popular(kind)
+    return items
+
+
+atexit.register(flush_views)
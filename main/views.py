@@ -11,14 +11,17 @@ from django.contrib.auth import login
 from django.contrib.auth.decorators import login_required
 from django.core.paginator import Paginator
 from django.db import transaction
-from django.http import JsonResponse, HttpResponseNotAllowed, HttpResponse, HttpResponseForbidden, HttpRequest
+from django.http import JsonResponse, HttpResponseNotAllowed, HttpResponse, HttpResponseForbidden, HttpRequest, \
+    HttpResponseBadRequest, Http404
 from django.shortcuts import render, get_object_or_404, redirect, reverse
 from django.contrib import messages
 from django.core.mail import EmailMessage, send_mail
 from django.db.models import Q, F
+from django.db.models.functions import Upper
 from django.template.loader import render_to_string
 from django.utils import timezone
 from django.utils.html import strip_tags
+from django.utils.http import urlencode
 from django.utils.translation import gettext_lazy as _
 import logging
 from django.conf import settings
@@ -28,14 +31,26 @@ from django.db import IntegrityError
 
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_POST
+from django.views.static import serve
 from ipware import get_client_ip
 
+from . import deferred, sitemaps
+from .blog_stats import blog_sidebar
+from .catalog import cart_lines
+from .comments import comment_page
+from .conditional import blog_post_timestamp, conditional_page, portfolio_item_timestamp, service_timestamp
+from .metrics import callback_lag, email_send, gateway_call, gateway_failure
+from .portfolio import PortfolioFilters, item_data, next_page_url, portfolio_facets, portfolio_page
+from .recommendations import also_bought, cart_recommendations
+from .related_posts import related_posts
+from .tracing import set_order
+from .view_counter import counts_views, popular
 from .forms import (
     ContactForm, CommentForm, UserRegisterForm, SubscriberForm,
     UserUpdateForm, ProfileUpdateForm, CheckoutForm as CustomCheckoutForm, DiscountApplyForm, CampaignEmailForm
 )
 from .models import (
-    Service, BlogPost, Tag, PortfolioItem, PortfolioCategory,
+    Service, BlogPost, PortfolioItem,
     TeamMember, Testimonial, Category, ContactMessage, Skill,
     Client, AboutPage, Order, OrderItem, DiscountCode, Subscriber, Feature
 )
@@ -121,8 +136,9 @@ def prepare_iyzico_request(order, user, phone_number, request):
 
 
 def initialize_iyzico_payment(iyzico_request, options):
-    checkout_form_initialize = iyzipay.CheckoutFormInitialize().create(iyzico_request, options)
-    return json.loads(checkout_form_initialize.read().decode("utf-8"))
+    with gateway_call('iyzico', 'initialize'):
+        checkout_form_initialize = iyzipay.CheckoutFormInitialize().create(iyzico_request, options)
+        return json.loads(checkout_form_initialize.read().decode("utf-8"))
 
 
 def verify_iyzico_signature(response, secret_key):
@@ -147,7 +163,7 @@ def verify_iyzico_signature(response, secret_key):
         cf.verify_signature(fields, secret_key, signature)
         return True
     except Exception as sig_err:
-        logger.warning(f"Iyzico signature verify failed: {sig_err}")
+        logger.warning("Iyzico signature verify failed: %s", sig_err)
         return False
 
 
@@ -181,14 +197,17 @@ def iyzico_webhook_view(request: HttpRequest) -> HttpResponse:
         event_type = data.get('eventType')
         conversation_id = data.get('paymentConversationId')
 
-        logger.info(f"Iyzico webhook'tan yeni bildirim alındı: {event_type} - {conversation_id}")
+        logger.info("Iyzico webhook'tan yeni bildirim alındı: %s - %s", event_type, conversation_id)
+        if data.get('iyziEventTime'):
+            callback_lag('iyzico', 'webhook', data['iyziEventTime'] / 1000)
 
         if not conversation_id:
-            logger.error(f"Iyzico webhook: Conversation ID bulunamadı. Data: {data}")
+            logger.error("Iyzico webhook: Conversation ID bulunamadı. Data: %s", data)
             return HttpResponse("Conversation ID missing.", status=400)
 
         # İlgili siparişi bul
         order = Order.objects.get(iyzi_conversation_id=conversation_id)
+        set_order(order.id)
 
         # Sadece iade bildirimlerini işle
         if event_type in ["REFUND", "PARTIAL_REFUND"]:
@@ -209,14 +228,15 @@ def iyzico_webhook_view(request: HttpRequest) -> HttpResponse:
 
                 order_for_update.save()
                 logger.info(
-                    f"Order #{order.id} için iade işlemi işlendi. Durum: {order_for_update.status}, Tutar: {refund_amount}")
+                    "Order #%s için iade işlemi işlendi. Durum: %s, Tutar: %s",
+                    order.id, order_for_update.status, refund_amount)
 
     except Order.DoesNotExist:
-        logger.error(f"Iyzico webhook: İlgili sipariş bulunamadı. Conversation ID: {conversation_id}")
+        logger.error("Iyzico webhook: İlgili sipariş bulunamadı. Conversation ID: %s", conversation_id)
         # Hata olsa bile Iyzico'ya "OK" dönüyoruz ki tekrar denemesin.
         return HttpResponse("Order not found but notification acknowledged.", status=200)
     except Exception as e:
-        logger.exception(f"Iyzico webhook işlenirken hata oluştu: {e}")
+        logger.exception("Iyzico webhook işlenirken hata oluştu: %s", e)
         # Hata durumunda 500 dönerek Iyzico'nun tekrar denemesini sağlayabiliriz.
         return HttpResponse("Internal Server Error", status=500)
 
@@ -236,10 +256,11 @@ def send_email_wrapper(subject, recipient_list, html_content, plain_content=None
             to=recipient_list,
         )
         msg.content_subtype = "html"
-        msg.send()
-        logger.info(f"E-posta başarıyla gönderildi: '{subject}' -> {recipient_list}")
+        with email_send():
+            msg.send()
+        logger.info("E-posta başarıyla gönderildi: '%s' -> %s", subject, recipient_list)
     except Exception as e:
-        logger.error(f"E-posta gönderiminde hata oluştu: {e}")
+        logger.error("E-posta gönderiminde hata oluştu: %s", e)
 
 
 def index_view(request):
@@ -247,7 +268,7 @@ def index_view(request):
     clients = Client.objects.all()
 
     # En son 3 blog yazısını alıyoruz
-    latest_blog_posts = BlogPost.objects.filter(status='published').order_by('-created_at')[:3]
+    latest_blog_posts = BlogPost.objects.filter(status='published').select_related('author', 'category').order_by('-created_at')[:3]
 
     # Ana sayfadaki hizmetler bölümü için
     services = Service.objects.all()
@@ -287,40 +308,53 @@ def services_view(request):
 
 
 def portfolio_view(request):
-    # URL'den 'service' adında bir parametre gelip gelmediğini kontrol et
-    service_id = request.GET.get('service')
+    # Filtreler (?category=<slug>, ?service=<id>, ?price=<aralık>) SQL'de uygulanır; sadece ilk sayfa render edilir.
+    filters = PortfolioFilters(request.GET)
+    facets = portfolio_facets(filters)
+    page_obj = portfolio_page(filters, request.GET.get('page'))
 
-    selected_service = None
-
-    if service_id:
-        # Eğer bir service ID'si geldiyse:
-        # 1. İlgili hizmeti bul (bulunamazsa 404 hatası döner)
-        selected_service = get_object_or_404(Service, id=service_id)
+    context = {
+        'items': page_obj.object_list,
+        'page_obj': page_obj,
+        'next_items_url': next_page_url(filters, page_obj),
+        'facets': facets,
+        'selected_category': filters.category,
+        'selected_service': filters.service,  # Bunu şablona gönderiyoruz ki başlıkta kullanabilelim
+    }
+    return render(request, 'portfolio.html', context)
 
-        # 2. Sadece bu hizmete ait PortfolioItem'ları (ürünleri) filtrele
-        items = PortfolioItem.objects.filter(service=selected_service)
 
-        # 3. Sadece filtrelenmiş bu ürünlerin sahip olduğu kategorileri al
-        #    .filter(items__in=items) -> bu kategorinin en az bir ürünü `items` listesinde olmalı
-        #    .distinct() -> her kategoriyi sadece bir kez listeye ekler
-        categories = PortfolioCategory.objects.filter(items__in=items).distinct()
-    else:
-        # Eğer bir service ID'si gelmediyse, her zamanki gibi tüm ürünleri ve kategorileri göster
-        items = PortfolioItem.objects.all()
-        categories = PortfolioCategory.objects.all()
+def portfolio_items_view(request):
+    """Portfolyonun sonraki sayfası: varsayılan olarak HTML parçası, `Accept: application/json` ile JSON."""
+    filters = PortfolioFilters(request.GET)
+    page_obj = portfolio_page(filters, request.GET.get('page'))
+    next_url = next_page_url(filters, page_obj)
 
+    if 'application/json' in request.headers.get('accept', ''):
+        return JsonResponse({
+            'items': [item_data(item) for item in page_obj.object_list],
+            'page': page_obj.number,
+            'num_pages': page_obj.paginator.num_pages,
+            'next_url': next_url,
+        })
     context = {
-        'items': items,
-        'categories': categories,
-        'selected_service': selected_service,  # Bunu şablona gönderiyoruz ki başlıkta kullanabilelim
+        'items': page_obj.object_list,
+        'next_items_url': next_url,
     }
-    return render(request, 'portfolio.html', context)
+    return render(request, 'partials/portfolio-items.html', context)
 
+@counts_views('portfolio')
+@conditional_page(portfolio_item_timestamp)
 def portfolio_details_view(request, slug):
     # Sorguyu artık 'slug' alanına göre yapıyoruz.
-    item = get_object_or_404(PortfolioItem, slug=slug)
+    item = get_object_or_404(PortfolioItem.objects.select_related('category'), slug=slug)
 
-    return render(request, 'portfolio-details.html', {'item': item})
+    context = {
+        'item': item,
+        'popular_items': [popular_item for popular_item in popular('portfolio') if popular_item['pk'] != item.pk],
+        'also_bought_items': also_bought(item.pk),
+    }
+    return render(request, 'portfolio-details.html', context)
 
 
 def team_view(request):
@@ -340,7 +374,7 @@ def testimonials_view(request):
 
 
 def blog_view(request):
-    all_posts = BlogPost.objects.filter(status='published').order_by('-created_at')
+    all_posts = BlogPost.objects.filter(status='published').select_related('author', 'category').order_by('-created_at')
     paginator = Paginator(all_posts, 6)
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
@@ -386,10 +420,15 @@ def contact_view(request):
     return render(request, 'contact.html', context)
 
 
+@counts_views('blog')
+@conditional_page(blog_post_timestamp)
 def blog_details_view(request, slug):  # Değişiklik 1: 'post_id' yerine 'slug'
     # Değişiklik 2: Veritabanı sorgusu artık 'pk' yerine 'slug' ile yapılıyor
-    post = get_object_or_404(BlogPost, slug=slug, status='published')
-    comments = post.comments.filter(active=True)
+    post = get_object_or_404(
+        BlogPost.objects.select_related('author', 'category').prefetch_related('tags'), slug=slug, status='published'
+    )
+    # Sadece ilk sayfa render edilir; devamı `blog_comments_view` ile parça parça yüklenir.
+    comments, next_cursor = comment_page(post.pk)
 
     if request.method == 'POST':
         comment_form = CommentForm(data=request.POST)
@@ -414,17 +453,56 @@ def blog_details_view(request, slug):  # Değişiklik 1: 'post_id' yerine 'slug'
         comment_form = CommentForm()
 
     recent_posts = BlogPost.objects.filter(status='published').order_by('-created_at')[:5]
-    all_tags = Tag.objects.all()
 
     context = {
         'post': post,
         'comments': comments,
+        'next_comments_url': _next_comments_url(post.slug, next_cursor),
         'comment_form': comment_form,
         'recent_posts': recent_posts,
-        'all_tags': all_tags,
+        'related_posts': related_posts(post),
+        'popular_posts': [popular_post for popular_post in popular('blog') if popular_post['pk'] != post.pk],
+        'sidebar': blog_sidebar(),
     }
     return render(request, 'blog-details.html', context)
 
+def _next_comments_url(slug, cursor):
+    if not cursor:
+        return None
+    return f"{reverse('blog_comments', kwargs={'slug': slug})}?{urlencode({'after': cursor})}"
+
+
+def blog_comments_view(request, slug):
+    """Yorumların sonraki sayfasını HTML parçası olarak döndürür (keyset sayfalama)."""
+    post_id = BlogPost.objects.filter(slug=slug, status='published').values_list('pk', flat=True).first()
+    if post_id is None:
+        raise Http404
+    try:
+        comments, next_cursor = comment_page(post_id, request.GET.get('after'))
+    except ValueError:
+        return HttpResponseBadRequest("Geçersiz imleç.")
+    context = {
+        'comments': comments,
+        'next_comments_url': _next_comments_url(slug, next_cursor),
+    }
+    return render(request, 'partials/blog-comments.html', context)
+
+
+def sitemap_file_view(request, path):
+    """
+    Önceden üretilmiş site haritası dosyalarını sunar. Üretimde bu istekler web sunucusunda
+    karşılanır; bu görünüm geliştirme ve yönlendirme yapılmamış kurulumlar içindir.
+    Haritalar henüz üretilmemişse istek içinde yazılmaz: üretim `run_deferred_tasks`'a
+    bırakılır ve crawler'a daha sonra tekrar denemesi söylenir.
+    """
+    if not sitemaps.index_exists():
+        deferred.schedule('sitemap')
+        response = HttpResponse("Site haritası hazırlanıyor.", status=503, content_type='text/plain; charset=utf-8')
+        response['Retry-After'] = sitemaps.RETRY_AFTER
+        return response
+    return serve(request, path, document_root=settings.SITEMAP_ROOT)
+
+
 def starter_view(request):
     context = {}
     return render(request, 'starter-page.html', context)
@@ -432,7 +510,7 @@ def starter_view(request):
 
 def posts_by_category_view(request, category_slug):
     category = get_object_or_404(Category, slug=category_slug)
-    all_posts = BlogPost.objects.filter(category=category, status='published').order_by('-created_at')
+    all_posts = BlogPost.objects.filter(category=category, status='published').select_related('author', 'category').order_by('-created_at')
 
     paginator = Paginator(all_posts, 6)
     page_number = request.GET.get('page')
@@ -453,7 +531,7 @@ def search_view(request):
         results = BlogPost.objects.filter(
             Q(title__icontains=query) | Q(content__icontains=query),
             status='published'
-        ).distinct().order_by('-created_at')
+        ).distinct().select_related('author', 'category').order_by('-created_at')
 
     paginator = Paginator(results, 6)
     page_number = request.GET.get('page')
@@ -502,6 +580,7 @@ def subscribe_view(request):
         return HttpResponse(_alert('danger', _("An error occurred. Please try again.")), status=500)
 
 
+@conditional_page(service_timestamp)
 def service_details_view(request, slug): # Değişken adı 'slug' oldu
     # Arama artık 'pk' (ID) yerine 'slug' alanına göre yapılıyor
     service = get_object_or_404(Service, slug=slug)
@@ -540,7 +619,7 @@ def profile_view(request, username):
 
 @login_required
 def order_history_view(request, username):
-    orders = Order.objects.filter(user=request.user)
+    orders = Order.objects.filter(user=request.user).prefetch_related('items__portfolio_item')
     context = {
         'orders': orders
     }
@@ -549,13 +628,15 @@ def order_history_view(request, username):
 
 @login_required
 def add_to_cart_view(request, item_id):
-    item = get_object_or_404(PortfolioItem, id=item_id)
     with transaction.atomic():
+        # Sepete yazılan fiyat süreç içi katalogdan değil, işlem içinde okunan satırdan alınır;
+        # başka bir süreçte yapılan fiyat değişikliği katalog yenilenmeden önce de geçerlidir.
+        item = get_object_or_404(PortfolioItem.objects.only('title', 'price'), pk=item_id)
         cart, created = Order.objects.get_or_create(user=request.user, status='cart')
 
         order_item, item_created = OrderItem.objects.get_or_create(
             order=cart,
-            portfolio_item=item,
+            portfolio_item_id=item.id,
             defaults={'price': item.price or 0, 'quantity': 1}
         )
 
@@ -596,21 +677,25 @@ def remove_from_cart_view(request, item_id):
 
 @login_required
 def cart_detail_view(request):
-    cart = Order.objects.filter(user=request.user, status='cart').first()
-    cart_items = cart.items.all() if cart else []
+    cart = Order.objects.filter(user=request.user, status='cart').prefetch_related('items').first()
+    cart_items = cart_lines(cart) if cart else []
     context = {
         'cart': cart,
         'cart_items': cart_items,
+        'recommended_items': cart_recommendations(item.portfolio_item_id for item in cart_items),
     }
     return render(request, 'cart_detail.html', context)
 
 
 @login_required
 def checkout_view(request):
-    cart = Order.objects.filter(user=request.user, status='cart').first()
+    cart = (
+        Order.objects.filter(user=request.user, status='cart')
+        .select_related('discount_code').prefetch_related('items__portfolio_item').first()
+    )
     discount_form = DiscountApplyForm()
 
-    if not cart or not cart.items.exists():
+    if not cart or not cart.items.all():
         messages.error(request, 'Sepetiniz boş. Lütfen önce ürün ekleyin.')
         return redirect('portfolio')
 
@@ -619,6 +704,7 @@ def checkout_view(request):
         if form.is_valid():
             with transaction.atomic():
                 order = cart
+                set_order(order.id)
                 # Siparişin fatura bilgilerini kaydet
                 order.billing_name = form.cleaned_data['billing_name']
                 order.billing_email = form.cleaned_data['billing_email']
@@ -655,9 +741,10 @@ def checkout_view(request):
                                 request.session['iyzico_checkout_html'] = init_data.get('checkoutFormContent')
                                 return redirect('iyzico_checkout_embed')
                         else:
+                            gateway_failure('iyzico', 'initialize')
                             error_message = init_data.get('errorMessage', 'Iyzico ile ödeme başlatılamadı.')
                             messages.error(request, error_message)
-                            logger.error(f"Iyzico ödeme başlatma hatası: {init_data}")
+                            logger.error("Iyzico ödeme başlatma hatası: %s", init_data)
                             return redirect('checkout')
                     except Exception as e:
                         messages.error(request, 'Iyzico ödeme işlemi sırasında bir hata oluştu. Lütfen tekrar deneyin.')
@@ -742,8 +829,9 @@ def iyzico_callback_view(request):
     }
 
     try:
-        checkout_form_result = iyzipay.CheckoutForm().retrieve(iyzico_request, options)
-        response = json.loads(checkout_form_result.read().decode('utf-8'))
+        with gateway_call('iyzico', 'retrieve'):
+            checkout_form_result = iyzipay.CheckoutForm().retrieve(iyzico_request, options)
+            response = json.loads(checkout_form_result.read().decode('utf-8'))
 
         status_ok = response.get('status') == 'success'
         payment_status = response.get('paymentStatus')
@@ -757,15 +845,20 @@ def iyzico_callback_view(request):
         elif conversation_id:
             order = get_object_or_404(Order, iyzi_conversation_id=conversation_id)
 
+        if order is not None:
+            set_order(order.id)
+            callback_lag('iyzico', 'callback', order.updated_at)
+
         if not status_ok:
+            gateway_failure('iyzico', 'retrieve')
             error_message = response.get('errorMessage', 'Ödeme sonucu doğrulanırken bir hata oluştu.')
             messages.error(request, error_message)
-            logger.error(f"Iyzico callback doğrulama hatası: {response}")
+            logger.error("Iyzico callback doğrulama hatası: %s", response)
             return redirect('checkout')
 
         # İmza doğrulama
         if not verify_iyzico_signature(response, options['secret_key']):
-            logger.warning(f"İmza doğrulaması başarısız: Order #{order.id if order else 'Unknown'}")
+            logger.warning("İmza doğrulaması başarısız: Order #%s", order.id if order else 'Unknown')
             messages.error(request, 'Ödeme doğrulaması başarısız. Lütfen tekrar deneyin.')
             return redirect('checkout')
 
@@ -798,26 +891,30 @@ def iyzico_callback_view(request):
 @login_required
 def order_success_view(request, order_id):
     try:
-        order = get_object_or_404(Order, id=order_id)
+        order = get_object_or_404(
+            Order.objects.select_related('discount_code').prefetch_related('items__portfolio_item'), id=order_id
+        )
     except Exception as e:
         return HttpResponse("Sipariş bulunamadı.", status=404)
+    set_order(order.id)
 
     # E-posta içeriği için HTML şablonunu render et
     email_body = render_to_string('emails/order_confirmation_email.html', {'order': order})
 
     # E-posta gönderme işlemi
     try:
-        send_mail(
-            "Sipariş Onayınız - " + str(order.id),  # E-posta başlığı
-            '',  # E-posta gövdesi (HTML formatında olduğu için burası boş)
-            settings.DEFAULT_FROM_EMAIL,  # Gönderen e-posta adresi
-            [order.billing_email],  # Alıcı e-posta adresi
-            html_message=email_body,  # HTML e-posta içeriği
-            fail_silently=False,  # Hata durumunda hata fırlat
-        )
+        with email_send():
+            send_mail(
+                "Sipariş Onayınız - " + str(order.id),  # E-posta başlığı
+                '',  # E-posta gövdesi (HTML formatında olduğu için burası boş)
+                settings.DEFAULT_FROM_EMAIL,  # Gönderen e-posta adresi
+                [order.billing_email],  # Alıcı e-posta adresi
+                html_message=email_body,  # HTML e-posta içeriği
+                fail_silently=False,  # Hata durumunda hata fırlat
+            )
     except Exception as e:
         # E-posta gönderme hatasını loglayabilirsiniz
-        print(f"E-posta gönderilirken bir hata oluştu: {e}")
+        logger.error("E-posta gönderilirken bir hata oluştu: %s", e)
 
     # Sipariş başarı sayfasını render et
     return render(request, 'order_success.html', {'order': order})
@@ -831,7 +928,8 @@ def apply_discount_view(request):
     if form.is_valid():
         code_text = form.cleaned_data['code']
         try:
-            discount_code = DiscountCode.objects.get(code__iexact=code_text)
+            # UPPER(code) = ? karşılaştırması discount_code_upper_unique index'ini kullanır; iexact LIKE'a dönüşebilir.
+            discount_code = DiscountCode.objects.alias(code_upper=Upper('code')).get(code_upper=code_text.upper())
             cart = Order.objects.get(user=request.user, status='cart')
 
             # Yeni ve daha spesifik hata kontrolleri
@@ -878,7 +976,7 @@ def apply_discount_view(request):
 
 @login_required
 def invoice_view(request, order_id):
-    order = get_object_or_404(Order, id=order_id, user=request.user)
+    order = get_object_or_404(Order.objects.prefetch_related('items__portfolio_item'), id=order_id, user=request.user)
     context = {
         'order': order,
     }
@@ -910,8 +1008,8 @@ def paytr_callback_view(request: HttpRequest) -> HttpResponse:
 
     if calculated_hash != post_data.get('hash'):
         logger.warning(
-            f"PayTR callback HASH MISMATCH for merchant_oid: {post_data.get('merchant_oid')}. "
-            f"Request IP: {request.META.get('REMOTE_ADDR')}"
+            "PayTR callback HASH MISMATCH for merchant_oid: %s. Request IP: %s",
+            post_data.get('merchant_oid'), request.META.get('REMOTE_ADDR'),
         )
         return HttpResponse("PAYTR notification failed: bad hash", status=400)
 
@@ -927,15 +1025,19 @@ def paytr_callback_view(request: HttpRequest) -> HttpResponse:
                 # İlgili siparişi veritabanından bul ve kilitle.
                 order = Order.objects.select_for_update().get(paytr_merchant_oid=merchant_oid)
             except Order.DoesNotExist:
-                logger.error(f"PayTR callback received for a non-existent merchant_oid: {merchant_oid}")
+                logger.error("PayTR callback received for a non-existent merchant_oid: %s", merchant_oid)
                 # Var olmayan bir sipariş için PayTR'a "OK" dönerek tekrar denemesini engelliyoruz.
                 return HttpResponse("OK")
 
+            set_order(order.id)
+            # Ödeme başlatılırken sipariş en son kaydedildi; updated_at başlangıç anıdır.
+            callback_lag('paytr', 'callback', order.updated_at)
+
             # Mükerrer bildirim kontrolü [DÜZELTİLDİ]
             # Sipariş zaten tamamlanmış veya başarısız olarak işaretlenmişse tekrar işlem yapma.
             if order.status in ['completed', 'payment_failed']:
                 logger.info(
-                    f"PayTR callback received for an already processed order: {merchant_oid}, Status: {order.status}"
+                    "PayTR callback received for an already processed order: %s, Status: %s", merchant_oid, order.status
                 )
                 return HttpResponse("OK")
 
@@ -957,7 +1059,7 @@ def paytr_callback_view(request: HttpRequest) -> HttpResponse:
 
                 order.save()
 
-                logger.info(f"Order #{order.id} payment successful via PayTR. Amount: {order.total_paid}")
+                logger.info("Order #%s payment successful via PayTR. Amount: %s", order.id, order.total_paid)
 
                 # E-posta/SMS gönderimi gibi yavaş işlemleri Celery'ye devretmek en iyisidir.
                 # Bu, view'in PayTR'a hızlıca "OK" dönmesini sağlar.
@@ -974,11 +1076,11 @@ def paytr_callback_view(request: HttpRequest) -> HttpResponse:
 
                 order.save()
 
-                logger.error(f"Order #{order.id} payment failed via PayTR. Reason: {order.payment_error_message}")
+                logger.error("Order #%s payment failed via PayTR. Reason: %s", order.id, order.payment_error_message)
 
     except Exception as e:
         logger.exception(
-            f"An unexpected error occurred during PayTR callback processing for merchant_oid: {merchant_oid}"
+            "An unexpected error occurred during PayTR callback processing for merchant_oid: %s", merchant_oid
         )
         # Hata durumunda 500 dönerek PayTR'ın bildirimi tekrar denemesini sağlıyoruz.
         return HttpResponse("An internal error occurred.", status=500)
@@ -1007,6 +1109,7 @@ def start_paytr_payment(request):
     # 1. Aktif siparişi al ve doğrula
     try:
         order = request.user.order_set.filter(status='cart').latest('created_at')
+        set_order(order.id)
         if not order.items.exists():
             messages.error(request, "Sepetiniz boş.")
             return redirect('cart')
@@ -1075,7 +1178,8 @@ def start_paytr_payment(request):
     }
 
     try:
-        response = requests.post('https://www.paytr.com/odeme/api/get-token', data=params_to_send, timeout=15)
+        with gateway_call('paytr', 'get_token'):
+            response = requests.post('https://www.paytr.com/odeme/api/get-token', data=params_to_send, timeout=15)
         response.raise_for_status()
         result = response.json()
 
@@ -1090,8 +1194,9 @@ def start_paytr_payment(request):
 
             return redirect('paytr_checkout_embed')
         else:
+            gateway_failure('paytr', 'get_token')
             error_reason = result.get('reason', 'Bilinmeyen bir hata.')
-            logger.error(f"PayTR Token alınamadı. Sebep: {error_reason}")
+            logger.error("PayTR Token alınamadı. Sebep: %s", error_reason)
             messages.error(request,
                            f"Ödeme başlatılamadı. Lütfen bilgilerinizi kontrol edip tekrar deneyin. ({error_reason})")
             return redirect('checkout')
@@ -1162,7 +1267,7 @@ def send_campaign_email_view(request):
 
                     messages.success(request, f"{len(recipients)} aboneye kampanya e-postası başarıyla gönderildi.")
                 except Exception as e:
-                    logger.error(f"Kampanya e-postası gönderilirken hata oluştu: {e}")
+                    logger.error("Kampanya e-postası gönderilirken hata oluştu: %s", e)
                     messages.error(request, f"E-posta gönderimi sırasında bir hata oluştu: {e}")
             else:
                 messages.warning(request, "E-posta gönderilecek geçerli abone bulunamadı.")